@@ -0,0 +1,8 @@
+"""Performance benchmarks for unit_parser.
+
+Run the timing suite with ``python -m benchmarks`` (see
+``benchmarks.suite``), the thread scaling benchmark with
+``python -m benchmarks.thread_scaling``, and the loader scaling
+benchmark with ``python -m benchmarks.loader_scaling``.
+
+"""
@@ -0,0 +1,73 @@
+"""Time to load unit definition files as the number of definitions grows.
+
+Loads synthetic unit definition files (see
+``benchmarks.suite.write_synthetic_units``) of increasing size and
+reports the time per definition. Loading is a single pass over the
+file, so the time per definition should stay flat and the fitted
+exponent of time against size should be close to 1.
+
+Usage
+-----
+$ python -m benchmarks.loader_scaling --sizes 1000 10000 100000
+
+"""
+
+import argparse
+import math
+import statistics
+import tempfile
+import timeit
+from collections.abc import Sequence
+from pathlib import Path
+
+from unit_parser import UnitRegistry
+
+from .suite import write_synthetic_units
+
+
+def measure(path: Path, repeat: int = 3) -> float:
+    """Return the fastest time, in seconds, to load the file at ``path``."""
+    timer = timeit.Timer(lambda: UnitRegistry.from_file(path))
+    return min(timer.repeat(repeat, number=1))
+
+
+def scaling_exponent(sizes: Sequence[int], seconds: Sequence[float]) -> float:
+    """Return the least-squares slope of log(seconds) against log(sizes).
+
+    A slope of 1 means loading time grows linearly with file size.
+
+    """
+    slope, _ = statistics.linear_regression(
+        [math.log(n) for n in sizes], [math.log(t) for t in seconds]
+    )
+    return slope
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[1000, 3000, 10000, 30000, 100000],
+        help='Numbers of definitions (default: 1000 3000 10000 30000 100000)',
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='Timing rounds per size (default: 3)'
+    )
+    args = parser.parse_args(argv)
+
+    seconds = []
+    print(f'{"definitions":>11} {"seconds":>9} {"us/definition":>14}')
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            path = write_synthetic_units(Path(workdir) / f'synthetic_{n}.txt', n)
+            elapsed = measure(path, args.repeat)
+            seconds.append(elapsed)
+            print(f'{n:>11} {elapsed:>9.4f} {elapsed / n * 1e6:>14.2f}')
+    if len(args.sizes) > 1:
+        print(f'scaling exponent: {scaling_exponent(args.sizes, seconds):.2f}')
+
+
+if __name__ == '__main__':
+    main()
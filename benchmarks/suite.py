@@ -0,0 +1,287 @@
+"""Timing benchmarks for the hot paths of unit_parser.
+
+Each benchmark times one operation: constructing a parser, resolving
+known and compound units, the two- and three-argument ``convert``, the
+four arithmetic methods, creating overlay registries and resolving
+units through them, loading synthetic unit definition files with
+thousands of definitions, and redefining one unit of such a file.
+Results can be saved as JSON and compared against a saved baseline; the
+run fails if any benchmark got slower than the baseline by more than a
+threshold.
+
+Usage
+-----
+$ python -m benchmarks --output baseline.json
+$ python -m benchmarks --baseline baseline.json --threshold 0.1
+$ python -m benchmarks -k convert -k resolve
+
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from collections.abc import Callable, Sequence
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from unit_parser import UnitParser, UnitRegistry
+
+# A benchmark is set up by a factory, which receives a scratch
+# directory and returns the operation to time.
+Benchmark = Callable[[Path], Callable[[], object]]
+
+
+def _letters(i: int) -> str:
+    """Return a unique lowercase name for ``i``: a, b, ..., z, ba, bb, ..."""
+    name = ''
+    while True:
+        i, r = divmod(i, 26)
+        name = chr(ord('a') + r) + name
+        if i == 0:
+            return name
+
+
+def write_synthetic_units(path: Path, n: int) -> Path:
+    """Write a unit definition file with ``n`` derived units.
+
+    The file defines three primitive units, then ``n`` units defined in
+    terms of primitives and of earlier units, a quarter of them by
+    compound specifications like "2 ua_per_ub".
+
+    """
+    lines = [
+        'baselength: [1 0 0]',
+        'basemass: [0 1 0]',
+        'basetime: [0 0 1]',
+    ]
+    primitives = ['baselength', 'basemass', 'basetime']
+    for i in range(n):
+        name = 'u' + _letters(i)
+        if i >= 2 and i % 4 == 0:
+            lines.append(f'{name}: 2 u{_letters(i - 1)}_per_u{_letters(i - 2)}')
+        else:
+            lines.append(f'{name}: {i % 97 + 1} {primitives[i % 3]}')
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+def _load_synthetic(n: int) -> Benchmark:
+    def setup(workdir: Path) -> Callable[[], object]:
+        path = write_synthetic_units(workdir / f'synthetic_{n}.txt', n)
+        return lambda: UnitRegistry.from_file(path)
+
+    return setup
+
+
+def _define_synthetic(n: int) -> Benchmark:
+    def setup(workdir: Path) -> Callable[[], object]:
+        path = write_synthetic_units(workdir / f'synthetic_{n}.txt', n)
+        registry = UnitRegistry.from_file(path)
+        registry.dependents('ud')  # Build the index of dependents once.
+        return partial(registry.define_unit, 'ud', '5 baselength')
+
+    return setup
+
+
+def _construct_from_registry(workdir: Path) -> Callable[[], object]:
+    registry = UnitRegistry.from_file()
+    return lambda: UnitParser(registry=registry)
+
+
+_TENANT_UNITS = ['smoot: 67 inches', 'furlong: 660 feet', 'blip-: 1e3']
+
+
+def _overlay(workdir: Path) -> Callable[[], object]:
+    registry = UnitRegistry.from_file()
+    return partial(registry.overlay, _TENANT_UNITS)
+
+
+def _resolve_known_overlay(workdir: Path) -> Callable[[], object]:
+    up = UnitParser(registry=UnitRegistry.from_file().overlay(_TENANT_UNITS))
+    return partial(up._signature_and_quantity_for_unit, 'feet')
+
+
+def _resolve_compound_uncached(workdir: Path) -> Callable[[], object]:
+    up = UnitParser(cache_size=0)
+    return lambda: up._signature_and_quantity_for_unit(
+        'kilogram_meter_per_second_squared'
+    )
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    'construct': lambda workdir: UnitParser,
+    'construct_from_registry': _construct_from_registry,
+    'resolve_known': lambda workdir: partial(
+        UnitParser()._signature_and_quantity_for_unit, 'feet'
+    ),
+    'resolve_compound': lambda workdir: partial(
+        UnitParser()._signature_and_quantity_for_unit,
+        'kilogram_meter_per_second_squared',
+    ),
+    'resolve_compound_uncached': _resolve_compound_uncached,
+    'resolve_known_overlay': _resolve_known_overlay,
+    'convert_2arg': lambda workdir: partial(UnitParser().convert, '5 feet', 'meters'),
+    'convert_3arg': lambda workdir: partial(
+        UnitParser().convert, 5.0, 'feet', 'meters'
+    ),
+    'convert_compound': lambda workdir: partial(
+        UnitParser().convert, '88 miles_per_hour', 'meters_per_second'
+    ),
+    'add': lambda workdir: partial(UnitParser().add, '1 foot', '3 inches', 'inches'),
+    'subtract': lambda workdir: partial(
+        UnitParser().subtract, '1 foot', '3 inches', 'inches'
+    ),
+    'multiply': lambda workdir: partial(
+        UnitParser().multiply, '2 meters', '3 feet', 'meters_squared'
+    ),
+    'divide': lambda workdir: partial(
+        UnitParser().divide, '100 miles', '2 hours', 'meters_per_second'
+    ),
+    'overlay': _overlay,
+    'load_synthetic_1000': _load_synthetic(1000),
+    'load_synthetic_10000': _load_synthetic(10000),
+    'define_synthetic_10000': _define_synthetic(10000),
+}
+
+
+def run(
+    names: Sequence[str], repeat: int = 5, log: Callable[[str], object] | None = None
+) -> dict[str, dict[str, float]]:
+    """Time the named benchmarks.
+
+    Each benchmark is run in ``repeat`` rounds of a number of calls
+    chosen so that a round takes at least 0.2 seconds.
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        For each benchmark, the ``median`` and ``min`` seconds per call
+        over the rounds, and the ``number`` of calls per round.
+
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            timer = timeit.Timer(BENCHMARKS[name](Path(workdir)))
+            number, _ = timer.autorange()
+            times = [t / number for t in timer.repeat(repeat, number)]
+            results[name] = {
+                'median': statistics.median(times),
+                'min': min(times),
+                'number': number,
+            }
+            if log is not None:
+                log(f'{name:<28} {_format_seconds(results[name]["median"]):>10}')
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> dict[str, tuple[float | None, str]]:
+    """Compare results against a baseline.
+
+    Returns
+    -------
+    dict[str, tuple[float | None, str]]
+        For each benchmark, the ratio of its median time to the
+        baseline's (None if it has no baseline) and a status: 'new',
+        'regressed' if the ratio exceeds ``1 + threshold``, 'improved'
+        if it is below ``1 - threshold``, and 'ok' otherwise.
+
+    """
+    comparison: dict[str, tuple[float | None, str]] = {}
+    for name, result in results.items():
+        if name not in baseline:
+            comparison[name] = (None, 'new')
+            continue
+        ratio = result['median'] / baseline[name]['median']
+        if ratio > 1 + threshold:
+            status = 'regressed'
+        elif ratio < 1 - threshold:
+            status = 'improved'
+        else:
+            status = 'ok'
+        comparison[name] = (ratio, status)
+    return comparison
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        '-k',
+        dest='patterns',
+        action='append',
+        help='Run only benchmarks whose name contains this string; repeatable',
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='Timing rounds (default: 5)'
+    )
+    parser.add_argument('-o', '--output', type=Path, help='Write results as JSON')
+    parser.add_argument(
+        '--baseline', type=Path, help='Compare against results saved with --output'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='Allowed slowdown relative to the baseline (default: 0.1, i.e. 10%%)',
+    )
+    parser.add_argument('--list', action='store_true', help='List the benchmarks')
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name in BENCHMARKS
+        if not args.patterns or any(p in name for p in args.patterns)
+    ]
+    if args.list:
+        print('\n'.join(names))
+        return
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())['results']
+
+    results = run(names, args.repeat, log=print)
+    if args.output is not None:
+        document: dict[str, Any] = {
+            'metadata': {
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            },
+            'results': results,
+        }
+        args.output.write_text(json.dumps(document, indent=2) + '\n')
+
+    if baseline is None:
+        return
+    comparison = compare(results, baseline, args.threshold)
+    print()
+    print(f'{"benchmark":<28} {"ratio":>8}  status')
+    for name, (ratio, status) in comparison.items():
+        shown = '-' if ratio is None else f'{ratio:.2f}x'
+        print(f'{name:<28} {shown:>8}  {status}')
+    if any(status == 'regressed' for _, status in comparison.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Throughput of one shared UnitParser as the number of threads grows.
+
+Every thread runs the same mix of ``convert`` (table and compound
+units), ``add``, and ``multiply`` calls against a single parser. On
+free-threaded Python builds, throughput should grow nearly linearly
+with the number of threads, up to the number of cores; with the GIL
+enabled it stays flat.
+
+Usage
+-----
+$ python -m benchmarks.thread_scaling --threads 1 2 4 8
+
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections.abc import Sequence
+
+from unit_parser import UnitParser
+
+_COMPOUND_UNITS = [
+    'kilogram_meter_per_second_squared',
+    'meter_per_second',
+    'newton_meter',
+    'foot_pound_per_second',
+    'kilogram_per_meter_cubed',
+]
+
+
+def _work(up: UnitParser, iterations: int) -> None:
+    for _ in range(iterations):
+        up.convert('5 feet', 'meters')
+        up.convert(3.0, 'gallons', 'liters')
+        for unit in _COMPOUND_UNITS:
+            up.convert(f'1 {unit}', unit)
+        up.add('1 foot', '3 inches', 'inches')
+        up.multiply('2 meters', '3 meters', 'meters_squared')
+
+
+# Parser calls made per iteration of ``_work``.
+_CALLS_PER_ITERATION = 4 + len(_COMPOUND_UNITS)
+
+
+def measure(up: UnitParser, threads: int, iterations: int) -> float:
+    """Return the throughput, in calls per second, of ``threads`` threads.
+
+    Each thread makes ``iterations`` iterations of the call mix. The
+    threads start together, after a barrier.
+
+    """
+    barrier = threading.Barrier(threads + 1)
+
+    def run() -> None:
+        barrier.wait()
+        _work(up, iterations)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return threads * iterations * _CALLS_PER_ITERATION / elapsed
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cpus = os.cpu_count() or 1
+    parser.add_argument(
+        '--threads',
+        type=int,
+        nargs='+',
+        default=sorted({1, 2, 4, cpus}),
+        help='Thread counts to measure (default: 1 2 4 and the CPU count)',
+    )
+    parser.add_argument(
+        '--iterations',
+        type=int,
+        default=20_000,
+        help='Iterations of the call mix per thread (default: 20000)',
+    )
+    args = parser.parse_args(argv)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+    print(f'{cpus} CPUs')
+    up = UnitParser()
+    _work(up, 100)  # Warm the cache.
+    baseline = None
+    print(f'{"threads":>7} {"calls/s":>12} {"speedup":>8} {"efficiency":>10}')
+    for threads in args.threads:
+        throughput = measure(up, threads, args.iterations)
+        if baseline is None:
+            baseline = throughput / threads
+        speedup = throughput / baseline
+        print(
+            f'{threads:>7} {throughput:>12,.0f} {speedup:>8.2f} '
+            f'{speedup / threads:>10.0%}'
+        )
+
+
+if __name__ == '__main__':
+    main()
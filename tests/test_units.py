@@ -2,6 +2,7 @@
 
 import os
 import sys
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -300,6 +301,34 @@ def test_custom_unit_file_uses_its_own_dimension_count():
     assert up._sig_len == 2
 
 
+def test_custom_unit_file_signature_separators_and_comments(tmp_path: Path) -> None:
+    """Signature vectors may separate exponents by commas, spaces, or
+    both, and comments may follow definitions or stand on their own.
+
+    """
+    path = tmp_path / 'units.txt'
+    path.write_text(
+        '# Base units\n'
+        '\n'
+        'sec: [ 0 , 1 ]  # time\n'
+        'm: [1,0]\n'
+        '   # indented comment\n'
+        'hz: [0,-1]\n'
+        'km: 1000 m# no space before the comment\n'
+    )
+    up = UnitParser(path)
+    assert up.convert('2 km', 'm') == pytest.approx(2000)
+    assert up._signature_and_quantity_for_unit('hz').signature == (0, -1)
+
+
+def test_custom_unit_file_fractional_exponent(tmp_path: Path) -> None:
+    """Signature exponents must be integers."""
+    path = tmp_path / 'units.txt'
+    path.write_text('sec: [1]\nm: [0.5]\n')
+    with pytest.raises(ValueError, match='Syntax error on line: 2:'):
+        UnitParser(path)
+
+
 # --- _parse_physical_quantity (happy path) -----------------------------------
 
 
@@ -383,3 +412,1604 @@ def test_unit_lookup_is_case_sensitive():
     up = UnitParser()
     with pytest.raises(ValueError):
         up.convert('5 Feet', 'meters')
+
+
+# --- compound unit cache -----------------------------------------------------
+
+
+def test_cache_hits_and_misses():
+    """Repeated compound lookups are served from the cache."""
+    up = UnitParser()
+    assert up.cache_info().currsize == 0
+    first = up._signature_and_quantity_for_unit('kilogram_meter_per_second_squared')
+    second = up._signature_and_quantity_for_unit('kilogram_meter_per_second_squared')
+    assert first == second
+    info = up.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_cache_skips_table_units():
+    """Units defined in the file do not go through the cache."""
+    up = UnitParser()
+    up.convert('5 feet', 'meters')
+    assert up.cache_info().misses == 0
+
+
+def test_cache_lru_eviction():
+    up = UnitParser(cache_size=2)
+    up._signature_and_quantity_for_unit('meter_squared')
+    up._signature_and_quantity_for_unit('meter_cubed')
+    # Touch 'meter_squared' so that 'meter_cubed' is least recently used.
+    up._signature_and_quantity_for_unit('meter_squared')
+    up._signature_and_quantity_for_unit('second_squared')
+    assert up.cache_info().currsize == 2
+    up._signature_and_quantity_for_unit('meter_squared')
+    assert up.cache_info().hits == 2
+
+
+def test_cache_failures():
+    """Invalid specifications are cached and keep raising ValueError."""
+    up = UnitParser()
+    for _ in range(3):
+        with pytest.raises(ValueError, match='Unit not recognized'):
+            up._signature_and_quantity_for_unit('meter_per_fortnite')
+    info = up.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_cache_failures_disabled():
+    up = UnitParser(cache_failures=False)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            up._signature_and_quantity_for_unit('meter_per_fortnite')
+    assert up.cache_info().currsize == 0
+
+
+def test_cache_disabled():
+    up = UnitParser(cache_size=0)
+    assert up.convert('1 meter_per_second', 'km_per_hour') == pytest.approx(3.6)
+    assert up.convert('1 meter_per_second', 'km_per_hour') == pytest.approx(3.6)
+    assert up.cache_info().currsize == 0
+
+
+def test_cache_clear():
+    up = UnitParser()
+    up._signature_and_quantity_for_unit('meter_squared')
+    up.cache_clear()
+    assert up.cache_info() == (0, 0, 1024, 0)
+
+
+def test_negative_cache_size():
+    with pytest.raises(ValueError):
+        UnitParser(cache_size=-1)
+
+
+# --- precompiled converters --------------------------------------------------
+
+
+def test_converter_scalar():
+    up = UnitParser()
+    to_meters = up.converter('feet', 'meters')
+    assert to_meters(5) == pytest.approx(1.524)
+    assert to_meters.factor == pytest.approx(0.3048)
+
+
+def test_converter_list_and_tuple():
+    up = UnitParser()
+    to_inches = up.converter('feet', 'inches')
+    assert to_inches([1, 2]) == pytest.approx([12, 24])
+    assert to_inches((0.5,)) == pytest.approx([6])
+
+
+def test_converter_compound_units():
+    up = UnitParser()
+    to_kph = up.converter('meters_per_second', 'km_per_hour')
+    assert to_kph(1.0) == pytest.approx(3.6)
+
+
+def test_converter_incompatible_units():
+    up = UnitParser()
+    with pytest.raises(ValueError):
+        up.converter('feet', 'seconds')
+
+
+def test_converter_has_slots():
+    up = UnitParser()
+    to_meters = up.converter('feet', 'meters')
+    with pytest.raises(AttributeError):
+        to_meters.extra = 1  # type: ignore[attr-defined]
+    assert 'feet' in repr(to_meters)
+
+
+# --- vectorized conversion ---------------------------------------------------
+
+
+def test_convert_many_single_unit():
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    result = up.convert_many(np.array([1.0, 2.0, 5.0]), 'feet', 'meters')
+    assert result == pytest.approx([0.3048, 0.6096, 1.524])
+
+
+def test_convert_many_buffer_protocol():
+    pytest.importorskip('numpy')
+    from array import array
+
+    up = UnitParser()
+    result = up.convert_many(array('d', [1.0, 2.0]), 'hours', 'minutes')
+    assert result.tolist() == pytest.approx([60, 120])
+
+
+def test_convert_many_per_element_units():
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    values = np.array([[1.0, 12.0], [1.0, 3.0]])
+    units = np.array([['feet', 'inches'], ['yard', 'feet']])
+    result = up.convert_many(values, units, 'feet')
+    assert result.shape == (2, 2)
+    assert result.ravel().tolist() == pytest.approx([1, 1, 3, 3])
+
+
+def test_convert_many_incompatible_units():
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    with pytest.raises(ValueError):
+        up.convert_many(np.ones(2), ['feet', 'seconds'], 'meters')
+    with pytest.raises(ValueError):
+        up.convert_many(np.ones(2), 'seconds', 'meters')
+
+
+def test_convert_many_shape_mismatch():
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    with pytest.raises(ValueError):
+        up.convert_many(np.ones(3), ['feet', 'feet'], 'meters')
+
+
+# --- bulk quantity parsing ---------------------------------------------------
+
+
+def test_parse_quantities_columns():
+    pytest.importorskip('numpy')
+    up = UnitParser()
+    parsed = up.parse_quantities(['5 feet', '1/3 tablespoons', '2.5 feet'])
+    assert parsed.values.tolist() == pytest.approx([5, 1 / 3, 2.5])
+    assert parsed.unit_codes.tolist() == [0, 1, 0]
+    assert parsed.units == ['feet', 'tablespoons']
+    assert not parsed.malformed.any()
+
+
+def test_parse_quantities_malformed_rows():
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    huge = '1' * 400 + '/3 feet'
+    parsed = up.parse_quantities(['meters', '5 feet', '1/0 feet', None, huge])  # type: ignore[list-item]
+    assert parsed.malformed.tolist() == [True, False, True, True, True]
+    assert parsed.unit_codes.tolist() == [-1, 0, -1, -1, -1]
+    assert np.isnan(parsed.values[[0, 2, 3, 4]]).all()
+
+
+def test_parse_quantities_numpy_input():
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    parsed = up.parse_quantities(np.array(['1 hour', '30 min']))
+    minutes = up.convert_many(
+        parsed.values, np.array(parsed.units)[parsed.unit_codes], 'min'
+    )
+    assert minutes.tolist() == pytest.approx([60, 30])
+
+
+def test_parse_physical_quantity_signed_decimal():
+    """Decimals bypass Fraction but must parse identically."""
+    up = UnitParser()
+    assert up._parse_physical_quantity('-.5 feet') == (-0.5, 'feet')
+    assert up._parse_physical_quantity('+0.1 feet') == (0.1, 'feet')
+
+
+def test_parse_physical_quantity_exponent():
+    """Quantities accept numbers written as in definition files."""
+    up = UnitParser()
+    assert up._parse_physical_quantity('1e3 meters') == (1000.0, 'meters')
+    assert up._parse_physical_quantity('-2.5E-1 feet') == (-0.25, 'feet')
+    assert up.convert('1e3 meters', 'km') == pytest.approx(1)
+
+
+def test_parse_physical_quantity_overflowing_fraction():
+    up = UnitParser()
+    with pytest.raises(ValueError, match='Invalid format'):
+        up._parse_physical_quantity('1' * 400 + '/3 feet')
+
+
+# --- binary snapshots --------------------------------------------------------
+
+
+def test_snapshot_round_trip(tmp_path):
+    """A snapshot reproduces the parsed table, plurals included."""
+    snapshot = tmp_path / 'units.snap'
+    parsed = UnitParser(snapshot=snapshot)
+    assert snapshot.exists()
+    with patch('unit_parser.registry._parse_unit_file') as parse:
+        loaded = UnitParser(snapshot=snapshot)
+    parse.assert_not_called()
+    assert loaded._units == parsed._units
+    assert loaded._sig_len == parsed._sig_len
+    assert loaded.convert('5 feet', 'meters') == 1.524
+
+
+def test_snapshot_invalidated_by_source_change(tmp_path):
+    source = tmp_path / 'units.txt'
+    source.write_text('m: [1]\nkm: 1000 m\n')
+    snapshot = tmp_path / 'units.snap'
+    UnitParser(source, snapshot=snapshot)
+
+    source.write_text('m: [1]\nkm: 1000 m\nmile: 1609.344 m\n')
+    up = UnitParser(source, snapshot=snapshot)
+    assert up.convert('1 mile', 'km') == pytest.approx(1.609344)
+    # The snapshot was rewritten for the new contents.
+    with patch('unit_parser.registry._parse_unit_file') as parse:
+        UnitParser(source, snapshot=snapshot)
+    parse.assert_not_called()
+
+
+def test_snapshot_corrupt_file_is_reparsed(tmp_path):
+    snapshot = tmp_path / 'units.snap'
+    snapshot.write_bytes(b'garbage')
+    up = UnitParser(snapshot=snapshot)
+    assert up.convert('1 day', 'seconds') == 86400
+    assert snapshot.read_bytes() != b'garbage'
+
+
+def test_snapshot_unwritable_location(tmp_path):
+    """Failing to write the snapshot does not prevent construction."""
+    up = UnitParser(snapshot=tmp_path / 'missing_dir' / 'units.snap')
+    assert up.convert('1 day', 'seconds') == 86400
+
+
+def test_snapshot_loads_rejects_truncated_data():
+    from unit_parser import snapshot
+
+    up = UnitParser()
+    data = snapshot.dumps(up.registry._to_snapshot(), b'\0' * 32)
+    assert snapshot.loads(data) is not None
+    assert snapshot.loads(data, b'\1' * 32) is None
+    assert snapshot.loads(data[:100]) is None
+
+
+# --- shared default parser ---------------------------------------------------
+
+
+def test_default_parser_is_shared():
+    import unit_parser
+
+    assert unit_parser.default() is unit_parser.default()
+
+
+def test_default_parser_concurrent_first_use():
+    """Racing first calls construct the parser exactly once."""
+    import threading
+
+    from unit_parser import shared
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(shared.default())
+
+    with patch.object(shared, '_default', None):
+        with patch.object(shared, 'UnitParser', wraps=UnitParser) as factory:
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    assert factory.call_count == 1
+    assert all(parser is results[0] for parser in results)
+
+
+def test_module_level_helpers():
+    from unit_parser import shared
+
+    assert shared.convert('5 feet', 'meters') == 1.524
+    assert shared.convert(5, 'feet', 'meters') == 1.524
+    assert shared.add('5 meters', '2 meters', 'meters') == 7
+    assert shared.subtract('5 meters', '2 meters', 'meters') == 3
+    assert shared.multiply('2 kg', '5 meters_per_second_squared', 'newtons') == 10
+    assert shared.divide('5 meters', '2 seconds', 'meters_per_second') == 2.5
+    with pytest.raises(ValueError):
+        shared.convert(5, 'feet')  # type: ignore[call-overload]
+
+
+# --- unit registries ---------------------------------------------------------
+
+
+def test_registry_shared_between_parsers():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    first = UnitParser(registry=registry)
+    second = UnitParser(registry=registry)
+    assert first.registry is second.registry
+    assert first.convert('5 feet', 'meters') == 1.524
+    assert 'feet' in registry
+    assert registry.get('metes') is None
+
+
+def test_registry_and_definitions_are_exclusive():
+    from unit_parser import UnitRegistry
+
+    path = os.path.join(get_cwd(), 'test_files', 'valid_custom.txt')
+    with pytest.raises(ValueError):
+        UnitParser(path, registry=UnitRegistry.from_file())
+
+
+def test_registry_is_immutable():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    with pytest.raises(AttributeError):
+        registry._units = {}
+    with pytest.raises(TypeError):
+        registry.units['feet'] = registry.units['meter']  # type: ignore[index]
+
+
+def test_registry_pickle_round_trip():
+    import pickle
+
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    payload = pickle.dumps(registry)
+    definitions = {name: registry.definition(name) for name in registry.units}
+    assert len(payload) < len(pickle.dumps((dict(registry.units), definitions)))
+    clone = pickle.loads(payload)
+    assert clone == registry
+    assert all(clone.definition(name) == definitions[name] for name in definitions)
+
+
+def test_parser_pickle_round_trip():
+    import pickle
+
+    up = UnitParser(cache_size=16)
+    up.convert('1 meter_per_second', 'km_per_hour')
+    clone = pickle.loads(pickle.dumps(up))
+    assert clone.registry == up.registry
+    assert clone.cache_info() == (0, 0, 16, 0)
+    assert clone.convert('5 feet', 'meters') == 1.524
+
+
+def test_registry_from_bytes_rejects_garbage():
+    from unit_parser import UnitRegistry
+
+    with pytest.raises(ValueError):
+        UnitRegistry.from_bytes(b'garbage')
+
+
+def test_registry_shared_memory():
+    import subprocess
+
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    block = registry.to_shared_memory()
+    script = (
+        'import sys; from unit_parser import UnitParser, UnitRegistry; '
+        'registry = UnitRegistry.from_shared_memory(sys.argv[1]); '
+        'print(UnitParser(registry=registry).convert("5 feet", "inches"))'
+    )
+    try:
+        result = subprocess.run(
+            [sys.executable, '-c', script, block.name],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert float(result.stdout) == pytest.approx(60)
+        assert result.stderr == ''
+    finally:
+        block.close()
+        block.unlink()
+
+
+# --- unit name prefixes ------------------------------------------------------
+
+
+def test_prefixed_units_resolved_on_demand():
+    """Prefixed names resolve without being listed in the table."""
+    up = UnitParser()
+    assert 'kilowatt' not in up.registry.units
+    assert up.registry.prefixes['kilo'] == 1000
+    assert up.convert('1 kilowatt_hour', 'joules') == pytest.approx(3.6e6)
+    assert up.convert('2.2 kiloohms', 'ohm') == pytest.approx(2200)
+    assert up.convert('5 milliampere', 'ampere') == pytest.approx(0.005)
+    assert up.convert('1500 nanoseconds', 'microsecond') == pytest.approx(1.5)
+    # Explicitly defined units still take precedence.
+    assert up.registry.get('kilometer') is up.registry.units['kilometer']
+
+
+@pytest.mark.parametrize('name', ['exam', 'kilokg', 'millisecs', 'megakms', 'nanom'])
+def test_prefixes_skip_abbreviations(name: str) -> None:
+    """Prefixes combine with full unit names only, so typos do not resolve."""
+    up = UnitParser()
+    with pytest.raises(ValueError, match=f'Unit not recognized: {name}'):
+        up.dimension_of(name)
+
+
+def test_prefixes_combine_with_plurals() -> None:
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    assert registry.get('kilofeet') == registry.get('kilofoot')
+    assert registry.get('nanoseconds') == registry.get('nanosecond')
+    assert registry.get('kilopounds') is not None
+    # Abbreviations redefined as full units take prefixes.
+    tenant = registry.overlay(['ft: 0.3 meter'])
+    assert tenant.get('kiloft') is not None
+    assert registry.get('kiloft') is None
+    pickled = UnitRegistry.from_bytes(registry.to_bytes())
+    assert pickled.get('exam') is None
+
+
+def test_prefixed_units_memoized():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    spec = registry.get('megawatt')
+    assert spec is not None
+    assert registry.get('megawatt') is spec
+    assert registry.get('kilomegawatt') is None
+
+
+def test_prefixes_in_custom_file(tmp_path: Path) -> None:
+    """The longest matching prefix wins, unless the rest is not a unit."""
+    path = tmp_path / 'units.txt'
+    path.write_text(
+        'm-: 1/1000\nmi-: 1e-6  # not a real prefix\nm: [1]\nin: 0.0254 m\nmm: 1 mim\n'
+    )
+    up = UnitParser(path)
+    assert up.registry.prefixes == {'m': 0.001, 'mi': 1e-6}
+    assert up.convert('1 mm', 'm') == pytest.approx(1e-6)
+    assert up.convert('1 min', 'in') == pytest.approx(0.001)
+    with pytest.raises(ValueError, match='Unit not recognized: mft'):
+        up.convert('1 mft', 'm')
+
+
+@pytest.mark.parametrize(
+    'contents, message',
+    [
+        ('s: [1]\nkilo-: [1]\n', 'Prefix kilo must be defined by a number'),
+        ('s: [1]\nkilo-: 1000 s\n', 'Prefix kilo must be defined by a number'),
+        ('kilo-: 1000\nkilo-: 1000\n', 'Prefix kilo has already been specified'),
+        ('kilo-: 0\n', 'Prefix factor must be strictly positive'),
+        ('s: [1]\nmin: 60\n', 'Syntax error on line: 2:'),
+    ],
+)
+def test_invalid_prefix_definitions(
+    tmp_path: Path, contents: str, message: str
+) -> None:
+    path = tmp_path / 'units.txt'
+    path.write_text(contents)
+    with pytest.raises(ValueError, match=message):
+        UnitParser(path)
+
+
+def test_prefixes_survive_snapshots(tmp_path: Path) -> None:
+    import pickle
+
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    assert UnitRegistry.from_bytes(registry.to_bytes()).prefixes == registry.prefixes
+    assert pickle.loads(pickle.dumps(registry)).get('kilowatt') is not None
+
+    snapshot = tmp_path / 'units.snap'
+    UnitParser(snapshot=snapshot)
+    with patch('unit_parser.registry._parse_unit_file') as parse:
+        loaded = UnitParser(snapshot=snapshot)
+    parse.assert_not_called()
+    assert loaded.convert('1 gigawatt', 'megawatts') == pytest.approx(1000)
+
+
+# --- overlay registries ------------------------------------------------------
+
+
+def test_overlay_falls_through_to_shared_base():
+    from unit_parser import UnitRegistry
+
+    base = UnitRegistry.from_file()
+    tenant = base.overlay(['smoot: 67 inches', 'furlong: 660 feet'])
+    up = UnitParser(registry=tenant)
+    assert up.convert('1 furlong', 'smoots') == pytest.approx(7920 / 67)
+    assert up.convert('2 kilosmoots', 'meters') == pytest.approx(2 * 67 * 25.4)
+    assert 'smoot' not in base
+    assert tenant.base is base
+    # The base table is shared, not copied.
+    assert tenant._units.base is base._units  # type: ignore[attr-defined]
+    assert len(tenant) == len(base) + 4
+
+
+def test_overlay_redefines_base_units():
+    from unit_parser import UnitRegistry
+
+    base = UnitRegistry.from_file()
+    tenant = base.overlay(['yard: 2 kg', 'widget: [1 1 0 0 0 0]'])
+    up = UnitParser(registry=tenant)
+    assert up.convert('3 yards', 'kg') == pytest.approx(6)
+    assert 'yards' not in up.compatible_units('feet')
+    assert 'yards' in up.compatible_units('kg')
+    assert up.convert('1 widget', 'meter_kilogram') == 1
+    assert UnitParser(registry=base).convert('1 yard', 'feet') == pytest.approx(3)
+
+
+def test_overlay_of_overlay_is_flattened(tmp_path: Path) -> None:
+    from unit_parser import UnitRegistry
+
+    base = UnitRegistry.from_file()
+    path = tmp_path / 'tenant.txt'
+    path.write_text('# Tenant units\nsmoot: 67 inches\nblip-: 1e3\n')
+    first = base.overlay(file=path)
+    second = first.overlay(['furlong: 660 feet', 'smoot: 1 blipsmoot'])
+    assert second.base is base
+    assert second.get('furlong') is not None
+    assert second.get('smoot') == first.get('blipsmoot')
+    assert second.prefixes['blip'] == 1000
+    assert first.get('furlong') is None
+
+
+def test_overlay_pickle_round_trip():
+    import pickle
+
+    from unit_parser import UnitRegistry
+
+    tenant = UnitRegistry.from_file().overlay(['smoot: 67 inches'])
+    clone = pickle.loads(pickle.dumps(tenant))
+    assert clone == tenant
+    assert UnitParser(registry=clone).convert('1 smoot', 'inches') == 67
+
+
+@pytest.mark.parametrize(
+    'definitions, message',
+    [
+        (['smoot: 67 inches', 'smoot: 1 meter'], 'Unit smoot has already been'),
+        (['widget: [1 0]'], 'Signature length inconsistent'),
+        (['smoot: 67 blorps'], 'Unit not recognized: blorps'),
+    ],
+)
+def test_overlay_invalid_definitions(definitions: list[str], message: str) -> None:
+    from unit_parser import UnitRegistry
+
+    with pytest.raises(ValueError, match=message):
+        UnitRegistry.from_file().overlay(definitions)
+
+
+def test_overlay_definitions_and_file_are_exclusive(tmp_path: Path) -> None:
+    from unit_parser import UnitRegistry
+
+    path = tmp_path / 'tenant.txt'
+    path.write_text('smoot: 67 inches\n')
+    with pytest.raises(ValueError, match='not both'):
+        UnitRegistry.from_file().overlay(['furlong: 660 feet'], file=path)
+
+
+# --- unit dependencies -------------------------------------------------------
+
+
+def test_registry_dependencies_and_dependents():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    assert registry.definition('foot') == '0.3048 meter'
+    assert registry.definition('meter') == '[1 0 0 0 0 0]'
+    assert registry.definition('feet') == '1 foot'
+    assert registry.definition('smoot') is None
+    assert registry.dependencies('slug') == ('lbf', 'second', 'foot')
+    assert registry.dependencies('kpa') == ('kilo', 'pascal')
+    assert registry.dependencies('meter') == ()
+    assert set(registry.dependents('foot')) == {'feet', 'ft', 'foots', 'slug'}
+    assert 'kpa' in registry.dependents('pascal')
+    assert 'bar' not in registry.dependents('pascal')
+    assert 'bar' in registry.dependents('pascal', transitive=True)
+
+
+def test_define_unit_resolves_only_affected_units():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    metric = registry.define_unit('foot', '0.3 meter')
+    assert metric.base is registry
+    assert set(metric._units.own) == {  # type: ignore[attr-defined]
+        *registry.dependents('foot', transitive=True),
+        'foot',
+    }
+    up = UnitParser(registry=metric)
+    assert up.convert('1 ft', 'meters') == pytest.approx(0.3)
+    assert up.convert('2 feet', 'meters') == pytest.approx(0.6)
+    assert up.convert('1 inch', 'meters') == pytest.approx(0.0254)
+    assert UnitParser(registry=registry).convert('1 ft', 'meters') == 0.3048
+
+
+def test_define_unit_follows_dependency_chains():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    leap = registry.define_unit('day', '86401 second')
+    up = UnitParser(registry=leap)
+    assert up.convert('1 week', 'seconds') == 7 * 86401
+    assert up.convert('1 year', 'days') == pytest.approx(365)
+    assert up.convert('1 hour', 'seconds') == 3600
+
+
+def test_define_unit_adds_units():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    tenant = registry.define_unit('smoot', '67 inches')
+    assert tenant.definition('smoot') == '67 inches'
+    assert tenant.dependents('inches') == ('smoot',)
+    assert UnitParser(registry=tenant).convert('2 smoots', 'inches') == 134
+    assert registry.get('smoot') is None
+
+
+def test_define_unit_removes_units():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    removed = registry.define_unit('calorie', None)
+    assert removed.get('calorie') is None
+    assert 'calories' not in removed.units
+    assert len(removed.units) == len(registry.units) - 2
+    assert registry.get('calorie') is not None
+    restored = removed.define_unit('calorie', '4.184 joule')
+    assert restored.get('calories') == registry.get('calories')
+
+
+def test_removed_units_leave_dimension_lookups() -> None:
+    from unit_parser import UnitRegistry
+
+    removed = UnitRegistry.from_file().define_unit('inches', None)
+    assert 'inches' not in removed.names_with_signature(removed.units['feet'].packed)
+    up = UnitParser(registry=removed)
+    assert 'inches' not in up.compatible_units('feet')
+    assert 'inch' in up.compatible_units('feet')
+    assert 'inches' not in up.factor_matrix('feet').units
+    precomputed = UnitParser(registry=removed, precompute_factors=True)
+    assert precomputed.convert('1 foot', 'inch') == pytest.approx(12)
+
+
+@pytest.mark.parametrize(
+    ('name', 'definition', 'message'),
+    [
+        ('meter', None, 'Unit meter is used by: m, kilometer'),
+        ('smoot', None, 'Unit not recognized: smoot'),
+        ('meter', '1 foot', 'Circular unit definitions: meter -> foot -> meter'),
+        ('foot', '3 smoots', 'Unit not recognized'),
+        ('foot', '3 feet extra', 'Syntax error'),
+    ],
+)
+def test_define_unit_invalid(name: str, definition: str | None, message: str) -> None:
+    from unit_parser import UnitRegistry
+
+    with pytest.raises(ValueError, match=message):
+        UnitRegistry.from_file().define_unit(name, definition)
+
+
+def test_overlay_redefinitions_propagate():
+    from unit_parser import UnitRegistry
+
+    registry = UnitRegistry.from_file()
+    tenant = registry.overlay(['inch: 2.5 centimeters', 'smoot: 67 inches'])
+    up = UnitParser(registry=tenant)
+    assert up.convert('1 gallon', 'inch_cubed') == pytest.approx(231)
+    assert up.convert('1 gallon', 'meters_cubed') == pytest.approx(231 * 0.025**3)
+    assert up.convert('1 smoot', 'meters') == pytest.approx(67 * 0.025)
+    # A definition referring to its own name refers to its previous value.
+    nested = tenant.overlay(['smoot: 1 kilosmoot'])
+    up = UnitParser(registry=nested)
+    assert up.convert('1 smoot', 'meters') == pytest.approx(67 * 25)
+
+
+def test_define_unit_self_reference_updates_prefixed_dependents():
+    """Dependents see the new value of a unit through its prefixes."""
+    from unit_parser import UnitRegistry
+
+    tenant = UnitRegistry.from_file().overlay(
+        ['smoot: 67 inches', 'bigthing: 2 kilosmoot']
+    )
+    up = UnitParser(registry=tenant.define_unit('smoot', '1 kilosmoot'))
+    assert up.convert('1 smoot', 'inches') == pytest.approx(67_000)
+    assert up.convert('1 bigthing', 'smoot') == pytest.approx(2000)
+
+
+def test_define_unit_round_trip():
+    import pickle
+
+    from unit_parser import UnitRegistry
+
+    metric = UnitRegistry.from_file().define_unit('foot', '0.3 meter')
+    clone = pickle.loads(pickle.dumps(metric))
+    assert clone == metric
+    assert clone.definition('foot') == '0.3 meter'
+    assert clone.definition('feet') == '1 foot'
+    assert set(clone.dependents('foot')) == set(metric.dependents('foot'))
+
+
+# --- packed signatures -------------------------------------------------------
+
+
+def test_packed_signature_round_trip():
+    from unit_parser import signature
+
+    sig = (1, -2, 0, signature.MIN_EXPONENT, signature.MAX_EXPONENT, 3)
+    assert signature.unpack(signature.pack(sig), len(sig)) == sig
+
+
+def test_packed_signature_arithmetic():
+    from unit_parser import signature
+
+    a, b = (1, -2, 0), (-3, 5, 0)
+    product = signature.multiply(signature.pack(a), signature.pack(b), 3)
+    quotient = signature.divide(signature.pack(a), signature.pack(b), 3)
+    assert signature.unpack(product, 3) == (-2, 3, 0)
+    assert signature.unpack(quotient, 3) == (4, -7, 0)
+
+
+@pytest.mark.parametrize('position', [0, 1, 2])
+def test_packed_signature_overflow(position):
+    from unit_parser import signature
+
+    big = [0, 0, 0]
+    big[position] = signature.MAX_EXPONENT
+    small = [0, 0, 0]
+    small[position] = signature.MIN_EXPONENT
+    with pytest.raises(ValueError):
+        signature.multiply(signature.pack(tuple(big)), signature.pack((1, 1, 1)), 3)
+    with pytest.raises(ValueError):
+        signature.divide(signature.pack(tuple(small)), signature.pack((1, 1, 1)), 3)
+    with pytest.raises(ValueError):
+        signature.pack(tuple(x * 2 for x in big))
+
+
+def test_packed_signature_equality_matches_tuple():
+    """Compatibility checks compare packed signatures."""
+    up = UnitParser()
+    newton = up._signature_and_quantity_for_unit('newton')
+    compound = up._signature_and_quantity_for_unit('kilogram_meter_per_second_squared')
+    assert newton.packed == compound.packed
+    assert newton.signature == compound.signature == (1, 1, -2, 0, 0, 0)
+
+
+# --- dimension index ---------------------------------------------------------
+
+
+def test_dimension_of():
+    up = UnitParser()
+    assert up.dimension_of('feet') == (1, 0, 0, 0, 0, 0)
+    assert up.dimension_of('newtons') == up.dimension_of('kg_meter_per_sec_squared')
+
+
+def test_compatible_units_from_table():
+    up = UnitParser()
+    lengths = up.compatible_units('feet')
+    assert {'meter', 'meters', 'foot', 'feet', 'mile', 'parsec'} <= set(lengths)
+    assert 'seconds' not in lengths
+    assert 'liter' in up.compatible_units('meter_cubed')
+
+
+def test_compatible_units_include_cached_compounds():
+    up = UnitParser(cache_size=1)
+    up.convert('1 meter_per_second', 'mph')
+    assert 'meter_per_second' in up.compatible_units('mph')
+    # Evicted from the cache, and thus from the index.
+    up._signature_and_quantity_for_unit('meter_squared')
+    assert 'meter_per_second' not in up.compatible_units('mph')
+    up.cache_clear()
+    assert up.compatible_units('mph') == ['mph', 'mphs']
+
+
+def test_compatible_units_unknown_unit():
+    up = UnitParser()
+    with pytest.raises(ValueError):
+        up.compatible_units('metes')
+
+
+# --- factor matrices ---------------------------------------------------------
+
+
+def test_precomputed_factors_convert():
+    up = UnitParser(precompute_factors=True)
+    assert up.convert('5 feet', 'inches') == pytest.approx(60)
+    assert up.convert(1, 'mile', 'feet') == pytest.approx(5280)
+    # Compound and incompatible units fall back to the general path.
+    assert up.convert('1 meter_per_second', 'km_per_hour') == pytest.approx(3.6)
+    with pytest.raises(ValueError):
+        up.convert('5 feet', 'seconds')
+
+
+def test_factor_matrix_lookup():
+    up = UnitParser(precompute_factors=True)
+    lengths = up.factor_matrix('feet')
+    assert lengths is up.factor_matrix('yards')
+    assert lengths.factor('feet', 'inches') == pytest.approx(12)
+    assert lengths.factor('yard', 'feet') == pytest.approx(3)
+    assert 'seconds' not in lengths.ids
+    with pytest.raises(KeyError):
+        lengths.factor('feet', 'seconds')
+
+
+def test_factor_matrix_on_demand():
+    up = UnitParser()
+    volumes = up.factor_matrix('meter_cubed')
+    assert volumes.factor('liter', 'milliliters') == pytest.approx(1000)
+
+
+def test_factor_matrix_convert_codes():
+    pytest.importorskip('numpy')
+    up = UnitParser(precompute_factors=True)
+    lengths = up.factor_matrix('feet')
+    codes = lengths.encode(['feet', 'yards', 'inches'])
+    result = lengths.convert_codes([1.0, 1.0, 6.0], codes, 'feet')
+    assert result.tolist() == pytest.approx([1, 3, 0.5])
+
+
+# --- batch command-line conversion -------------------------------------------
+
+
+def test_command_line_batch_lines(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    source = tmp_path / 'quantities.txt'
+    source.write_text('5 feet\n1 yard\n\n3 bananas\n2 feet\n')
+    with pytest.raises(SystemExit) as exc:
+        convert_main(['--batch', 'inches', str(source)])
+    assert exc.value.code == 1
+    captured = capsys.readouterr()
+    out = captured.out.split('\n')
+    assert len(out) == 6
+    assert [float(x) for x in (out[0], out[1], out[4])] == pytest.approx([60, 36, 24])
+    assert out[2] == out[3] == ''
+    assert captured.err.startswith('convert: line 4: ')
+
+
+def test_command_line_batch_zero_denominator(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    import io
+
+    with patch.object(sys, 'stdin', io.StringIO('5 feet\n1/0 feet\n3 feet\n')):
+        with pytest.raises(SystemExit) as exc:
+            convert_main(['--batch', 'inches'])
+    assert exc.value.code == 1
+    captured = capsys.readouterr()
+    out = captured.out.split('\n')
+    assert [float(x) for x in (out[0], out[2])] == pytest.approx([60, 36])
+    assert out[1] == out[3] == ''
+    assert captured.err == 'convert: line 2: Invalid format\n'
+
+
+def test_command_line_batch_stdin(capsys: pytest.CaptureFixture[str]) -> None:
+    import io
+
+    with patch.object(sys, 'stdin', io.StringIO('5\n1.5\n')):
+        convert_main(['--batch', 'inches', '--units', 'feet'])
+    assert [float(x) for x in capsys.readouterr().out.split()] == pytest.approx(
+        [60, 18]
+    )
+
+
+def test_command_line_batch_csv(tmp_path: Path) -> None:
+    source = tmp_path / 'data.csv'
+    source.write_text('id,length\na,5 feet\nb,"1 yard"\nc,oops\n')
+    target = tmp_path / 'out.csv'
+    with pytest.raises(SystemExit):
+        convert_main(
+            ['--batch', 'inches', str(source), '-o', str(target)]
+            + ['--format', 'csv', '--column', 'length']
+        )
+    header, *rows = [line.split(',') for line in target.read_text().splitlines()]
+    assert header == ['id', 'length']
+    assert [row[0] for row in rows] == ['a', 'b', 'c']
+    assert [float(row[1]) for row in rows[:2]] == pytest.approx([60, 36])
+    assert rows[2][1] == ''
+
+
+def test_command_line_batch_jsonl(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    import json
+
+    source = tmp_path / 'data.jsonl'
+    source.write_text('{"id": 1, "d": 5}\n{"id": 2, "d": "x"}\nnot json\n')
+    with pytest.raises(SystemExit):
+        convert_main(
+            ['--batch', 'inches', str(source), '--format', 'jsonl']
+            + ['--column', 'd', '--units', 'feet']
+        )
+    captured = capsys.readouterr()
+    lines = captured.out.split('\n')
+    assert json.loads(lines[0]) == {'id': 1, 'd': pytest.approx(60)}
+    assert json.loads(lines[1]) == {'id': 2, 'd': None}
+    assert lines[2] == ''
+    assert 'line 3: invalid JSON' in captured.err
+
+
+def test_command_line_batch_jsonl_huge_integer(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    import json
+
+    source = tmp_path / 'data.jsonl'
+    source.write_text('{"d": 5}\n{"d": 1' + '0' * 400 + '}\n{"d": 1}\n')
+    with pytest.raises(SystemExit) as exc:
+        convert_main(
+            ['--batch', 'inches', str(source), '--format', 'jsonl']
+            + ['--column', 'd', '--units', 'feet']
+        )
+    assert exc.value.code == 1
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert [r['d'] for r in records] == [pytest.approx(60), None, pytest.approx(12)]
+    assert captured.err == 'convert: line 2: Invalid format\n'
+
+
+def test_batch_stream_flushes_on_failure() -> None:
+    import io
+    from collections.abc import Iterator
+
+    from unit_parser.convert import _BatchConverter, _stream
+
+    def lines() -> Iterator[str]:
+        yield '5 feet\n'
+        raise RuntimeError('read failed')
+
+    out = io.StringIO()
+    converter = _BatchConverter(UnitParser(), 'inches')
+    with pytest.raises(RuntimeError):
+        _stream(converter, lines(), out, io.StringIO())
+    assert float(out.getvalue()) == pytest.approx(60)
+
+
+def test_command_line_batch_requires_column() -> None:
+    with pytest.raises(SystemExit):
+        convert_main(['--batch', 'inches', '--format', 'csv'])
+
+
+# --- parallel batch conversion -----------------------------------------------
+
+
+def test_command_line_batch_parallel_matches_serial(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    source = tmp_path / 'data.csv'
+    rows = [f'{i},{i} feet' if i % 7 else f'{i},{i} bananas' for i in range(1, 500)]
+    rows[100] = '101,1/0 feet'
+    source.write_text('id,length\n' + '\n'.join(rows) + '\n')
+    args = ['--batch', 'inches', str(source), '--format', 'csv', '--column', 'length']
+
+    with pytest.raises(SystemExit):
+        convert_main(args)
+    serial = capsys.readouterr()
+    with patch('unit_parser.convert._CHUNK_BYTES', 256):
+        with pytest.raises(SystemExit):
+            convert_main(args + ['--jobs', '3'])
+    parallel = capsys.readouterr()
+
+    assert parallel.out == serial.out
+    assert parallel.err == serial.err
+    assert 'convert: line 8: ' in parallel.err
+    assert 'convert: line 102: Invalid format' in parallel.err
+
+
+def test_chunk_ranges_align_to_lines() -> None:
+    import mmap
+
+    from unit_parser.convert import _chunk_ranges
+
+    data = mmap.mmap(-1, 19)
+    data[:] = b'aaaa\nbb\ncccccccc\ndd'
+    ranges = list(_chunk_ranges(data, 0, 3))
+    assert ranges == [(0, 5), (5, 8), (8, 17), (17, 19)]
+    assert list(_chunk_ranges(data, 0, 5)) == [(0, 5), (5, 17), (17, 19)]
+
+
+def test_command_line_batch_parallel_requires_file() -> None:
+    with pytest.raises(SystemExit):
+        convert_main(['--batch', 'inches', '--jobs', '2'])
+
+
+# --- conversion server -------------------------------------------------------
+
+
+def test_server_handle_request() -> None:
+    from unit_parser.server import handle_request
+
+    up = UnitParser()
+    assert float(handle_request(up, '5 feet to inches').split()[1]) == pytest.approx(60)
+    assert float(handle_request(up, '1/2 yard feet').split()[1]) == pytest.approx(1.5)
+    assert handle_request(up, '5 feet seconds').startswith('error ')
+    assert handle_request(up, '5 feet').startswith('error ')
+
+
+def test_server_handle_request_overflow() -> None:
+    from unit_parser.server import handle_request
+
+    up = UnitParser()
+    huge = '1' * 400 + '/3'
+    assert handle_request(up, f'{huge} feet inches') == 'error Invalid format\n'
+    with patch.object(up, 'convert', side_effect=OverflowError('too large')):
+        assert handle_request(up, '5 feet inches') == 'error too large\n'
+
+
+def test_server_pipelined_requests(tmp_path: Path) -> None:
+    import asyncio
+
+    from unit_parser.server import start_server
+
+    path = str(tmp_path / 'convert.sock')
+
+    async def run() -> list[str]:
+        server = await start_server(path, UnitParser())
+        async with server:
+            clients = [await asyncio.open_unix_connection(path) for _ in range(3)]
+            for i, (_, writer) in enumerate(clients):
+                writer.write(f'{i} feet inches\n5 bananas inches\n1 yard to'.encode())
+                writer.write(b' feet\n')
+                writer.write_eof()
+            responses = []
+            for reader, writer in clients:
+                responses.append((await reader.read()).decode())
+                writer.close()
+            return responses
+
+    responses = asyncio.run(run())
+    for i, response in enumerate(responses):
+        first, second, third = response.splitlines()
+        assert float(first.split()[1]) == pytest.approx(12 * i)
+        assert second.startswith('error ')
+        assert float(third.split()[1]) == pytest.approx(3)
+
+
+def test_server_unterminated_invalid_utf8(tmp_path: Path) -> None:
+    import asyncio
+
+    from unit_parser.server import start_server
+
+    path = str(tmp_path / 'convert.sock')
+
+    async def run() -> str:
+        server = await start_server(path, UnitParser())
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'1 yard feet\n5 f\xffeet inches')
+            writer.write_eof()
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+
+    first, second = asyncio.run(run()).splitlines()
+    assert float(first.split()[1]) == pytest.approx(3)
+    assert second.startswith('error ')
+
+
+# --- asyncio bulk conversion -------------------------------------------------
+
+
+def test_aconvert_many_matches_convert_many() -> None:
+    import asyncio
+
+    np = pytest.importorskip('numpy')
+    from unit_parser.aio import AsyncUnitParser
+
+    up = UnitParser()
+    values = np.arange(20.0).reshape(4, 5)
+    units = np.array(['feet', 'inches', 'yards', 'miles'] * 5).reshape(4, 5)
+    aup = AsyncUnitParser(up, chunk_size=3, max_concurrency=2)
+
+    async def run() -> tuple[object, object, object]:
+        return (
+            await aup.aconvert_many(values, units, 'meters'),
+            await aup.aconvert_many(values, 'feet', 'meters'),
+            await aup.aconvert_many([1.0, 2.0], 'feet', 'inches'),
+        )
+
+    chunked, single, inline = asyncio.run(run())
+    np.testing.assert_allclose(chunked, up.convert_many(values, units, 'meters'))
+    np.testing.assert_allclose(single, up.convert_many(values, 'feet', 'meters'))
+    np.testing.assert_allclose(inline, [12.0, 24.0])
+
+
+def test_aconvert_many_processes() -> None:
+    import asyncio
+
+    np = pytest.importorskip('numpy')
+    from unit_parser.aio import AsyncUnitParser
+
+    async def run() -> object:
+        async with AsyncUnitParser(processes=2, chunk_size=4) as aup:
+            result = await aup.aconvert_many(np.ones(10), 'feet', 'inches')
+            with pytest.raises(ValueError):
+                await aup.aconvert_many(np.ones(10), 'feet', 'seconds')
+            return result
+
+    np.testing.assert_allclose(asyncio.run(run()), np.full(10, 12.0))
+
+
+def test_async_unit_parser_validates_arguments() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from unit_parser.aio import AsyncUnitParser
+
+    with pytest.raises(ValueError):
+        AsyncUnitParser(chunk_size=0)
+    with pytest.raises(ValueError):
+        AsyncUnitParser(max_concurrency=0)
+    with ThreadPoolExecutor() as executor:
+        with pytest.raises(ValueError):
+            AsyncUnitParser(executor=executor, processes=2)
+
+
+# --- thread safety -----------------------------------------------------------
+
+
+def test_striped_cache() -> None:
+    from unit_parser.cache import StripedLRUCache
+
+    assert len(StripedLRUCache[int](2)._stripes) == 1
+    assert len(StripedLRUCache[int](100_000)._stripes) == 16
+    cache = StripedLRUCache[int](1000, stripes=4)
+    assert sum(stripe.info().maxsize for stripe in cache._stripes) == 1000
+    for i in range(2000):
+        cache.put(str(i), i)
+    assert cache.get('1999') == 1999
+    info = cache.info()
+    assert info.currsize <= 1000
+    assert (info.hits, info.maxsize) == (1, 1000)
+    cache.clear()
+    assert cache.info() == (0, 0, 1000, 0)
+
+
+def test_striped_cache_index() -> None:
+    from unit_parser.cache import StripedLRUCache
+
+    cache = StripedLRUCache[int](200, stripes=2, index=lambda v: v % 3 or None)
+    for i in range(400):
+        cache.put(str(i), i)
+    kept = {int(key) for key in cache.indexed(1)}
+    assert kept and all(cache.get(str(i)) == i for i in kept)
+    assert {i for i in range(400) if i % 3 == 1 and cache.get(str(i))} == kept
+    assert cache.indexed(None) == []
+    cache.put('1', 2)
+    assert '1' not in cache.indexed(1)
+    cache.clear()
+    assert cache.indexed(2) == []
+
+
+def test_shared_parser_across_threads() -> None:
+    """Concurrent conversions with cache churn give consistent results."""
+    from concurrent.futures import ThreadPoolExecutor
+    from itertools import product
+
+    up = UnitParser(cache_size=64)
+    lengths = ['meter', 'foot', 'inch', 'yard', 'mile', 'km', 'cm', 'mm', 'ft', 'm']
+    masses = ['kilogram', 'gram', 'lbm', 'kg']
+    times = ['second', 'minute', 'hour', 'day', 'week']
+    units = ['_'.join(parts) for parts in product(lengths, masses, ['per'], times)]
+    assert len(set(units)) == 200
+
+    def work(offset: int) -> None:
+        for i in range(500):
+            unit = units[(i + offset) % len(units)]
+            assert up.convert(f'1 {unit}', unit) == pytest.approx(1)
+            assert up.multiply('2 meters', '3 meters', 'meter_squared') == 6
+            # Reads the index while other threads update it.
+            up.compatible_units(unit)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(work, range(0, 800, 100)))
+    info = up.cache_info()
+    assert info.currsize <= 64
+    # Far more misses than distinct units: entries were evicted and
+    # resolved again.
+    assert info.misses > 2 * len(units)
+
+
+# --- non-raising batch conversion --------------------------------------------
+
+
+def test_try_convert_quantities_error_codes() -> None:
+    np = pytest.importorskip('numpy')
+    from unit_parser import ErrorCode
+
+    up = UnitParser()
+    rows = [
+        '1 foot',
+        'oops',
+        '5 sec',
+        '2 meter_per_per_second',
+        '3 bogus',
+        '1 squared_meter',
+        '2 feet',
+        '1' * 400 + '/3 feet',
+    ]
+    result = up.try_convert_quantities(rows, 'inches')
+    assert result.errors.tolist() == [
+        ErrorCode.OK,
+        ErrorCode.INVALID_FORMAT,
+        ErrorCode.INCOMPATIBLE_UNITS,
+        ErrorCode.MULTIPLE_PER,
+        ErrorCode.UNKNOWN_UNIT,
+        ErrorCode.INVALID_KEYWORD,
+        ErrorCode.OK,
+        ErrorCode.INVALID_FORMAT,
+    ]
+    np.testing.assert_allclose(result.values[[0, 6]], [12, 24])
+    assert np.isnan(result.values[[1, 2, 3, 4, 5, 7]]).all()
+    with pytest.raises(ValueError):
+        up.try_convert_quantities(rows, 'bogus')
+
+
+def test_try_convert_many_error_codes() -> None:
+    np = pytest.importorskip('numpy')
+    from unit_parser import ErrorCode
+
+    up = UnitParser()
+    result = up.try_convert_many(
+        np.ones((2, 2)), [['feet', 'sec'], ['furlongs_per', 'inch']], 'feet'
+    )
+    assert result.errors.tolist() == [
+        [ErrorCode.OK, ErrorCode.INCOMPATIBLE_UNITS],
+        [ErrorCode.UNKNOWN_UNIT, ErrorCode.OK],
+    ]
+    assert result.values[1, 1] == pytest.approx(1 / 12)
+    single = up.try_convert_many([1.0, 2.0], 'sec', 'feet')
+    assert single.errors.tolist() == [ErrorCode.INCOMPATIBLE_UNITS] * 2
+    assert np.isnan(single.values).all()
+
+
+def test_failed_specifications_keep_messages() -> None:
+    """Cached failures still raise with their original message."""
+    up = UnitParser()
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Multiple uses of keyword 'per'"):
+            up.convert('1 meter_per_second_per_second', 'meters')
+
+
+# --- instrumentation ---------------------------------------------------------
+
+
+def test_instrumentation_counters() -> None:
+    up = UnitParser()
+    up.convert('5 feet', 'meters')  # Not counted: instrumentation is off.
+    up.enable_instrumentation()
+    up.convert('5 feet', 'meters')
+    for _ in range(2):
+        up.convert('1 meter_per_second', 'km_per_hour')
+    for bad in ['oops', '5 bogus', '5 sec']:
+        with pytest.raises(ValueError):
+            up.convert(bad, 'feet')
+    up.add('1 foot', '2 inches', 'feet')
+
+    snapshot = up.instrumentation_snapshot(top_n=2)
+    assert snapshot['calls']['convert']['count'] == 6
+    assert snapshot['calls']['add']['count'] == 1
+    assert snapshot['calls']['convert']['seconds'] > 0
+    assert snapshot['resolution']['compound_parses'] == 3
+    assert snapshot['resolution']['compound_lookups'] == 5
+    assert snapshot['top_units'][0] == ('feet', 3)
+    assert snapshot['errors'] == {
+        'INVALID_FORMAT': 1,
+        'UNKNOWN_UNIT': 1,
+        'INCOMPATIBLE_UNITS': 1,
+    }
+
+
+def test_instrumentation_counts_batch_errors() -> None:
+    pytest.importorskip('numpy')
+    up = UnitParser()
+    up.enable_instrumentation()
+    up.try_convert_quantities(['1 foot', 'oops', '2 sec', '3 sec'], 'feet')
+    assert up.instrumentation_snapshot()['errors'] == {
+        'INVALID_FORMAT': 1,
+        'INCOMPATIBLE_UNITS': 2,
+    }
+
+
+def test_instrumentation_without_numpy() -> None:
+    up = UnitParser()
+    with patch.dict(sys.modules, {'numpy': None}):
+        up.enable_instrumentation()
+        assert up.convert('1 foot', 'inches') == pytest.approx(12)
+        with pytest.raises(ImportError, match='NumPy'):
+            up.try_convert_quantities(['1 foot'], 'inches')
+    assert up.instrumentation_snapshot()['calls']['convert']['count'] == 1
+
+
+def test_instrumentation_bounds_unit_counts() -> None:
+    from unit_parser.instrumentation import Instrumentation
+
+    inst = Instrumentation(max_units=2)
+    for _ in range(3):
+        inst.record_resolution('feet', True)
+    for i in range(100):
+        inst.record_resolution(f'unit{i}', False)
+    assert len(inst.units) <= 4
+    assert inst.units['feet'] == 3
+    assert inst.compound_lookups == 100
+    with pytest.raises(ValueError):
+        Instrumentation(max_units=0)
+
+
+def test_instrumentation_disable() -> None:
+    up = UnitParser()
+    with pytest.raises(ValueError):
+        up.instrumentation_snapshot()
+    up.enable_instrumentation()
+    up.disable_instrumentation()
+    assert 'convert' not in vars(up)
+    assert '_resolve' not in vars(up)
+    assert up.convert('1 foot', 'inches') == pytest.approx(12)
+    with pytest.raises(ValueError):
+        up.instrumentation_snapshot()
+
+
+# --- compiled expressions ----------------------------------------------------
+
+
+def test_compile_expression() -> None:
+    up = UnitParser()
+    pressure = up.compile(
+        'm * a / A',
+        m='kg',
+        a='meters_per_second_squared',
+        A='meters_squared',
+        out='psi',
+    )
+    assert list(pressure.units) == ['m', 'a', 'A']
+    expected = up.convert(1000 * 9.8, 'pascal', 'psi')
+    assert pressure(m=1000, a=9.8, A=1) == pytest.approx(expected)
+    assert pressure(1000, 9.8, 2) == pytest.approx(expected / 2)
+
+    energy = up.compile('0.5 * m * (v * v)', m='lbm', v='miles_per_hour', out='joule')
+    mass = up.convert(1, 'lbm', 'kg')
+    speed = up.convert(60, 'miles_per_hour', 'meters_per_second')
+    assert energy(1, 60) == pytest.approx(0.5 * mass * speed**2)
+
+
+def test_compile_expression_numpy() -> None:
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    speed = up.compile('d / t', d='miles', t='hours', out='meters_per_second')
+    result = speed(np.array([60.0, 120.0]), 1.0)
+    np.testing.assert_allclose(result, [26.8224, 53.6448])
+
+
+@pytest.mark.parametrize(
+    ('expression', 'units'),
+    [
+        ('m + a', {'m': 'kg', 'a': 'kg'}),
+        ('m ** 2', {'m': 'kg'}),
+        ('__import__("os")', {}),
+        ('m.real', {'m': 'kg'}),
+        ('m *', {'m': 'kg'}),
+        ('m * a', {'m': 'kg'}),
+        ('m', {'m': 'kg', 'z': 'kg'}),
+        ('m', {'m': 'feet'}),
+        ('m', {'m': 'bogus'}),
+    ],
+)
+def test_compile_expression_invalid(expression: str, units: dict[str, str]) -> None:
+    up = UnitParser()
+    with pytest.raises(ValueError):
+        up.compile(expression, out='kg', **units)
+
+
+# --- quantities --------------------------------------------------------------
+
+
+def test_quantity_arithmetic() -> None:
+    up = UnitParser()
+    distance = up.quantity('100 miles') + up.quantity(5, 'km')
+    speed = distance / up.quantity('2 hours')
+    assert speed.to('meters_per_second') == pytest.approx((160934.4 + 5000) / 7200)
+    assert speed.dimension == up.dimension_of('meters_per_second')
+
+    force = up.quantity('2 kg') * up.quantity(9.8, 'meters_per_second_squared')
+    assert force.to('newtons') == pytest.approx(19.6)
+    assert (2 * up.quantity('3 feet') - up.quantity('1 yard')).to('feet') == (
+        pytest.approx(3)
+    )
+    frequency = 1 / up.quantity('0.5 sec')
+    assert (frequency * up.quantity('1 minute')).to('unitless') == pytest.approx(120)
+    assert (-up.quantity('1 foot') / 2).to('inches') == pytest.approx(-6)
+
+
+def test_quantity_errors() -> None:
+    up = UnitParser()
+    length = up.quantity('1 foot')
+    with pytest.raises(ValueError):
+        length + up.quantity('1 sec')
+    with pytest.raises(ValueError):
+        length.to('seconds')
+    with pytest.raises(TypeError):
+        length + 1
+    with pytest.raises(ValueError):
+        up.quantity(5)  # type: ignore[call-overload]
+
+
+def test_quantity_numpy() -> None:
+    np = pytest.importorskip('numpy')
+    up = UnitParser()
+    lengths = up.quantity(np.array([1.0, 2.0]), 'feet') + up.quantity('6 inches')
+    np.testing.assert_allclose(lengths.to('inches'), [18, 30])
+
+
+# --- hot reload --------------------------------------------------------------
+
+
+def _edit(path: Path, text: str) -> None:
+    """Rewrite ``path``, making sure its modification time changes."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def test_reloading_parser_picks_up_changes(tmp_path: Path) -> None:
+    from unit_parser import ReloadingUnitParser
+
+    path = tmp_path / 'units.txt'
+    path.write_text('m: [1]\nwidget: 3 m\n')
+    up = ReloadingUnitParser(path, interval=None)
+    before = up.parser
+    assert up.convert('2 widgets', 'm') == 6
+    assert not up.check()
+
+    _edit(path, 'm: [1]\nwidget: 4 m\n')
+    assert up.check()
+    assert up.convert('2 widgets', 'm') == 8
+    assert up.parser is not before
+    assert up.reloads == 1
+    # A parser fetched before the reload keeps its units.
+    assert before.convert('2 widgets', 'm') == 6
+
+
+def test_reloading_parser_keeps_parser_on_errors(tmp_path: Path) -> None:
+    from unit_parser import ReloadingUnitParser
+
+    path = tmp_path / 'units.txt'
+    path.write_text('m: [1]\nwidget: 3 m\n')
+    errors: list[Exception] = []
+    up = ReloadingUnitParser(path, interval=None, on_error=errors.append)
+
+    _edit(path, 'm: [1]\nwidget: 3 blorps\n')
+    assert not up.check()
+    assert not up.check()
+    path.unlink()
+    assert not up.check()
+    assert [type(e) for e in errors] == [ValueError, FileNotFoundError]
+    assert up.last_error is errors[-1]
+    assert up.convert('1 widget', 'm') == 3
+
+    path.write_text('m: [1]\nwidget: 5 m\n')
+    assert up.check()
+    assert up.last_error is None
+    assert up.convert('1 widget', 'm') == 5
+
+
+def test_reloading_parser_overlay_on_base(tmp_path: Path) -> None:
+    from unit_parser import ReloadingUnitParser, UnitRegistry
+
+    base = UnitRegistry.from_file()
+    path = tmp_path / 'tenant.txt'
+    path.write_text('smoot: 67 inches\n')
+    up = ReloadingUnitParser(path, interval=None, base=base, cache_size=0)
+    assert up.registry.base is base
+    assert up.cache_info().maxsize == 0
+    _edit(path, 'smoot: 1 meter\n')
+    assert up.check()
+    assert up.convert('3 smoots', 'km') == pytest.approx(0.003)
+
+
+def test_reloading_parser_background_thread(tmp_path: Path) -> None:
+    import time
+
+    from unit_parser import ReloadingUnitParser
+
+    path = tmp_path / 'units.txt'
+    path.write_text('m: [1]\nwidget: 3 m\n')
+    with ReloadingUnitParser(path, interval=0.01) as up:
+        _edit(path, 'm: [1]\nwidget: 4 m\n')
+        deadline = time.monotonic() + 5
+        while up.reloads == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert up.convert('1 widget', 'm') == 4
+    assert up._thread is None
+
+
+def test_reloading_parser_survives_arithmetic_errors(tmp_path: Path) -> None:
+    """Bad numbers, and an on_error that raises, do not stop the thread."""
+    import time
+
+    from unit_parser import ReloadingUnitParser
+
+    path = tmp_path / 'units.txt'
+    path.write_text('m: [1]\nwidget: 3 m\n')
+    errors: list[Exception] = []
+
+    def on_error(error: Exception) -> None:
+        errors.append(error)
+        raise RuntimeError('handler failed')
+
+    with ReloadingUnitParser(path, interval=0.01, on_error=on_error) as up:
+        for bad in ['1/0', '1' * 400 + '/3']:
+            _edit(path, f'm: [1]\nwidget: {bad} m\n')
+            deadline = time.monotonic() + 5
+            while up.last_error is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert isinstance(up.last_error, ValueError)
+            assert 'line: 2' in str(up.last_error)
+            _edit(path, 'm: [1]\nwidget: 4 m\n')
+            deadline = time.monotonic() + 5
+            while up.last_error is not None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert up.convert('1 widget', 'm') == 4
+        assert up._thread is not None and up._thread.is_alive()
+    assert len(errors) == 2
+    assert up.reloads == 2
+
+
+def test_reloading_parser_in_flight_conversions(tmp_path: Path) -> None:
+    """Conversions racing with reloads only ever see complete tables."""
+    import threading
+
+    from unit_parser import ReloadingUnitParser
+
+    path = tmp_path / 'units.txt'
+    path.write_text('m: [1]\nwidget: 3 m\ngadget: 3 widget\n')
+    up = ReloadingUnitParser(path, interval=None)
+    results = set()
+    done = threading.Event()
+
+    def convert() -> None:
+        while not done.is_set():
+            results.add(up.convert('1 gadget', 'm'))
+
+    worker = threading.Thread(target=convert)
+    worker.start()
+    try:
+        for i in range(20):
+            _edit(path, f'm: [1]\nwidget: {3 + i % 2} m\ngadget: 3 widget\n')
+            assert up.check()
+    finally:
+        done.set()
+        worker.join()
+    assert results <= {9.0, 12.0}
+
+
+# --- benchmarks --------------------------------------------------------------
+
+
+def test_benchmark_compare_statuses() -> None:
+    from benchmarks.suite import compare
+
+    baseline = {name: {'median': 1.0} for name in ('a', 'b', 'c', 'd', 'e')}
+    medians = {'a': 1.25, 'b': 1.5, 'c': 0.75, 'd': 0.5, 'e': 1.0, 'f': 1.0}
+    results = {name: {'median': median} for name, median in medians.items()}
+    assert compare(results, baseline, threshold=0.25) == {
+        'a': (1.25, 'ok'),
+        'b': (1.5, 'regressed'),
+        'c': (0.75, 'ok'),
+        'd': (0.5, 'improved'),
+        'e': (1.0, 'ok'),
+        'f': (None, 'new'),
+    }
+
+
+def test_benchmark_run_smoke() -> None:
+    from benchmarks.suite import run
+
+    lines: list[str] = []
+    results = run(['resolve_known'], repeat=1, log=lines.append)
+    assert list(results) == ['resolve_known']
+    assert results['resolve_known']['number'] >= 1
+    assert 0 < results['resolve_known']['min'] <= results['resolve_known']['median']
+    assert lines[0].startswith('resolve_known')
@@ -1,5 +1,41 @@
 """Unit parser package."""
 
-from unit_parser.units import UnitParser
+from typing import TYPE_CHECKING, Any
 
-__all__ = ['UnitParser']
+from unit_parser.converter import Converter
+from unit_parser.errors import ErrorCode
+from unit_parser.expression import CompiledExpression
+from unit_parser.matrix import FactorMatrix
+from unit_parser.quantity import Quantity
+from unit_parser.registry import UnitRegistry
+from unit_parser.reloading import ReloadingUnitParser
+from unit_parser.shared import default
+from unit_parser.units import ConversionResults, ParsedQuantities, UnitParser
+
+if TYPE_CHECKING:
+    from unit_parser.aio import AsyncUnitParser
+
+__all__ = [
+    'AsyncUnitParser',
+    'CompiledExpression',
+    'ConversionResults',
+    'Converter',
+    'ErrorCode',
+    'FactorMatrix',
+    'ParsedQuantities',
+    'Quantity',
+    'ReloadingUnitParser',
+    'UnitParser',
+    'UnitRegistry',
+    'default',
+]
+
+
+def __getattr__(name: str) -> Any:
+    # AsyncUnitParser needs asyncio and process pools, which take longer
+    # to import than the rest of the package; load them on first use.
+    if name == 'AsyncUnitParser':
+        from unit_parser.aio import AsyncUnitParser
+
+        return AsyncUnitParser
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,3 @@
+"""Messages for optional dependencies."""
+
+NUMPY_REQUIRED = '{} requires NumPy; install it with: pip install "unit_parser[numpy]"'
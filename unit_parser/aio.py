@@ -0,0 +1,191 @@
+"""asyncio front end for bulk conversions.
+
+``UnitParser.convert_many`` runs synchronously; called from a coroutine
+on a large array, it blocks the event loop until it finishes.
+``AsyncUnitParser.aconvert_many`` converts small arrays inline, where
+the overhead of an executor would dominate, and splits large ones into
+chunks that are converted on a thread or process executor, so the
+event loop keeps serving other tasks in the meantime.
+
+Requires NumPy (``pip install "unit_parser[numpy]"``).
+
+Usage
+-----
+> import numpy as np
+> from unit_parser.aio import AsyncUnitParser
+> aup = AsyncUnitParser(chunk_size=100_000)
+> await aup.aconvert_many(np.ones(1_000_000), "feet", "meters")
+ array([0.3048, 0.3048, 0.3048, ..., 0.3048, 0.3048, 0.3048])
+
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+from ._optional import NUMPY_REQUIRED
+from .shared import default
+from .units import UnitParser
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import ArrayLike, NDArray
+
+# Parser of a worker process, set by ``_init_worker``.
+_worker_parser: UnitParser | None = None
+
+
+def _init_worker(parser: UnitParser) -> None:
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _convert_in_worker(
+    values: 'NDArray[np.float64]',
+    units: 'str | NDArray[np.str_]',
+    desired_units: str,
+) -> 'NDArray[np.float64]':
+    assert _worker_parser is not None
+    return _worker_parser.convert_many(values, units, desired_units)
+
+
+class AsyncUnitParser:
+    """Converts arrays of quantities without blocking the event loop.
+
+    Parameters
+    ----------
+    parser : UnitParser, optional
+        Parser to convert with. Defaults to the shared parser for the
+        built-in units (see ``unit_parser.default``).
+    executor : concurrent.futures.Executor, optional
+        Executor to convert large arrays on. Defaults to the default
+        executor of the running event loop, a thread pool.
+    processes : int, optional
+        If given, convert large arrays on a pool of this many worker
+        processes instead, owned by this object. Each worker receives
+        the parser once, when it starts. Release the pool with
+        ``close``, or use the object as an async context manager.
+    chunk_size : int, optional
+        Number of elements converted per executor task. Arrays with at
+        most this many elements are converted inline. Defaults to
+        65536.
+    max_concurrency : int, optional
+        Maximum number of chunks in flight on the executor at once,
+        across all calls on this object. Defaults to 4.
+
+    Raises
+    ------
+    ValueError
+        If both ``executor`` and ``processes`` are given, or if
+        ``chunk_size`` or ``max_concurrency`` is not positive.
+
+    """
+
+    def __init__(
+        self,
+        parser: UnitParser | None = None,
+        *,
+        executor: Executor | None = None,
+        processes: int | None = None,
+        chunk_size: int = 65536,
+        max_concurrency: int = 4,
+    ) -> None:
+        if executor is not None and processes is not None:
+            raise ValueError('Pass either executor or processes, not both.')
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive.')
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be positive.')
+        self.parser = parser if parser is not None else default()
+        self.chunk_size = chunk_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._owns_executor = processes is not None
+        if processes is not None:
+            executor = ProcessPoolExecutor(
+                processes, initializer=_init_worker, initargs=(self.parser,)
+            )
+        self._executor = executor
+
+    async def __aenter__(self) -> 'AsyncUnitParser':
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the process pool, if this object owns one."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+
+    async def aconvert_many(
+        self,
+        values: 'ArrayLike',
+        units: 'str | ArrayLike',
+        desired_units: str,
+    ) -> 'NDArray[np.float64]':
+        """Convert an array of quantities to the desired units.
+
+        Equivalent to ``UnitParser.convert_many``, but arrays larger
+        than ``chunk_size`` are converted on the executor, in chunks of
+        ``chunk_size`` elements, with at most ``max_concurrency``
+        chunks in flight.
+
+        Raises
+        ------
+        ValueError
+            If any unit is incompatible with ``desired_units``, or if
+            ``units`` and ``values`` have different shapes.
+
+        """
+        try:
+            import numpy as np
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(NUMPY_REQUIRED.format('aconvert_many')) from e
+
+        quantities = np.asarray(values, dtype=np.float64)
+        if quantities.size <= self.chunk_size:
+            return self.parser.convert_many(quantities, units, desired_units)
+
+        flat_units: str | NDArray[np.str_]
+        if isinstance(units, str):
+            flat_units = units
+        else:
+            unit_array = np.asarray(units)
+            if unit_array.shape != quantities.shape:
+                raise ValueError('values and units must have the same shape.')
+            flat_units = unit_array.ravel()
+        flat = quantities.ravel()
+
+        loop = asyncio.get_running_loop()
+
+        async def convert_chunk(start: int) -> 'NDArray[np.float64]':
+            stop = start + self.chunk_size
+            chunk_units = (
+                flat_units if isinstance(flat_units, str) else flat_units[start:stop]
+            )
+            if self._owns_executor:
+                call = functools.partial(
+                    _convert_in_worker, flat[start:stop], chunk_units, desired_units
+                )
+            else:
+                call = functools.partial(
+                    self.parser.convert_many,
+                    flat[start:stop],
+                    chunk_units,
+                    desired_units,
+                )
+            async with self._semaphore:
+                return await loop.run_in_executor(self._executor, call)
+
+        chunks = await asyncio.gather(
+            *(convert_chunk(start) for start in range(0, flat.size, self.chunk_size))
+        )
+        result: NDArray[np.float64] = np.concatenate(chunks).reshape(quantities.shape)
+        return result
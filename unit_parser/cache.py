@@ -0,0 +1,201 @@
+"""Bounded memoization of resolved unit specifications."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, NamedTuple, TypeVar
+
+V = TypeVar('V')
+
+
+class CacheInfo(NamedTuple):
+    """Hit/miss statistics of a unit specification cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[V]):
+    """Least-recently-used cache with a fixed capacity.
+
+    Not thread-safe; see ``StripedLRUCache``.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries retained. When the cache is full,
+        inserting a new entry evicts the least recently used one. A
+        maxsize of 0 disables caching entirely.
+    index : callable, optional
+        Function mapping a value to a tag, or to None. If given, the
+        keys of the entries are also indexed by the tags of their
+        values, in insertion order; see ``indexed``.
+
+    """
+
+    def __init__(
+        self, maxsize: int, index: Callable[[V], Hashable | None] | None = None
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError('Cache size must be non-negative.')
+        self._maxsize = maxsize
+        self._data: OrderedDict[str, V] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._index_of = index
+        # Keys by tag (as ordered sets), kept in step with _data.
+        self._index: dict[Hashable, dict[str, None]] = {}
+
+    def get(self, key: str) -> V | None:
+        """Return the entry for ``key``, or None, updating statistics."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: str, value: V) -> tuple[str, V] | None:
+        """Insert ``value`` under ``key``, evicting the oldest entry if full.
+
+        Returns
+        -------
+        tuple[str, V] or None
+            The evicted key and value, if any.
+
+        """
+        if self._maxsize == 0:
+            return None
+        if self._index_of is not None:
+            if key in self._data:
+                self._unindex(key, self._data[key])
+            tag = self._index_of(value)
+            if tag is not None:
+                self._index.setdefault(tag, {})[key] = None
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            evicted = self._data.popitem(last=False)
+            self._unindex(*evicted)
+            return evicted
+        return None
+
+    def _unindex(self, key: str, value: V) -> None:
+        if self._index_of is not None:
+            tag = self._index_of(value)
+            if tag is not None:
+                self._index[tag].pop(key, None)
+
+    def indexed(self, tag: Hashable) -> list[str]:
+        """Return the keys of the entries whose values have ``tag``."""
+        return list(self._index.get(tag, ()))
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        self._data.clear()
+        self._index.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss statistics."""
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data))
+
+
+class StripedLRUCache(Generic[V]):
+    """Thread-safe least-recently-used cache with a fixed capacity.
+
+    Keys are distributed by hash over independent ``LRUCache`` stripes,
+    each guarded by its own lock, so threads looking up different keys
+    rarely contend for the same lock, with or without the GIL. Each
+    stripe evicts its own least recently used entry when full.
+
+    Small caches are not striped: every stripe holds at least
+    ``MIN_STRIPE_SIZE`` entries, so caches of up to that many entries
+    have a single stripe and exact LRU eviction.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries retained. A maxsize of 0 disables
+        caching entirely.
+    stripes : int, optional
+        Maximum number of stripes. Defaults to 16.
+    index : callable, optional
+        Function mapping a value to a tag, or to None; see
+        ``LRUCache``. Each stripe indexes its own entries under its own
+        lock.
+
+    """
+
+    MIN_STRIPE_SIZE = 64
+
+    def __init__(
+        self,
+        maxsize: int,
+        stripes: int = 16,
+        index: Callable[[V], Hashable | None] | None = None,
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError('Cache size must be non-negative.')
+        n = max(1, min(stripes, maxsize // self.MIN_STRIPE_SIZE))
+        self._maxsize = maxsize
+        # Stripe i holds maxsize // n entries, plus one for the first
+        # maxsize % n stripes.
+        self._stripes = [
+            LRUCache[V](maxsize // n + (i < maxsize % n), index) for i in range(n)
+        ]
+        self._locks = [threading.Lock() for _ in range(n)]
+
+    def get(self, key: str) -> V | None:
+        """Return the entry for ``key``, or None, updating statistics."""
+        i = hash(key) % len(self._stripes)
+        with self._locks[i]:
+            return self._stripes[i].get(key)
+
+    def put(self, key: str, value: V) -> tuple[str, V] | None:
+        """Insert ``value`` under ``key``, evicting from its stripe if full.
+
+        Returns
+        -------
+        tuple[str, V] or None
+            The evicted key and value, if any.
+
+        """
+        i = hash(key) % len(self._stripes)
+        with self._locks[i]:
+            return self._stripes[i].put(key, value)
+
+    def indexed(self, tag: Hashable) -> list[str]:
+        """Return the keys of the entries whose values have ``tag``.
+
+        Stripes are visited one at a time, so the result is consistent
+        within each stripe but not across stripes.
+
+        """
+        keys: list[str] = []
+        for lock, stripe in zip(self._locks, self._stripes, strict=True):
+            with lock:
+                keys.extend(stripe.indexed(tag))
+        return keys
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        for lock, stripe in zip(self._locks, self._stripes, strict=True):
+            with lock:
+                stripe.clear()
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss statistics, summed over the stripes."""
+        hits = misses = currsize = 0
+        for lock, stripe in zip(self._locks, self._stripes, strict=True):
+            with lock:
+                info = stripe.info()
+            hits += info.hits
+            misses += info.misses
+            currsize += info.currsize
+        return CacheInfo(hits, misses, self._maxsize, currsize)
@@ -1,12 +1,446 @@
 """Command-line entry point for unit conversion."""
 
 import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any, TextIO
 
 from .units import UnitParser
 
+if TYPE_CHECKING:
+    import mmap
+    from concurrent.futures import Future
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description='Unit conversions')
+# Number of output records accumulated before they are written out.
+_WRITE_BATCH = 4096
+
+# Approximate size of the byte ranges converted by each parallel task.
+_CHUNK_BYTES = 1 << 22
+
+
+class _BatchConverter:
+    """Converts the records of a batch input, one line at a time.
+
+    Parameters
+    ----------
+    parser : UnitParser
+        Parser to convert with.
+    desired_units : str
+        Units to convert every record to.
+    fmt : str
+        Input format: 'lines' (one quantity per line), 'csv', or
+        'jsonl'.
+    column : str, optional
+        Column (csv) or key (jsonl) holding the quantity; required for
+        those formats.
+    units : str, optional
+        Units of every record. If given, records hold plain numbers
+        instead of quantities like "5 feet".
+
+    """
+
+    def __init__(
+        self,
+        parser: UnitParser,
+        desired_units: str,
+        fmt: str = 'lines',
+        column: str | None = None,
+        units: str | None = None,
+    ) -> None:
+        self.parser = parser
+        self.desired_units = desired_units
+        self.fmt = fmt
+        self.column = column
+        self.units = units
+        # Index of the quantity column, once the csv header is known.
+        self.column_index = -1
+
+    def header(self, line: str) -> str:
+        """Process the csv header line, returning the output header.
+
+        Raises
+        ------
+        ValueError
+            If the header has no column named ``column``.
+
+        """
+        fields = next(csv.reader([line]))
+        try:
+            self.column_index = fields.index(self.column or '')
+        except ValueError:
+            raise ValueError(f'column {self.column!r} not found in header') from None
+        return line.rstrip('\r\n') + '\n'
+
+    def _convert_value(self, value: Any) -> float:
+        if self.units is not None:
+            if isinstance(value, bool) or not isinstance(value, int | float | str):
+                raise ValueError('Invalid format')
+            try:
+                quantity = float(value)
+            except OverflowError:
+                # JSON integers are unbounded; float() rejects huge ones.
+                raise ValueError('Invalid format') from None
+            return self.parser.convert(quantity, self.units, self.desired_units)
+        if not isinstance(value, str):
+            raise ValueError('Invalid format')
+        return self.parser.convert(value, self.desired_units)
+
+    def convert(self, line: str) -> tuple[str, str | None]:
+        """Convert one input line.
+
+        Returns
+        -------
+        output : str
+            The output line, including the trailing newline. Lines that
+            fail to convert produce an empty line (lines), an empty
+            field (csv), or null (jsonl).
+        error : str or None
+            Description of the error, if the line failed to convert.
+
+        """
+        text = line.rstrip('\r\n')
+        if self.fmt == 'lines':
+            if not text.strip():
+                return '\n', None
+            try:
+                return f'{self._convert_value(text.strip())}\n', None
+            except ValueError as e:
+                return '\n', str(e)
+
+        if self.fmt == 'jsonl':
+            if not text.strip():
+                return '\n', None
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                return '\n', f'invalid JSON: {e}'
+            if not isinstance(record, dict) or self.column not in record:
+                return text + '\n', f'missing key {self.column!r}'
+            error = None
+            try:
+                record[self.column] = self._convert_value(record[self.column])
+            except ValueError as e:
+                record[self.column] = None
+                error = str(e)
+            return json.dumps(record) + '\n', error
+
+        fields = next(csv.reader([text]), [])
+        if self.column_index >= len(fields):
+            return text + '\n', f'missing column {self.column!r}'
+        error = None
+        try:
+            fields[self.column_index] = str(
+                self._convert_value(fields[self.column_index])
+            )
+        except ValueError as e:
+            fields[self.column_index] = ''
+            error = str(e)
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator='\n').writerow(fields)
+        return buf.getvalue(), error
+
+
+def _stream(
+    converter: _BatchConverter,
+    lines: Iterable[str],
+    out: TextIO,
+    err: TextIO,
+) -> int:
+    """Convert ``lines`` and write the results to ``out``.
+
+    Output is written in batches of ``_WRITE_BATCH`` lines, so memory
+    use is bounded regardless of the input size. Lines converted before
+    an exception are still written. Errors are reported on ``err`` with
+    their line numbers.
+
+    Returns
+    -------
+    int
+        The number of lines that failed to convert.
+
+    """
+    errors = 0
+    pending: list[str] = []
+    line_number = 0
+    try:
+        for line in lines:
+            line_number += 1
+            if line_number == 1 and converter.fmt == 'csv':
+                output = converter.header(line)
+                error = None
+            else:
+                output, error = converter.convert(line)
+            pending.append(output)
+            if error is not None:
+                errors += 1
+                err.write(f'convert: line {line_number}: {error}\n')
+            if len(pending) >= _WRITE_BATCH:
+                out.write(''.join(pending))
+                pending.clear()
+    finally:
+        out.write(''.join(pending))
+    return errors
+
+
+def _chunk_ranges(
+    data: 'mmap.mmap', start: int, size: int
+) -> Iterator[tuple[int, int]]:
+    """Split ``data[start:]`` into byte ranges of roughly ``size`` bytes.
+
+    Every range but the last ends just after a newline, so no line is
+    split between two ranges.
+
+    """
+    end_of_data = len(data)
+    while start < end_of_data:
+        end = start + size
+        if end >= end_of_data:
+            end = end_of_data
+        else:
+            newline = data.find(b'\n', end - 1)
+            end = end_of_data if newline == -1 else newline + 1
+        yield start, end
+        start = end
+
+
+# State of a parallel conversion worker, set by ``_init_worker``.
+_worker: 'tuple[_BatchConverter, mmap.mmap] | None' = None
+
+
+def _init_worker(converter: _BatchConverter, path: str) -> None:
+    import mmap
+
+    global _worker
+    with open(path, 'rb') as f:
+        _worker = (converter, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _convert_range(bounds: tuple[int, int]) -> tuple[str, list[tuple[int, str]], int]:
+    """Convert the lines of one byte range of the input, in a worker.
+
+    Returns
+    -------
+    output : str
+        The output lines.
+    errors : list[tuple[int, str]]
+        Index within the range and description of each failed line.
+    count : int
+        The number of lines in the range.
+
+    """
+    assert _worker is not None
+    converter, data = _worker
+    start, end = bounds
+    lines = data[start:end].decode().split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    outputs = []
+    errors = []
+    for i, line in enumerate(lines):
+        output, error = converter.convert(line)
+        outputs.append(output)
+        if error is not None:
+            errors.append((i, error))
+    return ''.join(outputs), errors, len(lines)
+
+
+def _parallel(
+    converter: _BatchConverter,
+    path: str,
+    out: TextIO,
+    err: TextIO,
+    jobs: int,
+    chunk_size: int | None = None,
+) -> int:
+    """Convert the file at ``path`` using a pool of ``jobs`` processes.
+
+    The file is memory-mapped and split into byte ranges aligned to
+    line boundaries. Each worker process receives the converter (and
+    with it the unit table) once, when it starts, and maps the file
+    itself, so tasks carry only their byte offsets. Results are written
+    in input order, with at most ``2 * jobs`` ranges in flight.
+
+    Returns
+    -------
+    int
+        The number of lines that failed to convert.
+
+    """
+    # Imported here, so that single conversions do not load them.
+    import mmap
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    errors = 0
+    line_number = 0
+    with data:
+        start = 0
+        if converter.fmt == 'csv':
+            start = data.find(b'\n') + 1 or len(data)
+            out.write(converter.header(data[:start].decode()))
+            line_number = 1
+        ranges = _chunk_ranges(data, start, chunk_size or _CHUNK_BYTES)
+
+        with ProcessPoolExecutor(
+            jobs, initializer=_init_worker, initargs=(converter, path)
+        ) as executor:
+            pending: deque[Future[tuple[str, list[tuple[int, str]], int]]] = deque()
+            for bounds in ranges:
+                pending.append(executor.submit(_convert_range, bounds))
+                if len(pending) < 2 * jobs:
+                    continue
+                line_number, errors = _write_range(
+                    pending.popleft().result(), out, err, line_number, errors
+                )
+            while pending:
+                line_number, errors = _write_range(
+                    pending.popleft().result(), out, err, line_number, errors
+                )
+    return errors
+
+
+def _write_range(
+    result: tuple[str, list[tuple[int, str]], int],
+    out: TextIO,
+    err: TextIO,
+    line_number: int,
+    errors: int,
+) -> tuple[int, int]:
+    output, range_errors, count = result
+    out.write(output)
+    for i, error in range_errors:
+        err.write(f'convert: line {line_number + i + 1}: {error}\n')
+    return line_number + count, errors + len(range_errors)
+
+
+def _batch_main(argv: Sequence[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog='convert --batch',
+        description=(
+            'Convert a stream of quantities. Reads newline-delimited '
+            'quantities like "5 feet", or CSV/JSONL records with the '
+            'quantity in a given column, and writes them converted to the '
+            'desired units. Lines that fail to convert are reported on '
+            'stderr and left blank in the output.'
+        ),
+    )
+    parser.add_argument('--batch', action='store_true', required=True)
+    parser.add_argument('desired_units', type=str, help='Desired units')
+    parser.add_argument(
+        'input',
+        nargs='?',
+        type=argparse.FileType('r'),
+        default=sys.stdin,
+        help='Input file (default: stdin)',
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        type=argparse.FileType('w'),
+        default=sys.stdout,
+        help='Output file (default: stdout)',
+    )
+    parser.add_argument(
+        '--format',
+        choices=['lines', 'csv', 'jsonl'],
+        default='lines',
+        help='Input format (default: lines)',
+    )
+    parser.add_argument(
+        '--column', help='CSV column or JSONL key holding the quantities'
+    )
+    parser.add_argument(
+        '--units',
+        help='Units of the input; records then hold plain numbers',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help=(
+            'Number of worker processes (default: 1; 0 for one per CPU). '
+            'Parallel conversion requires an input file.'
+        ),
+    )
+    args = parser.parse_args(argv)
+    if args.format != 'lines' and args.column is None:
+        parser.error(f'--column is required with --format {args.format}')
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs < 0:
+        parser.error('--jobs must be non-negative')
+    if jobs > 1 and args.input is sys.stdin:
+        parser.error('--jobs requires an input file')
+
+    up = UnitParser()
+    converter = _BatchConverter(
+        up, args.desired_units, args.format, args.column, args.units
+    )
+    try:
+        if jobs > 1:
+            args.input.close()
+            errors = _parallel(
+                converter, args.input.name, args.output, sys.stderr, jobs
+            )
+        else:
+            errors = _stream(converter, args.input, args.output, sys.stderr)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        args.output.flush()
+    if errors:
+        sys.exit(1)
+
+
+def _serve_main(argv: Sequence[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog='convert --serve',
+        description=(
+            'Serve conversions over a Unix domain socket. Each request is a '
+            'line like "5 feet to inches", answered by a line "ok VALUE" or '
+            '"error MESSAGE", in request order.'
+        ),
+    )
+    parser.add_argument('--serve', action='store_true', required=True)
+    parser.add_argument('socket', type=str, help='Path of the socket to listen on')
+    args = parser.parse_args(argv)
+
+    from .server import serve
+
+    try:
+        serve(args.socket, UnitParser())
+    finally:
+        with contextlib.suppress(OSError):
+            os.unlink(args.socket)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    if argv is None:
+        argv = sys.argv[1:]
+    if '--batch' in argv:
+        _batch_main(argv)
+        return
+    if '--serve' in argv:
+        _serve_main(argv)
+        return
+
+    parser = argparse.ArgumentParser(
+        description='Unit conversions',
+        epilog=(
+            'See "convert --batch --help" for converting streams of quantities, '
+            'and "convert --serve --help" for running a conversion server.'
+        ),
+    )
     parser.add_argument('quantity', type=float, help='Given quantity')
     parser.add_argument('given_units', type=str, help='Given units')
     parser.add_argument(
@@ -16,7 +450,7 @@ def main() -> None:
         help='Desired units, optionally preceded by the filler word "to"',
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if len(args.desired_units) == 1:
         desired_units = args.desired_units[0]
@@ -0,0 +1,68 @@
+"""Precompiled conversions between a fixed pair of units."""
+
+from typing import Any, overload
+
+
+class Converter:
+    """Callable converting quantities from one unit to another.
+
+    Converters are created by ``UnitParser.converter``, which resolves
+    both units, checks that they are compatible, and computes the
+    scale factor between them once. Applying a converter is then a
+    single multiplication.
+
+    Parameters
+    ----------
+    units : str
+        Source units, like "feet".
+    desired_units : str
+        Destination units, like "meters".
+    factor : float
+        Number of ``desired_units`` per one of ``units``.
+
+    Usage
+    -----
+    > from unit_parser import UnitParser
+    > up = UnitParser()
+    > feet_to_meters = up.converter("feet", "meters")
+    > feet_to_meters(5)
+     1.524
+    > feet_to_meters([1, 2])
+     [0.3048, 0.6096]
+
+    """
+
+    __slots__ = ('units', 'desired_units', 'factor')
+
+    units: str
+    desired_units: str
+    factor: float
+
+    def __init__(self, units: str, desired_units: str, factor: float) -> None:
+        self.units = units
+        self.desired_units = desired_units
+        self.factor = factor
+
+    @overload
+    def __call__(self, value: float, /) -> float: ...
+    @overload
+    def __call__(self, value: list[float] | tuple[float, ...], /) -> list[float]: ...
+    @overload
+    def __call__(self, value: Any, /) -> Any: ...
+    def __call__(self, value: Any, /) -> Any:
+        """Convert a quantity, a list of quantities, or an array.
+
+        Lists and tuples are converted element by element into a new
+        list. Anything else, including NumPy arrays, is simply
+        multiplied by the conversion factor.
+
+        """
+        if isinstance(value, list | tuple):
+            factor = self.factor
+            return [v * factor for v in value]
+        return value * self.factor
+
+    def __repr__(self) -> str:
+        return (
+            f'Converter({self.units!r}, {self.desired_units!r}, factor={self.factor!r})'
+        )
@@ -0,0 +1,29 @@
+"""Error codes reported by the non-raising batch conversions."""
+
+from enum import IntEnum
+from typing import NamedTuple
+
+
+class ErrorCode(IntEnum):
+    """Why a row of a batch conversion failed.
+
+    Batch entry points like ``UnitParser.try_convert_many`` report one
+    code per row instead of raising ``ValueError``; ``OK`` (zero) marks
+    the rows that converted.
+
+    """
+
+    OK = 0
+    INVALID_FORMAT = 1
+    UNKNOWN_UNIT = 2
+    INCOMPATIBLE_UNITS = 3
+    MULTIPLE_PER = 4
+    INVALID_KEYWORD = 5
+    EXPONENT_OUT_OF_RANGE = 6
+
+
+class _Failure(NamedTuple):
+    """A unit specification that could not be resolved."""
+
+    code: ErrorCode
+    message: str
@@ -0,0 +1,182 @@
+"""Opt-in counters and timers for ``UnitParser``.
+
+Instrumentation is enabled per parser with
+``UnitParser.enable_instrumentation``, which shadows the parser's
+methods with timing wrappers stored on the instance. Parsers without
+instrumentation run the unwrapped methods, so the counters cost
+nothing unless they are enabled.
+
+"""
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from .errors import ErrorCode
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+# Prefixes of the ValueError messages raised by UnitParser, by category.
+_ERROR_PREFIXES = (
+    ('Invalid format', ErrorCode.INVALID_FORMAT),
+    ('Two-argument form requires', ErrorCode.INVALID_FORMAT),
+    ('Unit not recognized', ErrorCode.UNKNOWN_UNIT),
+    ('Units not compatible', ErrorCode.INCOMPATIBLE_UNITS),
+    ("Multiple uses of keyword 'per'", ErrorCode.MULTIPLE_PER),
+    ('Invalid use of keyword', ErrorCode.INVALID_KEYWORD),
+    ('Signature exponent', ErrorCode.EXPONENT_OUT_OF_RANGE),
+)
+
+
+def error_category(error: Exception) -> str:
+    """Return the category of an error raised by a ``UnitParser`` method.
+
+    ``ValueError`` messages are mapped to the name of their
+    ``ErrorCode``; other exceptions are categorized by type name.
+
+    """
+    if isinstance(error, ValueError):
+        message = str(error)
+        for prefix, code in _ERROR_PREFIXES:
+            if message.startswith(prefix):
+                return code.name
+    return type(error).__name__
+
+
+class Instrumentation:
+    """Counters collected by an instrumented ``UnitParser``.
+
+    Parameters
+    ----------
+    max_units : int, optional
+        Number of distinct unit strings whose resolutions are counted.
+        When twice as many have been seen, only the ``max_units`` most
+        resolved are kept, so memory stays bounded however many
+        distinct units are requested, and counts of rarely requested
+        units are approximate. Defaults to 1000.
+
+    Attributes
+    ----------
+    calls : dict[str, list[int]]
+        Number of calls and cumulative nanoseconds, by method name.
+    table_hits : int
+        Units resolved by a lookup in the table of units.
+    compound_lookups : int
+        Units resolved as compound specifications, from the cache or
+        by parsing.
+    compound_parses : int
+        Compound specifications parsed because they were not cached.
+    units : collections.Counter
+        Number of resolutions of each unit string, for up to
+        ``2 * max_units`` unit strings.
+    errors : collections.Counter
+        Number of errors by category: the name of an ``ErrorCode``, or
+        of an exception type.
+
+    """
+
+    def __init__(self, max_units: int = 1000) -> None:
+        if max_units < 1:
+            raise ValueError('max_units must be positive.')
+        self._lock = threading.Lock()
+        self.max_units = max_units
+        self.calls: dict[str, list[int]] = {}
+        self.table_hits = 0
+        self.compound_lookups = 0
+        self.compound_parses = 0
+        self.units: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+
+    def timed(self, name: str, method: F, count_errors: bool = True) -> F:
+        """Wrap a bound method to count its calls, latency, and errors.
+
+        Errors are only counted if ``count_errors`` is True, so that
+        errors propagating through nested instrumented methods are
+        counted once.
+
+        """
+        lock = self._lock
+        stats = self.calls.setdefault(name, [0, 0])
+        errors = self.errors
+        clock = time.perf_counter_ns
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                if count_errors:
+                    with lock:
+                        errors[error_category(e)] += 1
+                raise
+            finally:
+                elapsed = clock() - start
+                with lock:
+                    stats[0] += 1
+                    stats[1] += elapsed
+
+        wrapper.__wrapped__ = method  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    def record_resolution(self, unit: str, table_hit: bool) -> None:
+        """Count the resolution of ``unit``."""
+        with self._lock:
+            units = self.units
+            units[unit] += 1
+            if len(units) > 2 * self.max_units:
+                kept = units.most_common(self.max_units)
+                units.clear()
+                units.update(dict(kept))
+            if table_hit:
+                self.table_hits += 1
+            else:
+                self.compound_lookups += 1
+
+    def record_parse(self) -> None:
+        """Count the parse of an uncached compound specification."""
+        with self._lock:
+            self.compound_parses += 1
+
+    def record_error_codes(self, counts: dict[ErrorCode, int]) -> None:
+        """Count rows of a batch conversion that failed, by error code."""
+        with self._lock:
+            for code, count in counts.items():
+                if code != ErrorCode.OK:
+                    self.errors[code.name] += count
+
+    def snapshot(self, top_n: int = 10) -> dict[str, Any]:
+        """Return the counters as plain data.
+
+        Parameters
+        ----------
+        top_n : int, optional
+            Number of most requested units to include. Defaults to 10.
+
+        Returns
+        -------
+        dict
+            With keys ``calls`` (a dict mapping method names to dicts
+            of ``count`` and ``seconds``), ``resolution`` (counts of
+            ``table_hits``, ``compound_lookups``, and
+            ``compound_parses``), ``top_units`` (a list of
+            ``(unit, count)`` pairs, most requested first), and
+            ``errors`` (counts by category).
+
+        """
+        with self._lock:
+            return {
+                'calls': {
+                    name: {'count': count, 'seconds': ns / 1e9}
+                    for name, (count, ns) in self.calls.items()
+                    if count
+                },
+                'resolution': {
+                    'table_hits': self.table_hits,
+                    'compound_lookups': self.compound_lookups,
+                    'compound_parses': self.compound_parses,
+                },
+                'top_units': self.units.most_common(top_n),
+                'errors': dict(self.errors),
+            }
@@ -0,0 +1,119 @@
+"""Precomputed conversion factors between units of one dimension."""
+
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+from ._optional import NUMPY_REQUIRED
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import ArrayLike, NDArray
+
+
+class FactorMatrix:
+    """Dense matrix of conversion factors between compatible units.
+
+    All units defined in a unit definition file that share a
+    dimensional signature (say, every unit of length) are numbered
+    0, 1, ..., n - 1. Entry ``(i, j)`` of the matrix is the number of
+    units ``j`` in one unit ``i``, so converting between two of these
+    units is two dict lookups and one array read, and converting a
+    column of integer unit codes is a single fancy-indexed multiply.
+
+    Factor matrices are built by ``UnitParser``; see
+    ``UnitParser.factor_matrix``.
+
+    Parameters
+    ----------
+    units : Sequence[str]
+        The unit names, in id order.
+    quantities : Sequence[float]
+        The quantity of each unit.
+
+    Attributes
+    ----------
+    units : tuple[str, ...]
+        The unit names, in id order.
+    ids : dict[str, int]
+        The id of each unit.
+    factors : array.array
+        The n x n matrix of factors, flattened in row-major order.
+
+    """
+
+    __slots__ = ('units', 'ids', 'factors')
+
+    units: tuple[str, ...]
+    ids: dict[str, int]
+    factors: 'array[float]'
+
+    def __init__(self, units: Sequence[str], quantities: Sequence[float]) -> None:
+        self.units = tuple(units)
+        self.ids = {unit: i for i, unit in enumerate(self.units)}
+        self.factors = array(
+            'd', (q_from / q_to for q_from in quantities for q_to in quantities)
+        )
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def __repr__(self) -> str:
+        return f'<FactorMatrix: {len(self.units)} units>'
+
+    def factor(self, units: str, desired_units: str) -> float:
+        """Return the number of ``desired_units`` in one of ``units``.
+
+        Raises
+        ------
+        KeyError
+            If either unit is not in the matrix.
+
+        """
+        return self.factors[self.ids[units] * len(self.units) + self.ids[desired_units]]
+
+    def encode(self, units: Iterable[str]) -> list[int]:
+        """Return the ids of a sequence of unit names.
+
+        Raises
+        ------
+        KeyError
+            If a unit is not in the matrix.
+
+        """
+        ids = self.ids
+        return [ids[unit] for unit in units]
+
+    def convert_codes(
+        self, values: 'ArrayLike', codes: 'ArrayLike', desired_units: str
+    ) -> 'NDArray[np.float64]':
+        """Convert a column of values given in coded units.
+
+        Requires NumPy (``pip install "unit_parser[numpy]"``).
+
+        Parameters
+        ----------
+        values : array_like
+            Quantities to convert.
+        codes : array_like of int
+            The id of the units of each value, with the shape of
+            ``values``.
+        desired_units : str
+            Desired units; must be in the matrix.
+
+        Returns
+        -------
+        numpy.ndarray
+            The converted values.
+
+        """
+        try:
+            import numpy as np
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(NUMPY_REQUIRED.format('convert_codes')) from e
+
+        n = len(self.units)
+        matrix = np.frombuffer(self.factors, dtype=np.float64).reshape(n, n)
+        column = matrix[:, self.ids[desired_units]]
+        factors: NDArray[np.float64] = column[np.asarray(codes, dtype=np.intp)]
+        return np.asarray(values, dtype=np.float64) * factors
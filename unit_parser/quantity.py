@@ -0,0 +1,143 @@
+"""Physical quantities as values with resolved units."""
+
+from typing import TYPE_CHECKING, Any
+
+from . import signature
+from .registry import _UnitSpec
+
+if TYPE_CHECKING:
+    from .units import UnitParser
+
+
+class Quantity:
+    """A value together with its resolved units.
+
+    Quantities are created by ``UnitParser.quantity``. Arithmetic on
+    quantities works on resolved units: ``+`` and ``-`` check that the
+    packed signatures match and express the result in the units of the
+    left operand, while ``*`` and ``/`` combine the signatures and
+    unit factors directly. No unit strings are formatted or parsed
+    along the way; units are only looked up by name again when the
+    result is converted with ``to``.
+
+    Parameters
+    ----------
+    value : float
+        The value, in units of ``spec``. May also be a NumPy array.
+    spec : _UnitSpec
+        The signature and quantity of the units.
+    parser : UnitParser
+        The parser that resolved the units, used by ``to``.
+
+    Usage
+    -----
+    > from unit_parser import UnitParser
+    > up = UnitParser()
+    > distance = up.quantity("100 miles") + up.quantity("5 km")
+    > speed = distance / up.quantity("2 hours")
+    > speed.to("meters_per_second")
+     23.046444444444443
+
+    """
+
+    __slots__ = ('value', 'spec', 'parser')
+
+    value: Any
+    spec: _UnitSpec
+    parser: 'UnitParser'
+
+    def __init__(self, value: Any, spec: _UnitSpec, parser: 'UnitParser') -> None:
+        self.value = value
+        self.spec = spec
+        self.parser = parser
+
+    def to(self, units: str) -> Any:
+        """Return the value converted to ``units``.
+
+        Raises
+        ------
+        ValueError
+            If ``units`` is invalid or has a different dimension.
+
+        """
+        target = self.parser._signature_and_quantity_for_unit(units)
+        if target.packed != self.spec.packed:
+            raise ValueError('Units not compatible.')
+        return self.value * (self.spec.quantity / target.quantity)
+
+    @property
+    def dimension(self) -> tuple[int, ...]:
+        """The dimensional signature of the units."""
+        return self.spec.signature
+
+    def _scale_of(self, other: 'Quantity') -> float:
+        """Return the factor converting values of ``other`` to our units."""
+        if other.spec.packed != self.spec.packed:
+            raise ValueError('Units not compatible.')
+        return other.spec.quantity / self.spec.quantity
+
+    def __add__(self, other: object) -> 'Quantity':
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        scale = self._scale_of(other)
+        return Quantity(self.value + other.value * scale, self.spec, self.parser)
+
+    def __sub__(self, other: object) -> 'Quantity':
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        scale = self._scale_of(other)
+        return Quantity(self.value - other.value * scale, self.spec, self.parser)
+
+    def __mul__(self, other: object) -> 'Quantity':
+        spec = self.spec
+        if isinstance(other, Quantity):
+            other_spec = other.spec
+            product = _UnitSpec(
+                signature.multiply(spec.packed, other_spec.packed, spec.sig_len),
+                spec.quantity * other_spec.quantity,
+                spec.sig_len,
+            )
+            return Quantity(self.value * other.value, product, self.parser)
+        if isinstance(other, int | float):
+            return Quantity(self.value * other, spec, self.parser)
+        return NotImplemented
+
+    def __rmul__(self, other: object) -> 'Quantity':
+        if isinstance(other, int | float):
+            return Quantity(other * self.value, self.spec, self.parser)
+        return NotImplemented
+
+    def __truediv__(self, other: object) -> 'Quantity':
+        spec = self.spec
+        if isinstance(other, Quantity):
+            other_spec = other.spec
+            quotient = _UnitSpec(
+                signature.divide(spec.packed, other_spec.packed, spec.sig_len),
+                spec.quantity / other_spec.quantity,
+                spec.sig_len,
+            )
+            return Quantity(self.value / other.value, quotient, self.parser)
+        if isinstance(other, int | float):
+            return Quantity(self.value / other, spec, self.parser)
+        return NotImplemented
+
+    def __rtruediv__(self, other: object) -> 'Quantity':
+        if not isinstance(other, int | float):
+            return NotImplemented
+        spec = self.spec
+        bias = signature.words(spec.sig_len)[0]
+        inverse = _UnitSpec(
+            signature.divide(bias, spec.packed, spec.sig_len),
+            1 / spec.quantity,
+            spec.sig_len,
+        )
+        return Quantity(other / self.value, inverse, self.parser)
+
+    def __neg__(self) -> 'Quantity':
+        return Quantity(-self.value, self.spec, self.parser)
+
+    def __repr__(self) -> str:
+        return (
+            f'Quantity({self.value!r}, dimension={self.dimension}, '
+            f'scale={self.spec.quantity!r})'
+        )
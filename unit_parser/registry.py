@@ -0,0 +1,1308 @@
+"""Immutable tables of unit definitions."""
+
+import re
+import sys
+from collections.abc import Collection, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from fractions import Fraction
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, NoReturn
+
+from .errors import ErrorCode, _Failure
+from .signature import divide, multiply, pack, unpack, words
+from .snapshot import Snapshot, dumps, loads, source_digest
+from .snapshot import read as read_snapshot
+from .snapshot import write as write_snapshot
+
+if TYPE_CHECKING:
+    from multiprocessing import shared_memory
+
+_BUILTIN_UNITS = Path(__file__).parent / 'units' / 'units.txt'
+
+# Digest recorded in snapshots that are not tied to a definition file.
+_NO_DIGEST = bytes(32)
+
+# A line of a unit definition file: a definition, a comment, or both,
+# like "second: [1 0 0]", "minute: 60 seconds # A comment",
+# "kilo-: 1000", or "# A comment". Blank and comment-only lines match
+# with all groups None; otherwise the groups are the name, a hyphen if
+# the line defines a prefix, and either the signature vector, or the
+# number and (for units) the units of the quantity defining it.
+_SIGNATURE_EXPONENT_RE = r'[-+]?[0-9]+'
+# A number, in a definition or in a quantity like "5 feet": a fraction
+# like "1/3", or a decimal like "-.5" or "1e3". Shared with units.py.
+_NUMBER_RE = r'(?:[-+]?[0-9]+/[0-9]+|[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)'
+_DEFINITION_LINE_RE = re.compile(
+    r'\s*(?:([a-zA-Z]+)(-?)\s*:\s*(?:'
+    r'\[\s*('
+    + _SIGNATURE_EXPONENT_RE
+    + r'(?:(?:\s*,\s*|\s+)'
+    + _SIGNATURE_EXPONENT_RE
+    + r')*)\s*\]'
+    r'|(' + _NUMBER_RE + r')\s*([a-zA-Z_]+)?'
+    r')\s*)?(?:#.*)?$'
+)
+
+
+@dataclass(frozen=True)
+class _UnitSpec:
+    """Internal representation of a unit's dimensional signature and quantity.
+
+    The signature is stored packed into a single integer (see
+    ``unit_parser.signature``), so that comparing, multiplying, and
+    dividing signatures are integer operations. The tuple form is
+    available as a view.
+
+    """
+
+    packed: int
+    quantity: float
+    sig_len: int
+
+    @classmethod
+    def from_signature(cls, signature: tuple[int, ...], quantity: float) -> '_UnitSpec':
+        return cls(pack(signature), quantity, len(signature))
+
+    @property
+    def signature(self) -> tuple[int, ...]:
+        return unpack(self.packed, self.sig_len)
+
+
+class _Prefixes:
+    """Index of unit name prefixes, like "kilo" and "nano".
+
+    Prefixed names like "kilowatt" are not stored in the table of
+    units; they are resolved on demand by splitting the name at each
+    prefix length, longest first, until the head is a prefix and the
+    remainder a unit of the table. Resolved names are memoized, so
+    only the prefixed names actually used are ever built, not the
+    cross product of prefixes and units.
+
+    Prefixes only combine with full unit names, not with abbreviations
+    (see ``_abbreviations``): "kilometers" and "millisecond" resolve,
+    but "exam" (exa-m), "kilokg", and "millisecs" do not.
+
+    An index memoizes against a single table of units, which may only
+    grow while the index is in use; units that are redefined must be
+    passed to ``forget``.
+
+    """
+
+    __slots__ = ('factors', 'abbreviations', '_lengths', '_resolved')
+
+    def __init__(
+        self,
+        factors: Mapping[str, float],
+        abbreviations: Collection[str] = frozenset(),
+    ) -> None:
+        self.factors = dict(factors)
+        self.abbreviations = abbreviations
+        self._lengths = sorted({len(prefix) for prefix in self.factors}, reverse=True)
+        self._resolved: dict[str, _UnitSpec] = {}
+
+    def split(
+        self, units: Mapping[str, _UnitSpec], name: str
+    ) -> tuple[str, str] | None:
+        """Return the prefix and unit of the prefixed unit ``name``, if it is one."""
+        for length in self._lengths:
+            if length < len(name) and name[:length] in self.factors:
+                unit = name[length:]
+                if unit in units and unit not in self.abbreviations:
+                    return name[:length], unit
+        return None
+
+    def resolve(self, units: Mapping[str, _UnitSpec], name: str) -> _UnitSpec | None:
+        """Return the prefixed unit ``name``, or None if it is not one."""
+        spec = self._resolved.get(name)
+        if spec is not None:
+            return spec
+        parts = self.split(units, name)
+        if parts is None:
+            return None
+        prefix, unit = parts
+        base = units[unit]
+        spec = _UnitSpec(
+            base.packed, base.quantity * self.factors[prefix], base.sig_len
+        )
+        self._resolved[name] = spec
+        return spec
+
+    def forget(self, unit: str) -> None:
+        """Drop the memoized prefixed names of ``unit``, like "kilo" + unit."""
+        for prefix in self.factors:
+            self._resolved.pop(prefix + unit, None)
+
+
+class _LayeredUnits(Mapping[str, _UnitSpec]):
+    """Table of units of an overlay registry.
+
+    Holds the units defined by the overlay and falls through to a
+    base table for all other names, except those the overlay removed.
+    The base is shared, never copied or modified, so an overlay costs
+    memory in proportion to its own definitions only.
+
+    """
+
+    __slots__ = ('base', 'own', 'removed')
+
+    def __init__(
+        self,
+        base: Mapping[str, _UnitSpec],
+        own: dict[str, _UnitSpec],
+        removed: frozenset[str] = frozenset(),
+    ) -> None:
+        self.base = base
+        self.own = own
+        self.removed = removed
+
+    def get(self, name: str, default: Any = None) -> Any:
+        spec = self.own.get(name)
+        if spec is None:
+            if self.removed and name in self.removed:
+                return default
+            return self.base.get(name, default)
+        return spec
+
+    def __getitem__(self, name: str) -> _UnitSpec:
+        spec: _UnitSpec | None = self.get(name)
+        if spec is None:
+            raise KeyError(name)
+        return spec
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.own or (name in self.base and name not in self.removed)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.own
+        for name in self.base:
+            if name not in self.own and name not in self.removed:
+                yield name
+
+    def __len__(self) -> int:
+        return (
+            len(self.base)
+            - len(self.removed)
+            + sum(1 for name in self.own if name not in self.base)
+        )
+
+
+class UnitRegistry:
+    """Immutable table of unit definitions.
+
+    A registry holds the units defined by a unit definition file,
+    including automatically registered plurals, resolved to their
+    dimensional signature and quantity, and the file's unit name
+    prefixes. Prefixed names like "kilowatt" are resolved on demand
+    when parsing unit specifications. The registry is separate from
+    ``UnitParser`` so that one table can be shared by many parsers,
+    threads, and processes:
+
+    - Registries cannot be modified after construction.
+    - Pickling a registry produces its compact binary snapshot (see
+      ``unit_parser.snapshot``) rather than the table of Python
+      objects, so sending it to ``multiprocessing`` workers is cheap
+      and does not involve re-parsing the definition file.
+    - Since the table is never written to, worker processes created
+      by ``fork`` share its memory pages with the parent. Calling
+      ``gc.freeze()`` before forking additionally keeps the garbage
+      collector from touching (and thereby copying) them.
+    - ``to_shared_memory`` places the snapshot in a
+      ``multiprocessing.shared_memory`` block that any number of
+      processes can attach to by name with ``from_shared_memory``.
+    - ``overlay`` derives a registry with additional definitions that
+      shares this registry's table instead of copying it, so that
+      many variants of one table, like one per tenant of a service,
+      are cheap.
+    - The registry records the definition of every unit, and thereby
+      the dependencies between units (see ``dependencies`` and
+      ``dependents``). ``define_unit`` adds, redefines, or removes a
+      single unit, re-resolving only the units that depend on it.
+
+    Parameters
+    ----------
+    sig_len : int
+        Length of every signature in the table.
+    units : Mapping[str, _UnitSpec]
+        Units by name.
+    prefixes : Mapping[str, float], optional
+        Factors of unit name prefixes, by prefix.
+    definitions : Mapping[str, str], optional
+        Definitions of the units, by name, like "60 seconds" or
+        "[0 0 1]". Units without a definition have no recorded
+        dependencies.
+
+    Usage
+    -----
+    > from unit_parser import UnitParser, UnitRegistry
+    > registry = UnitRegistry.from_file()
+    > up = UnitParser(registry=registry)
+
+    """
+
+    __slots__ = (
+        '_sig_len',
+        '_units',
+        '_prefixes',
+        '_by_signature',
+        '_base',
+        '_definitions',
+        '_dependents',
+        '_abbreviations',
+    )
+
+    _sig_len: int
+    _units: Mapping[str, _UnitSpec]
+    _prefixes: _Prefixes
+    _by_signature: dict[int, tuple[str, ...]]
+    # The registry an overlay is layered on; None unless an overlay.
+    _base: 'UnitRegistry | None'
+    # Definitions of the units; of an overlay, only of its own units.
+    _definitions: dict[str, str]
+    # Names of the units whose definitions refer to each name, built
+    # on first use; of an overlay, only of its own units.
+    _dependents: dict[str, list[str]] | None
+    # Names of the units prefixes do not combine with, like "km".
+    _abbreviations: frozenset[str]
+
+    def __init__(
+        self,
+        sig_len: int,
+        units: Mapping[str, _UnitSpec],
+        prefixes: Mapping[str, float] | None = None,
+        definitions: Mapping[str, str] | None = None,
+    ) -> None:
+        self._init(sig_len, dict(units), prefixes or {}, dict(definitions or {}))
+
+    def _init(
+        self,
+        sig_len: int,
+        units: dict[str, _UnitSpec],
+        prefixes: Mapping[str, float],
+        definitions: dict[str, str],
+        base: 'UnitRegistry | None' = None,
+        removed: frozenset[str] = frozenset(),
+        abbreviations: frozenset[str] | None = None,
+    ) -> None:
+        if abbreviations is None:
+            abbreviations = _abbreviations(
+                definitions, frozenset() if base is None else base._abbreviations
+            )
+        object.__setattr__(self, '_sig_len', sig_len)
+        object.__setattr__(
+            self,
+            '_units',
+            units if base is None else _LayeredUnits(base._units, units, removed),
+        )
+        object.__setattr__(self, '_prefixes', _Prefixes(prefixes, abbreviations))
+        object.__setattr__(self, '_abbreviations', abbreviations)
+        object.__setattr__(self, '_base', base)
+        object.__setattr__(self, '_definitions', definitions)
+        object.__setattr__(self, '_dependents', None)
+
+        # Index of unit names by packed signature; of an overlay, only
+        # of its own units.
+        by_signature: dict[int, list[str]] = {}
+        for name, spec in units.items():
+            by_signature.setdefault(spec.packed, []).append(name)
+        object.__setattr__(
+            self,
+            '_by_signature',
+            {packed: tuple(names) for packed, names in by_signature.items()},
+        )
+
+    @classmethod
+    def from_file(
+        cls,
+        unit_definitions: str | Path | None = None,
+        *,
+        snapshot: str | Path | None = None,
+    ) -> 'UnitRegistry':
+        """Load a registry from a unit definition file.
+
+        Parameters
+        ----------
+        unit_definitions : str | Path, optional
+            Location of a unit definition file. Defaults to the file
+            shipped with this library.
+        snapshot : str | Path, optional
+            Location of a binary snapshot of the compiled table. If
+            the snapshot exists and was compiled from the current
+            contents of the unit definition file, the table is loaded
+            from it without parsing the file. Otherwise the file is
+            parsed and the snapshot (re)written, if possible.
+
+        """
+        if unit_definitions is None:
+            unit_definitions = _BUILTIN_UNITS
+
+        if snapshot is None:
+            return cls._parse(unit_definitions)
+
+        digest = source_digest(unit_definitions)
+        compiled = read_snapshot(snapshot, digest)
+        if compiled is not None:
+            return cls._from_snapshot(compiled)
+
+        registry = cls._parse(unit_definitions)
+        try:
+            write_snapshot(snapshot, registry._to_snapshot(), digest)
+        except OSError:
+            # An unwritable snapshot location only costs the speedup
+            # on the next start.
+            pass
+        return registry
+
+    @classmethod
+    def _parse(cls, file: str | Path) -> 'UnitRegistry':
+        """Parse a unit definition file and register regular plurals."""
+        sig_len, units, prefixes, definitions = _parse_unit_file(file)
+        _register_plurals(units, definitions)
+        return cls(sig_len, units, prefixes, definitions)
+
+    def overlay(
+        self, definitions: Iterable[str] = (), *, file: str | Path | None = None
+    ) -> 'UnitRegistry':
+        """Return a registry with additional unit definitions.
+
+        The overlay shares this registry's table of units instead of
+        copying it: lookups of names the overlay does not define fall
+        through to this registry, which is not modified. An overlay
+        thus costs memory in proportion to its own definitions, and
+        creating one only parses those. Overlays of overlays share the
+        same base table, copying only the (small) definitions of the
+        overlay they are derived from.
+
+        Definitions may refer to the units and prefixes of this
+        registry, and may redefine them; regular plurals of new units
+        are registered as usual. Units of this registry that depend on
+        a redefined unit are re-resolved in the overlay.
+
+        Parameters
+        ----------
+        definitions : Iterable[str], optional
+            Lines in the syntax of unit definition files, like
+            "widget: 3 feet" or "blip-: 1e3".
+        file : str | Path, optional
+            Location of a unit definition file to read the lines from
+            instead.
+
+        Raises
+        ------
+        ValueError
+            If both ``definitions`` and ``file`` are passed, if a
+            definition is invalid, or if redefinitions make units
+            depend on themselves.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser, UnitRegistry
+        > base = UnitRegistry.from_file()
+        > tenant = base.overlay(["smoot: 67 inches", "furlong: 660 feet"])
+        > up = UnitParser(registry=tenant)
+        > up.convert("1 furlong", "smoots")
+         118.2089552238806
+
+        """
+        if file is not None:
+            if definitions != ():
+                raise ValueError('Pass either definitions or a file, not both.')
+            with open(file) as f:
+                return self.overlay(f)
+
+        sig_len, units, prefixes, defined = _parse_definitions(
+            definitions, self._sig_len, self._units, self._prefixes
+        )
+        _register_plurals(units, defined, self._units)
+        return self._derive(sig_len, defined, prefixes)
+
+    def define_unit(self, name: str, definition: str | None) -> 'UnitRegistry':
+        """Return a registry with one unit added, redefined, or removed.
+
+        Only the unit and the units that depend on it, directly or
+        transitively, are resolved; the result is an overlay (see
+        ``overlay``) holding just those. Defining a unit thus costs
+        time and memory in proportion to the number of affected units,
+        not to the size of the table.
+
+        Parameters
+        ----------
+        name : str
+            Name of the unit.
+        definition : str or None
+            Definition in the syntax of unit definition files, like
+            "3 feet" or "[0 1 0 0 0 0]", or None to remove the unit
+            (and its regular plural, if registered automatically).
+
+        Raises
+        ------
+        ValueError
+            If the definition is invalid or makes the unit depend on
+            itself, or if a removed unit is unknown or still used by
+            other units.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser, UnitRegistry
+        > registry = UnitRegistry.from_file()
+        > registry.dependents("foot")
+         ('feet', 'ft', 'slug', 'foots')
+        > metric = registry.define_unit("foot", "0.3 meter")
+        > UnitParser(registry=metric).convert("1 ft", "meters")
+         0.3
+
+        """
+        if definition is None:
+            if name not in self._units:
+                raise ValueError(f'Unit not recognized: {name}')
+            removed = {name}
+            plural = name + 's'
+            if self.definition(plural) == f'1 {name}':
+                removed.add(plural)
+            return self._derive(self._sig_len, {}, {}, removed)
+
+        sig_len, units, prefixes, defined = _parse_definitions(
+            [f'{name}: {definition}'],
+            self._sig_len,
+            self._units,
+            self._prefixes,
+        )
+        if list(units) != [name]:
+            raise ValueError(f'Invalid unit definition: {definition!r}')
+        _register_plurals(units, defined, self._units)
+        return self._derive(sig_len, defined, {})
+
+    def _derive(
+        self,
+        sig_len: int,
+        definitions: dict[str, str],
+        prefixes: Mapping[str, float],
+        removed: set[str] | None = None,
+    ) -> 'UnitRegistry':
+        """Return an overlay with units defined, redefined, or removed.
+
+        The units of ``definitions``, and all units depending on them
+        or on the ``removed`` units, are resolved in dependency order
+        against the overlay's table.
+
+        """
+        removed = removed or set()
+        # Units to resolve: the new definitions and their dependents,
+        # which keep their definitions.
+        changed = [*definitions, *removed]
+        affected = {name: None for name in self._transitive_dependents(changed)}
+        for name in removed:
+            users = [user for user in self.dependents(name) if user not in removed]
+            if users:
+                raise ValueError(f'Unit {name} is used by: {", ".join(users)}')
+        pending: dict[str, str] = {}
+        for name in affected:
+            definition = self.definition(name)
+            if name not in removed and name not in definitions and definition:
+                pending[name] = definition
+        pending.update(definitions)
+
+        base = self
+        units: dict[str, _UnitSpec] = {}
+        own_definitions: dict[str, str] = {}
+        own_removed: set[str] = set()
+        if self._base is not None:
+            # Flatten, so that lookups fall through at most one layer.
+            assert isinstance(self._units, _LayeredUnits)
+            base = self._base
+            units.update(self._units.own)
+            own_definitions.update(self._definitions)
+            own_removed.update(self._units.removed)
+        for name in removed:
+            units.pop(name, None)
+            own_definitions.pop(name, None)
+            if name in base._units:
+                own_removed.add(name)
+        own_removed.difference_update(pending)
+        own_definitions.update(pending)
+
+        frozen_removed = frozenset(own_removed)
+        all_prefixes = {**self._prefixes.factors, **prefixes}
+        table = _LayeredUnits(base._units, units, frozen_removed)
+        abbreviations = _abbreviations(own_definitions, base._abbreviations)
+        prefix_index = _Prefixes(all_prefixes, abbreviations)
+        for name in _dependency_order(pending, table, prefix_index):
+            # Resolve against the table as updated so far; dependencies
+            # come first, so the only stale value read is a unit's own
+            # previous value, as in "smoot: 1 kilosmoot". Prefixed names
+            # memoized from that value are stale once it is replaced.
+            units[name] = _evaluate(table, sig_len, prefix_index, pending[name])
+            prefix_index.forget(name)
+
+        registry = object.__new__(UnitRegistry)
+        registry._init(
+            sig_len,
+            units,
+            all_prefixes,
+            own_definitions,
+            base,
+            frozen_removed,
+            abbreviations,
+        )
+        return registry
+
+    @property
+    def base(self) -> 'UnitRegistry | None':
+        """The registry this overlay is layered on, or None."""
+        return self._base
+
+    def definition(self, name: str) -> str | None:
+        """Return the definition of the unit ``name``, like "60 second".
+
+        Returns None for unknown units and for units without a recorded
+        definition.
+
+        """
+        definition = self._definitions.get(name)
+        if definition is None and self._base is not None and name in self._units:
+            return self._base.definition(name)
+        return definition
+
+    def dependencies(self, name: str) -> tuple[str, ...]:
+        """Return the names the definition of the unit ``name`` refers to.
+
+        Names are listed as written, in order of first appearance; a
+        prefixed name like "kilowatt" stands for a dependency on
+        "watt".
+
+        """
+        definition = self.definition(name)
+        if definition is None:
+            return ()
+        return tuple(dict.fromkeys(_tokens(definition)))
+
+    def dependents(self, name: str, transitive: bool = False) -> tuple[str, ...]:
+        """Return the units whose definitions refer to ``name``.
+
+        Parameters
+        ----------
+        name : str
+            Name of a unit, or a prefixed name.
+        transitive : bool, optional
+            Whether to include units that depend on ``name`` through
+            other units as well, in breadth-first order. Defaults to
+            False.
+
+        """
+        if transitive:
+            return tuple(self._transitive_dependents([name]))
+        index = self._dependents
+        if index is None:
+            index = self._index_dependents()
+        own = index.get(name, [])
+        if self._base is None:
+            return tuple(own)
+        removed = self._units.removed  # type: ignore[attr-defined]
+        inherited = [
+            dependent
+            for dependent in self._base.dependents(name)
+            if dependent not in self._definitions and dependent not in removed
+        ]
+        return tuple(inherited + own)
+
+    def _index_dependents(self) -> dict[str, list[str]]:
+        """Build the index of dependents of this registry's own units."""
+        index: dict[str, list[str]] = {}
+        for dependent, definition in self._definitions.items():
+            for name in dict.fromkeys(_tokens(definition)):
+                if name not in self._units:
+                    # A prefixed name depends on its unit.
+                    parts = self._prefixes.split(self._units, name)
+                    if parts is not None and parts[1] != dependent:
+                        index.setdefault(parts[1], []).append(dependent)
+                if name != dependent:
+                    index.setdefault(name, []).append(dependent)
+        object.__setattr__(self, '_dependents', index)
+        return index
+
+    def _transitive_dependents(self, names: Iterable[str]) -> list[str]:
+        """Return the units depending on any of ``names``, breadth first."""
+        seen: dict[str, None] = {}
+        queue = list(names)
+        while queue:
+            dependents = [
+                dependent
+                for name in queue
+                for dependent in self.dependents(name)
+                if dependent not in seen
+            ]
+            queue = list(dict.fromkeys(dependents))
+            seen.update(dict.fromkeys(queue))
+        return list(seen)
+
+    @classmethod
+    def _from_snapshot(cls, compiled: Snapshot) -> 'UnitRegistry':
+        specs = [
+            _UnitSpec.from_signature(signature, quantity)
+            for signature, quantity in compiled.specs
+        ]
+        units = {name: specs[i] for name, i in compiled.names.items()}
+        names = compiled.names
+        definitions = {}
+        for name, definition in compiled.definitions.items():
+            if definition:
+                definitions[name] = definition
+            elif names.get(name[:-1], -1) == names[name] and name.endswith('s'):
+                # Regular plurals are left out of snapshots; see _to_snapshot.
+                definitions[name] = f'1 {name[:-1]}'
+        return cls(compiled.sig_len, units, compiled.prefixes, definitions)
+
+    def _to_snapshot(self) -> Snapshot:
+        spec_ids: dict[_UnitSpec, int] = {}
+        names = {
+            name: spec_ids.setdefault(spec, len(spec_ids))
+            for name, spec in self._units.items()
+        }
+        specs = [(spec.signature, spec.quantity) for spec in spec_ids]
+        definitions = {}
+        for name in names:
+            definition = self.definition(name) or ''
+            # Regular plurals, like "meters: 1 meter", are implied.
+            if definition != f'1 {name[:-1]}' or not name.endswith('s'):
+                definitions[name] = definition
+        return Snapshot(
+            self._sig_len, specs, names, self._prefixes.factors, definitions
+        )
+
+    @property
+    def sig_len(self) -> int:
+        """Length of every signature in the table."""
+        return self._sig_len
+
+    @property
+    def units(self) -> Mapping[str, _UnitSpec]:
+        """Read-only view of the units, by name.
+
+        Prefixed names are not included, except for those defined
+        explicitly.
+
+        """
+        return MappingProxyType(self._units)
+
+    @property
+    def prefixes(self) -> Mapping[str, float]:
+        """Read-only view of the factors of unit name prefixes, by prefix."""
+        return MappingProxyType(self._prefixes.factors)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._units
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._units)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UnitRegistry):
+            return NotImplemented
+        return (
+            self._sig_len == other._sig_len
+            and self._units == other._units
+            and self._prefixes.factors == other._prefixes.factors
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __setattr__(self, name: str, value: object) -> NoReturn:
+        raise AttributeError('UnitRegistry is immutable')
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError('UnitRegistry is immutable')
+
+    def __repr__(self) -> str:
+        return f'<UnitRegistry: {len(self._units)} units>'
+
+    def get(self, name: str) -> _UnitSpec | None:
+        """Return the unit named ``name``, or None if undefined.
+
+        Prefixed names like "kilowatt" are resolved as well.
+
+        """
+        spec = self._units.get(name)
+        if spec is None:
+            spec = self._prefixes.resolve(self._units, name)
+        return spec
+
+    def names_with_signature(self, packed: int) -> tuple[str, ...]:
+        """Return the names of all units with the given packed signature."""
+        names = self._by_signature.get(packed, ())
+        if self._base is None:
+            return names
+        assert isinstance(self._units, _LayeredUnits)
+        own = self._units.own
+        removed = self._units.removed
+        inherited = self._base.names_with_signature(packed)
+        return (
+            tuple(name for name in inherited if name not in own and name not in removed)
+            + names
+        )
+
+    def parse_specification(self, unit: str) -> _UnitSpec:
+        """Parse compound unit specification against this table.
+
+        See ``_parse_specification``.
+
+        """
+        return _parse_specification(self._units, self._sig_len, unit, self._prefixes)
+
+    def resolve_specification(self, unit: str) -> '_UnitSpec | _Failure':
+        """Parse compound unit specification without raising.
+
+        See ``_resolve_specification``.
+
+        """
+        return _resolve_specification(self._units, self._sig_len, unit, self._prefixes)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the registry to a compact binary snapshot."""
+        return dumps(self._to_snapshot(), _NO_DIGEST)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'UnitRegistry':
+        """Deserialize a registry produced by ``to_bytes``.
+
+        Raises
+        ------
+        ValueError
+            If ``data`` is not a valid snapshot.
+
+        """
+        compiled = loads(data)
+        if compiled is None:
+            raise ValueError('Invalid unit registry snapshot.')
+        return cls._from_snapshot(compiled)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (UnitRegistry.from_bytes, (self.to_bytes(),))
+
+    def to_shared_memory(self, name: str | None = None) -> 'shared_memory.SharedMemory':
+        """Place the registry's snapshot in shared memory.
+
+        Parameters
+        ----------
+        name : str, optional
+            Name of the shared memory block; a unique name is generated
+            by default.
+
+        Returns
+        -------
+        multiprocessing.shared_memory.SharedMemory
+            The block holding the snapshot. Other processes attach to
+            it with ``UnitRegistry.from_shared_memory(block.name)``.
+            The creator is responsible for calling ``close()`` and
+            ``unlink()`` on it once no longer needed.
+
+        """
+        from multiprocessing import shared_memory
+
+        data = self.to_bytes()
+        block = shared_memory.SharedMemory(name=name, create=True, size=len(data) + 8)
+        buf = _buffer(block)
+        buf[:8] = len(data).to_bytes(8, 'little')
+        buf[8 : 8 + len(data)] = data
+        return block
+
+    @classmethod
+    def from_shared_memory(cls, name: str) -> 'UnitRegistry':
+        """Load a registry placed in shared memory by ``to_shared_memory``.
+
+        The shared memory block is only read; it remains owned by the
+        process that created it.
+
+        """
+        from multiprocessing import shared_memory
+
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            block = shared_memory.SharedMemory(name=name)
+            # Before Python 3.13, attaching registers the block with the
+            # resource tracker, which would unlink it when this process
+            # exits.
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(block._name, 'shared_memory')  # type: ignore[attr-defined]
+        try:
+            buf = _buffer(block)
+            size = int.from_bytes(buf[:8], 'little')
+            data = bytes(buf[8 : 8 + size])
+        finally:
+            block.close()
+        return cls.from_bytes(data)
+
+
+def _buffer(block: 'shared_memory.SharedMemory') -> memoryview:
+    buf = block.buf
+    if buf is None:
+        raise ValueError('Shared memory block is closed.')
+    return buf
+
+
+def _parse_specification(
+    units: Mapping[str, _UnitSpec],
+    sig_len: int,
+    unit: str,
+    prefixes: _Prefixes | None = None,
+) -> _UnitSpec:
+    """Parse compound unit specification.
+
+    Parameters
+    ----------
+    units : Mapping[str, _UnitSpec]
+        Previously defined units that may appear as tokens.
+    sig_len : int
+        Length of every signature in ``units``.
+    unit : str
+        String representing a unit, like
+        "meters_per_second_squared".
+    prefixes : _Prefixes, optional
+        Unit name prefixes with which tokens missing from ``units``
+        are resolved, like "kilowatt".
+
+    Returns
+    -------
+    _UnitSpec
+        The signature and quantity for the unit.
+
+    Raises
+    ------
+    ValueError
+        If the specification is invalid or refers to an unknown unit.
+
+    """
+    result = _resolve_specification(units, sig_len, unit, prefixes)
+    if isinstance(result, _Failure):
+        raise ValueError(result.message)
+    return result
+
+
+def _resolve_specification(
+    units: Mapping[str, _UnitSpec],
+    sig_len: int,
+    unit: str,
+    prefixes: _Prefixes | None = None,
+) -> _UnitSpec | _Failure:
+    """Parse compound unit specification, returning failures as values.
+
+    Like ``_parse_specification``, but an invalid specification yields
+    a ``_Failure`` with an error code and message instead of raising,
+    so that batches with many bad rows do not pay for exceptions.
+
+    """
+    bias = words(sig_len)[0]
+    packed = bias
+    quantity = 1.0
+    in_numerator = True
+    previous: _UnitSpec | None = None
+
+    # Parse string
+    for token in unit.split('_'):
+        if token == 'per':
+            if not in_numerator:
+                return _Failure(
+                    ErrorCode.MULTIPLE_PER,
+                    "Multiple uses of keyword 'per' not allowed",
+                )
+            in_numerator = False
+            previous = None
+            continue
+
+        if token == 'squared' or token == 'cubed':
+            if previous is None:
+                # Can't do 'per_squared' or 'cubed_squared' or even
+                # 'squared_meters'
+                return _Failure(
+                    ErrorCode.INVALID_KEYWORD, f'Invalid use of keyword {token}.'
+                )
+
+            # Previous token was a unit, so squared and cubed are valid
+            # modifiers, repeating it once or twice more.
+            spec = previous
+            repeat = 1 if token == 'squared' else 2
+            token_quantity = (
+                spec.quantity if repeat == 1 else spec.quantity * spec.quantity
+            )
+            previous = None
+        else:
+            found = units.get(token)
+            if found is None and prefixes is not None:
+                found = prefixes.resolve(units, token)
+            if found is None:
+                return _Failure(ErrorCode.UNKNOWN_UNIT, f'Unit not recognized: {token}')
+            spec = previous = found
+            repeat = 1
+            token_quantity = spec.quantity
+
+        try:
+            if in_numerator:
+                for _ in range(repeat):
+                    packed = multiply(packed, spec.packed, sig_len)
+                quantity *= token_quantity
+            else:
+                for _ in range(repeat):
+                    packed = divide(packed, spec.packed, sig_len)
+                quantity /= token_quantity
+        except ValueError as e:
+            return _Failure(ErrorCode.EXPONENT_OUT_OF_RANGE, str(e))
+
+    return _UnitSpec(packed, quantity, sig_len)
+
+
+def _parse_unit_file(
+    file: str | Path,
+) -> tuple[int, dict[str, _UnitSpec], dict[str, float], dict[str, str]]:
+    """Parse Unit Definition File.
+
+    Parameters
+    ----------
+    file : str | Path
+        Location of unit definitions (see Syntax).
+
+    Returns
+    -------
+    sig_len : int
+        Length of the signatures defined by the file.
+    units : dict[str, _UnitSpec]
+        The units defined by the file, by name.
+    prefixes : dict[str, float]
+        The factors of the unit name prefixes defined by the file, by
+        prefix.
+    definitions : dict[str, str]
+        The definitions of the units, by name, normalized like
+        "60 second" or "[0 0 1]".
+
+    Syntax
+    ------
+    The Unit Definition File consists of unit definitions and
+    potentially comments. A comment starts with a # and can be on
+    the same line as a unit specification, or on a line of its
+    own. White space is ignored, but each unit specification must
+    be on its own line.
+
+    Units can either be specified by a vector representing its
+    dimensional signature, or in terms of other units. Defining a
+    unit by its dimensional signature looks like this:
+       second: [1 0 0]
+    This fairly meaninglessly defines a second as having that
+    signature, with an implicit quantity of 1. Units defined in
+    terms of their dimensional signatures can be used as a
+    foundation to defined other units. For example, let's
+    additionally define:
+       meter: [0 1 0]
+       kilogram: [0 0 1]
+       newton: kilogram_meter_per_second_squared
+    We have now seen our first unit definition in terms of other
+    units. The syntax of unit specifications is described in the
+    UnitParser class documentation.
+
+    Finally, unit name prefixes are defined by a name ending in a
+    hyphen and a factor:
+       kilo-: 1000
+       micro-: 1e-6
+    Any unit may then be used with any prefix, as in "kilonewton" or
+    "microseconds", in later definitions and in unit specifications,
+    without being listed. Prefixed names are resolved on demand.
+    Prefixes can only be applied to units of the table, not to other
+    prefixed names, and units defined explicitly take precedence.
+
+    """
+    with open(file) as f:
+        return _parse_definitions(f)
+
+
+def _parse_definitions(
+    lines: Iterable[str],
+    sig_len: int = -1,
+    base: Mapping[str, _UnitSpec] | None = None,
+    base_prefixes: '_Prefixes | None' = None,
+) -> tuple[int, dict[str, _UnitSpec], dict[str, float], dict[str, str]]:
+    """Parse the lines of a unit definition file.
+
+    See ``_parse_unit_file`` for the syntax. If ``base`` is given, the
+    definitions may refer to its units and to the prefixes of
+    ``base_prefixes``, and may redefine them.
+
+    Returns
+    -------
+    sig_len : int
+        Length of the signatures defined by the lines, or ``sig_len``
+        if they define none.
+    units : dict[str, _UnitSpec]
+        The units defined by the lines, by name.
+    prefixes : dict[str, float]
+        The factors of the unit name prefixes defined by the lines, by
+        prefix.
+    definitions : dict[str, str]
+        The definitions of the units, by name, normalized like
+        "60 second" or "[0 0 1]".
+
+    """
+    units: dict[str, _UnitSpec] = {}
+    prefixes: dict[str, float] = {}
+    definitions: dict[str, str] = {}
+    # Units that definitions may refer to.
+    table: Mapping[str, _UnitSpec] = (
+        units if base is None else _LayeredUnits(base, units)
+    )
+    # Index of the prefixes defined so far, for resolving prefixed
+    # names in definitions. Prefixes only add names, so names resolved
+    # earlier stay valid as the index grows; so do abbreviations, which
+    # are only ever added for new units.
+    abbreviations: set[str] = set()
+    prefix_index = _Prefixes({}, abbreviations)
+    if base_prefixes is not None:
+        abbreviations.update(base_prefixes.abbreviations)
+        prefix_index = _Prefixes(base_prefixes.factors, abbreviations)
+
+    for line_number, line in enumerate(lines, 1):
+        result = _DEFINITION_LINE_RE.match(line)
+        if result is None:
+            raise ValueError(f'Syntax error on line: {line_number}:')
+
+        unit_name, hyphen, vector, number, unit = result.groups()
+        if unit_name is None:
+            # This line is blank or a comment.
+            continue
+
+        if hyphen:
+            if number is None or unit is not None:
+                raise ValueError(
+                    f'Syntax error on line: {line_number}:'
+                    f' Prefix {unit_name} must be defined by a number.'
+                )
+            if unit_name in prefixes:
+                raise ValueError(
+                    f'Syntax error on line: {line_number}:'
+                    f' Prefix {unit_name} has already been specified.'
+                )
+            factor = _parse_definition_number(number, line_number)
+            if factor <= 0:
+                raise ValueError('Prefix factor must be strictly positive.')
+            prefixes[unit_name] = factor
+            prefix_index = _Prefixes(
+                {**prefix_index.factors, unit_name: factor}, abbreviations
+            )
+            continue
+
+        if vector is None and unit is None:
+            raise ValueError(f'Syntax error on line: {line_number}:')
+
+        if unit_name in units:
+            raise ValueError(
+                f'Syntax error on line: {line_number}:'
+                f' Unit {unit_name} has already been specified.'
+            )
+
+        if vector is not None:
+            # Unit is specified by signature; in this case,
+            # quantity is by definition unity.
+            sig = tuple(int(s) for s in vector.replace(',', ' ').split())
+
+            if sig_len == -1:
+                sig_len = len(sig)
+            elif len(sig) != sig_len:
+                raise ValueError(
+                    f'Syntax error on line: {line_number}:'
+                    f' Signature length inconsistent with previous units.'
+                )
+
+            units[unit_name] = _UnitSpec.from_signature(sig, 1.0)
+            definitions[unit_name] = f'[{" ".join(map(str, sig))}]'
+            continue
+
+        assert number is not None and unit is not None
+        this_quantity = _parse_definition_number(number, line_number)
+        if this_quantity <= 0:
+            raise ValueError('Quantity must be strictly positive.')
+
+        units[unit_name] = _scaled(table, sig_len, prefix_index, this_quantity, unit)
+        definitions[unit_name] = f'{number} {unit}'
+        if number == '1':
+            alias = _alias_of(unit_name, definitions[unit_name])
+            if alias is not None and (
+                len(unit_name) < len(alias) or alias in abbreviations
+            ):
+                abbreviations.add(unit_name)
+
+    return sig_len, units, prefixes, definitions
+
+
+def _parse_definition_number(number: str, line_number: int) -> float:
+    """Parse the number of a definition, reporting its line if invalid."""
+    try:
+        return _parse_number(number)
+    except (ZeroDivisionError, OverflowError):
+        raise ValueError(
+            f'Syntax error on line: {line_number}: Invalid number {number}.'
+        ) from None
+
+
+def _register_plurals(
+    units: dict[str, _UnitSpec],
+    definitions: dict[str, str],
+    base: Mapping[str, _UnitSpec] | None = None,
+) -> None:
+    """Register the regular plurals of ``units``, like "meters".
+
+    Plurals defined explicitly are kept. Over a ``base`` table, the
+    plurals of new units do not shadow units of the base, while units
+    redefining a unit of the base redefine its plural as well. Plurals
+    are recorded in ``definitions`` as "1 meter".
+
+    """
+    for name in list(units):
+        plural = name + 's'
+        if name.endswith('s') or plural in units:
+            continue
+        if base is None or plural not in base or name in base:
+            units[plural] = units[name]
+            definitions[plural] = f'1 {name}'
+
+
+def _alias_of(name: str, definition: str) -> str | None:
+    """Return the unit that ``name`` is defined as exactly one of, if any.
+
+    Like "kilometer" for "km: 1 kilometer". Compound units, and
+    redefinitions of a unit in terms of itself like "smoot: 1
+    kilosmoot", are not aliased.
+
+    """
+    if not definition.startswith('1 '):
+        return None
+    unit = definition[2:]
+    if '_' in unit or unit.endswith(name):
+        return None
+    return unit
+
+
+def _abbreviations(
+    definitions: Mapping[str, str], base: frozenset[str] = frozenset()
+) -> frozenset[str]:
+    """Return the abbreviations among ``definitions`` and ``base``.
+
+    Abbreviations are aliases (see ``_alias_of``) of a unit with a
+    longer name, like "km: 1 kilometer", or of an abbreviation, like
+    the plural "kms: 1 km". Irregular plurals like "feet: 1 foot" are
+    not abbreviations.
+
+    Definitions must be in the order they were made, so that every
+    unit comes after the units it refers to. Names of ``base``
+    redefined by ``definitions`` are dropped. If the definitions add
+    none, ``base`` itself is returned (not a copy).
+
+    """
+    inherited = base if base.isdisjoint(definitions) else base.difference(definitions)
+    own: set[str] = set()
+    for name, definition in definitions.items():
+        unit = _alias_of(name, definition)
+        if unit is not None and (
+            len(name) < len(unit) or unit in own or unit in inherited
+        ):
+            own.add(name)
+    return inherited | own if own else inherited
+
+
+# Keywords of unit specifications, which are not unit names.
+_KEYWORDS = frozenset({'per', 'squared', 'cubed'})
+
+
+def _tokens(definition: str) -> list[str]:
+    """Return the unit names a normalized definition refers to."""
+    if definition.startswith('['):
+        return []
+    unit = definition.partition(' ')[2]
+    return [token for token in unit.split('_') if token not in _KEYWORDS]
+
+
+def _scaled(
+    units: Mapping[str, _UnitSpec],
+    sig_len: int,
+    prefixes: _Prefixes,
+    quantity: float,
+    unit: str,
+) -> _UnitSpec:
+    """Return the unit defined as ``quantity`` times the units ``unit``."""
+    spec = units.get(unit)
+    if spec is None:
+        spec = _parse_specification(units, sig_len, unit, prefixes)
+    return _UnitSpec(spec.packed, spec.quantity * quantity, spec.sig_len)
+
+
+def _evaluate(
+    units: Mapping[str, _UnitSpec], sig_len: int, prefixes: _Prefixes, definition: str
+) -> _UnitSpec:
+    """Resolve a normalized definition, like "60 second" or "[0 0 1]"."""
+    if definition.startswith('['):
+        signature = tuple(int(s) for s in definition[1:-1].split())
+        return _UnitSpec.from_signature(signature, 1.0)
+    number, _, unit = definition.partition(' ')
+    return _scaled(units, sig_len, prefixes, _parse_number(number), unit)
+
+
+def _dependency_order(
+    definitions: Mapping[str, str],
+    units: Mapping[str, _UnitSpec],
+    prefixes: _Prefixes,
+) -> list[str]:
+    """Order the names of ``definitions`` so that dependencies come first.
+
+    Only dependencies among the names of ``definitions`` are considered;
+    a prefixed name depends on its unit. A definition referring to its
+    own name refers to the previous definition, not to itself.
+
+    Raises
+    ------
+    ValueError
+        If the definitions depend on each other in a cycle.
+
+    """
+    dependents: dict[str, list[str]] = {}
+    needs: dict[str, set[str]] = {}
+    waiting: dict[str, int] = {}
+    for name, definition in definitions.items():
+        needed = needs[name] = set()
+        for token in _tokens(definition):
+            if token not in units:
+                parts = prefixes.split(units, token)
+                if parts is not None:
+                    token = parts[1]
+            if token in definitions and token != name:
+                needed.add(token)
+        for token in needed:
+            dependents.setdefault(token, []).append(name)
+        waiting[name] = len(needed)
+
+    order = [name for name, count in waiting.items() if count == 0]
+    for name in order:
+        for dependent in dependents.get(name, ()):
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                order.append(dependent)
+    if len(order) < len(definitions):
+        # Every unit left waits for another; follow them until one repeats.
+        cycle: list[str] = []
+        name = next(name for name, count in waiting.items() if count)
+        while name not in cycle:
+            cycle.append(name)
+            name = next(token for token in needs[name] if waiting[token])
+        cycle = [*cycle[cycle.index(name) :], name]
+        raise ValueError(f'Circular unit definitions: {" -> ".join(cycle)}')
+    return order
+
+
+def _parse_number(number: str) -> float:
+    """Convert a number matched by _NUMBER_RE to float.
+
+    Only fractions go through Fraction; decimals are handed to float
+    directly, which rounds them identically but much faster.
+
+    """
+    if '/' in number:
+        return float(Fraction(number))
+    return float(number)
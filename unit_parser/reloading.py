@@ -0,0 +1,204 @@
+"""Parsers that pick up changes to their unit definition file.
+
+A ``UnitParser`` parses its definition file once, when it is
+constructed. ``ReloadingUnitParser`` watches the file instead and,
+when it changes, parses it in the background into a complete new
+parser, which then replaces the current one in a single reference
+assignment. Every call runs entirely on the parser that was current
+when it started, so in-flight conversions never see a partially
+built table; calls made after the swap see the new units, with empty
+caches.
+
+The file is watched by polling its modification time, size, and inode
+number, which works on every platform and catches editors that
+replace files instead of writing to them.
+
+Usage
+-----
+> from unit_parser.reloading import ReloadingUnitParser
+> up = ReloadingUnitParser("custom_units.txt", interval=1.0)
+> up.convert("5 widgets", "meters")
+ 4.572
+> # ... custom_units.txt is edited ...
+> up.convert("5 widgets", "meters")
+ 6.096
+> up.close()
+
+"""
+
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from .registry import UnitRegistry
+from .units import UnitParser
+
+
+def _stamp(path: str | Path) -> tuple[int, int, int]:
+    """Return what identifies the current version of the file at ``path``."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ReloadingUnitParser:
+    """Unit parser that reloads its definition file when it changes.
+
+    All methods of ``UnitParser`` are available and run on the current
+    parser, ``parser``. In tight loops, fetch ``parser`` (or a bound
+    method of it) once to skip the delegation; the fetched parser keeps
+    working after a reload, with the units it was built with.
+
+    Reloads replace the whole parser, so per-parser state like caches
+    and instrumentation (see ``UnitParser.enable_instrumentation``)
+    starts afresh. A file that fails to parse, or is missing, does not
+    replace the current parser; the error is kept in ``last_error`` and
+    passed to ``on_error``, and the file is parsed again once it
+    changes again. The background thread keeps watching whatever the
+    error, even if ``on_error`` itself raises.
+
+    Parameters
+    ----------
+    unit_definitions : str | Path
+        Location of the unit definition file to watch.
+    interval : float, optional
+        Seconds between checks of the file by a background thread.
+        Pass None to not start a thread, and check with ``check``
+        instead. Defaults to 1.0.
+    base : UnitRegistry, optional
+        If given, the file is loaded as an overlay on ``base`` (see
+        ``UnitRegistry.overlay``), so that reloads only parse the
+        file's own definitions.
+    on_error : Callable[[Exception], object], optional
+        Called, from the thread that checked the file, with each error
+        raised while reloading it. Exceptions it raises propagate from
+        ``check``, and are ignored by the background thread.
+    **parser_options
+        Passed on to ``UnitParser``, like ``cache_size``.
+
+    Raises
+    ------
+    OSError
+        If the file cannot be read initially.
+    ValueError
+        If the file is invalid initially, or ``interval`` is not
+        positive.
+
+    """
+
+    def __init__(
+        self,
+        unit_definitions: str | Path,
+        *,
+        interval: float | None = 1.0,
+        base: UnitRegistry | None = None,
+        on_error: Callable[[Exception], object] | None = None,
+        **parser_options: Any,
+    ) -> None:
+        if interval is not None and interval <= 0:
+            raise ValueError('interval must be positive.')
+        self.path = Path(unit_definitions)
+        self.base = base
+        self.on_error = on_error
+        self.last_error: Exception | None = None
+        self.reloads = 0
+        self._parser_options = parser_options
+        # Serializes checks, so that a file is parsed once per change.
+        self._lock = threading.Lock()
+        self._stamp: tuple[int, int, int] | None = _stamp(self.path)
+        self._parser = self._load()
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        if interval is not None:
+            self._thread = threading.Thread(
+                target=self._watch,
+                args=(interval,),
+                name=f'unit_parser reload {self.path.name}',
+                daemon=True,
+            )
+            self._thread.start()
+
+    @property
+    def parser(self) -> UnitParser:
+        """The parser built from the current contents of the file."""
+        return self._parser
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._parser, name)
+
+    def _load(self) -> UnitParser:
+        if self.base is None:
+            registry = UnitRegistry.from_file(self.path)
+        else:
+            registry = self.base.overlay(file=self.path)
+        return UnitParser(registry=registry, **self._parser_options)
+
+    def check(self) -> bool:
+        """Reload the file if it changed since it was last loaded.
+
+        Returns
+        -------
+        bool
+            Whether the parser was replaced.
+
+        """
+        with self._lock:
+            error: Exception | None = None
+            try:
+                stamp = _stamp(self.path)
+            except OSError as e:
+                # A missing file is reported once, not on every check.
+                stamp, error = None, e
+            if stamp == self._stamp:
+                return False
+            # Record the version before reading it: if the file is still
+            # being written, the next check sees it change again.
+            self._stamp = stamp
+            if error is None:
+                try:
+                    parser = self._load()
+                except Exception as e:
+                    error = e
+            if error is not None:
+                self.last_error = error
+                if self.on_error is not None:
+                    self.on_error(error)
+                return False
+            self._parser = parser
+            self.last_error = None
+            self.reloads += 1
+            return True
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                # Raised by on_error; the error itself is in last_error.
+                pass
+
+    def close(self) -> None:
+        """Stop watching the file. The current parser remains usable."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'ReloadingUnitParser':
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f'<ReloadingUnitParser: {self.path}, {self.reloads} reloads>'
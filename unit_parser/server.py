@@ -0,0 +1,149 @@
+"""Conversion server over a Unix domain socket.
+
+Programs that convert units often, but are not written in Python, can
+run one long-lived server instead of paying interpreter startup and
+unit file parsing for every conversion. The server keeps a single
+warm ``UnitParser``, caches included, and serves any number of
+concurrent clients from one asyncio event loop.
+
+Protocol
+--------
+Requests and responses are lines of UTF-8 text. Each request has the
+form ``QUANTITY UNITS [to] DESIRED_UNITS``, like the arguments of the
+``convert`` command, and is answered by one line: ``ok VALUE`` or
+``error MESSAGE``. Responses are sent in request order, so clients
+may pipeline requests, writing many before reading any responses;
+requests that arrive together are answered in a single write.
+
+Usage
+-----
+$ convert --serve /tmp/convert.sock &
+$ printf '2 hours to minutes\n1 yard meters\n' | nc -U /tmp/convert.sock
+ok 120.0
+ok 0.9144
+
+"""
+
+import asyncio
+import contextlib
+import functools
+import signal
+
+from .shared import default
+from .units import UnitParser
+
+# Longest request line accepted, in bytes.
+MAX_REQUEST = 1 << 16
+
+_READ_SIZE = 1 << 16
+
+
+def handle_request(parser: UnitParser, request: str) -> str:
+    """Answer one request line.
+
+    Parameters
+    ----------
+    parser : UnitParser
+        Parser to convert with.
+    request : str
+        A request like "5 feet to inches", without the line terminator.
+
+    Returns
+    -------
+    str
+        The response line, including the trailing newline.
+
+    """
+    words = request.split()
+    if len(words) == 4 and words[2] == 'to':
+        del words[2]
+    if len(words) != 3:
+        return 'error expected "QUANTITY UNITS [to] DESIRED_UNITS"\n'
+    quantity, units, desired_units = words
+    try:
+        value = parser.convert(f'{quantity} {units}', desired_units)
+    except (ValueError, ZeroDivisionError, OverflowError) as e:
+        message = ' '.join(str(e).split())
+        return f'error {message}\n'
+    return f'ok {value}\n'
+
+
+async def _serve_client(
+    parser: UnitParser, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    partial = b''
+    try:
+        while True:
+            data = await reader.read(_READ_SIZE)
+            if not data:
+                if partial.strip():
+                    writer.write(
+                        handle_request(
+                            parser, partial.decode(errors='replace')
+                        ).encode()
+                    )
+                    await writer.drain()
+                break
+            *requests, partial = (partial + data).split(b'\n')
+            if requests:
+                writer.write(
+                    ''.join(
+                        handle_request(parser, request.decode(errors='replace'))
+                        for request in requests
+                    ).encode()
+                )
+                await writer.drain()
+            if len(partial) > MAX_REQUEST:
+                writer.write(b'error request too long\n')
+                await writer.drain()
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def start_server(path: str, parser: UnitParser | None = None) -> asyncio.Server:
+    """Start serving conversions on the Unix socket at ``path``.
+
+    Parameters
+    ----------
+    path : str
+        Path of the socket. A stale socket left at this path is
+        replaced.
+    parser : UnitParser, optional
+        Parser to convert with. Defaults to the shared parser for the
+        built-in units (see ``unit_parser.default``).
+
+    Returns
+    -------
+    asyncio.Server
+        The listening server.
+
+    """
+    if parser is None:
+        parser = default()
+    return await asyncio.start_unix_server(
+        functools.partial(_serve_client, parser), path=path
+    )
+
+
+def serve(path: str, parser: UnitParser | None = None) -> None:
+    """Serve conversions on the Unix socket at ``path``.
+
+    Runs until the process receives SIGINT or SIGTERM.
+
+    """
+
+    async def run() -> None:
+        server = await start_server(path, parser)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        async with server:
+            await stop.wait()
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+"""Process-wide parser built from the unit definition file shipped with
+this library.
+
+Constructing a ``UnitParser`` parses the definition file, so library
+code that only needs the built-in units should share one instance
+rather than build its own. ``default()`` constructs that instance on
+first use; the module-level helpers forward to it. (The helpers are
+not re-exported from the package itself, where ``unit_parser.convert``
+is the command-line module.)
+
+Usage
+-----
+> import unit_parser
+> unit_parser.default().converter("feet", "meters")(5)
+ 1.524
+> from unit_parser.shared import convert
+> convert("5 feet", "meters")
+ 1.524
+
+"""
+
+import threading
+from typing import overload
+
+from .units import UnitParser
+
+_default: UnitParser | None = None
+_lock = threading.Lock()
+
+
+def default() -> UnitParser:
+    """Return the shared parser for the built-in units.
+
+    The parser is constructed on the first call. Concurrent first
+    calls from several threads construct it only once, and every
+    caller receives the same instance.
+
+    """
+    global _default
+    parser = _default
+    if parser is None:
+        with _lock:
+            parser = _default
+            if parser is None:
+                parser = _default = UnitParser()
+    return parser
+
+
+@overload
+def convert(physical_quantity: str, desired_units: str, /) -> float: ...
+@overload
+def convert(quantity: float, units: str, desired_units: str, /) -> float: ...
+def convert(a: str | float, b: str, c: str | None = None, /) -> float:
+    """Convert from one unit to another; see ``UnitParser.convert``."""
+    if c is None:
+        if not isinstance(a, str):
+            raise ValueError('Two-argument form requires a string like "5 feet"')
+        return default().convert(a, b)
+    return default().convert(float(a), b, c)
+
+
+def add(x: str, y: str, sum_units: str) -> float:
+    """Add physical quantities; see ``UnitParser.add``."""
+    return default().add(x, y, sum_units)
+
+
+def subtract(x: str, y: str, diff_units: str) -> float:
+    """Subtract physical quantities; see ``UnitParser.subtract``."""
+    return default().subtract(x, y, diff_units)
+
+
+def multiply(x: str, y: str, product_units: str) -> float:
+    """Multiply physical quantities; see ``UnitParser.multiply``."""
+    return default().multiply(x, y, product_units)
+
+
+def divide(numerator: str, denominator: str, quotient_units: str) -> float:
+    """Divide physical quantities; see ``UnitParser.divide``."""
+    return default().divide(numerator, denominator, quotient_units)
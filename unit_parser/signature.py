@@ -0,0 +1,104 @@
+"""Packed integer encoding of dimensional signatures.
+
+A signature like (1, 0, -2) is encoded as a single integer holding one
+fixed-width bit field per dimension. Each field stores the exponent
+plus a bias, so that the encoding of a signature is unique and two
+signatures are equal exactly when their packed integers are equal.
+
+Multiplying two units adds their signatures. Since every field is
+biased, this is the integer ``a + b - BIAS``, where ``BIAS`` has the
+bias in every field; dividing is ``a - b + BIAS``. Exponents occupy
+the lower ``FIELD_BITS - 1`` bits of their field, leaving the top bit
+as a guard: if an exponent leaves the representable range, the result
+has a guard bit set or is negative, which ``multiply`` and ``divide``
+check for.
+
+"""
+
+FIELD_BITS = 8
+_FIELD_BIAS = 1 << (FIELD_BITS - 2)
+_FIELD_GUARD = 1 << (FIELD_BITS - 1)
+
+MIN_EXPONENT = -_FIELD_BIAS
+MAX_EXPONENT = _FIELD_BIAS - 1
+
+# (bias, guard) words by signature length.
+_words: dict[int, tuple[int, int]] = {}
+
+
+def words(sig_len: int) -> tuple[int, int]:
+    """Return the bias and guard words for signatures of ``sig_len``.
+
+    The bias word is the packed form of the all-zero (dimensionless)
+    signature; the guard word has the guard bit of every field set.
+
+    """
+    result = _words.get(sig_len)
+    if result is None:
+        bias = 0
+        guard = 0
+        for i in range(sig_len):
+            bias |= _FIELD_BIAS << (FIELD_BITS * i)
+            guard |= _FIELD_GUARD << (FIELD_BITS * i)
+        result = _words[sig_len] = (bias, guard)
+    return result
+
+
+def pack(signature: tuple[int, ...]) -> int:
+    """Encode a signature as a packed integer.
+
+    Raises
+    ------
+    ValueError
+        If an exponent is outside ``[MIN_EXPONENT, MAX_EXPONENT]``.
+
+    """
+    packed = 0
+    for i, exponent in enumerate(signature):
+        if not MIN_EXPONENT <= exponent <= MAX_EXPONENT:
+            raise ValueError(
+                f'Signature exponent {exponent} outside of supported range '
+                f'[{MIN_EXPONENT}, {MAX_EXPONENT}].'
+            )
+        packed |= (exponent + _FIELD_BIAS) << (FIELD_BITS * i)
+    return packed
+
+
+def unpack(packed: int, sig_len: int) -> tuple[int, ...]:
+    """Decode a packed integer into a signature of length ``sig_len``."""
+    mask = (1 << FIELD_BITS) - 1
+    return tuple(
+        ((packed >> (FIELD_BITS * i)) & mask) - _FIELD_BIAS for i in range(sig_len)
+    )
+
+
+def multiply(a: int, b: int, sig_len: int) -> int:
+    """Return the packed signature of the product of two units.
+
+    Raises
+    ------
+    ValueError
+        If an exponent of the product is out of range.
+
+    """
+    bias, guard = words(sig_len)
+    result = a + b - bias
+    if result < 0 or result & guard:
+        raise ValueError('Signature exponent out of range.')
+    return result
+
+
+def divide(a: int, b: int, sig_len: int) -> int:
+    """Return the packed signature of the quotient of two units.
+
+    Raises
+    ------
+    ValueError
+        If an exponent of the quotient is out of range.
+
+    """
+    bias, guard = words(sig_len)
+    result = a - b + bias
+    if result < 0 or result & guard:
+        raise ValueError('Signature exponent out of range.')
+    return result
@@ -0,0 +1,224 @@
+"""Binary snapshots of a compiled unit table.
+
+Parsing a unit definition file involves several regular expressions per
+line and the resolution of every derived unit. A snapshot stores the
+result instead: a packed array of signatures, an array of quantities,
+an index from unit names to entries of those arrays, the factors of
+the unit name prefixes, and the definition of every unit, from which
+the dependencies between units are recovered. Loading a snapshot skips
+parsing entirely.
+
+Each snapshot records the SHA-256 digest of the definition file it was
+compiled from, and is only loaded for a file with the same digest.
+
+Layout (little-endian)::
+
+    magic          8 bytes   b'UPSNAP03'
+    digest        32 bytes   SHA-256 of the definition file
+    sig_len        u32       signature length
+    n_specs        u32       number of distinct (signature, quantity) pairs
+    n_names        u32       number of unit names
+    n_prefixes     u32       number of unit name prefixes
+    signatures     i32 * n_specs * sig_len
+    quantities     f64 * n_specs
+    name_specs     u32 * n_names, index into the spec arrays
+    factors        f64 * n_prefixes
+    names          utf-8, unit names, then prefixes, then the definition
+                   of every unit (empty if unknown), separated by
+                   newlines
+
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import NamedTuple
+
+_MAGIC = b'UPSNAP03'
+_HEADER = struct.Struct('<8s32sIIII')
+
+
+class Snapshot(NamedTuple):
+    """Compiled unit table.
+
+    Attributes
+    ----------
+    sig_len : int
+        Length of every signature.
+    specs : list[tuple[tuple[int, ...], float]]
+        Distinct (signature, quantity) pairs.
+    names : dict[str, int]
+        Index into ``specs`` for every unit name, including aliases.
+    prefixes : dict[str, float]
+        Factor of every unit name prefix, like "kilo".
+    definitions : dict[str, str]
+        Definition of every unit name, like "60 second"; empty if
+        unknown.
+
+    """
+
+    sig_len: int
+    specs: list[tuple[tuple[int, ...], float]]
+    names: dict[str, int]
+    prefixes: dict[str, float]
+    definitions: dict[str, str]
+
+
+def source_digest(file: str | Path) -> bytes:
+    """Return the SHA-256 digest of a unit definition file."""
+    with open(file, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def _little_endian(values: 'array[int] | array[float]') -> None:
+    if sys.byteorder == 'big':  # pragma: no cover
+        values.byteswap()
+
+
+def dumps(snapshot: Snapshot, digest: bytes) -> bytes:
+    """Serialize a compiled unit table.
+
+    Parameters
+    ----------
+    snapshot : Snapshot
+        The compiled unit table.
+    digest : bytes
+        SHA-256 digest of the definition file it was compiled from.
+
+    Returns
+    -------
+    bytes
+        The binary snapshot.
+
+    """
+    signatures = array('i')
+    quantities = array('d')
+    for signature, quantity in snapshot.specs:
+        signatures.extend(signature)
+        quantities.append(quantity)
+    name_specs = array('I', snapshot.names.values())
+    factors = array('d', snapshot.prefixes.values())
+    for values in (signatures, quantities, name_specs, factors):
+        _little_endian(values)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        digest,
+        snapshot.sig_len,
+        len(snapshot.specs),
+        len(snapshot.names),
+        len(snapshot.prefixes),
+    )
+    definitions = [snapshot.definitions.get(name, '') for name in snapshot.names]
+    names = '\n'.join([*snapshot.names, *snapshot.prefixes, *definitions]).encode(
+        'utf-8'
+    )
+    return b''.join(
+        [
+            header,
+            signatures.tobytes(),
+            quantities.tobytes(),
+            name_specs.tobytes(),
+            factors.tobytes(),
+            names,
+        ]
+    )
+
+
+def loads(data: bytes, digest: bytes | None = None) -> Snapshot | None:
+    """Deserialize a compiled unit table.
+
+    Parameters
+    ----------
+    data : bytes
+        A binary snapshot, as produced by ``dumps``.
+    digest : bytes, optional
+        Expected digest of the definition file. If given and the
+        snapshot was compiled from a different file, None is returned.
+
+    Returns
+    -------
+    Snapshot or None
+        The compiled unit table, or None if the snapshot is stale or
+        not a valid snapshot.
+
+    """
+    try:
+        magic, snap_digest, sig_len, n_specs, n_names, n_prefixes = _HEADER.unpack_from(
+            data
+        )
+    except struct.error:
+        return None
+    if magic != _MAGIC or (digest is not None and snap_digest != digest):
+        return None
+
+    offset = _HEADER.size
+    signatures = array('i')
+    quantities = array('d')
+    name_specs = array('I')
+    factors = array('d')
+    try:
+        for values, count in (
+            (signatures, n_specs * sig_len),
+            (quantities, n_specs),
+            (name_specs, n_names),
+            (factors, n_prefixes),
+        ):
+            end = offset + count * values.itemsize
+            if end > len(data):
+                return None
+            values.frombytes(data[offset:end])
+            _little_endian(values)
+            offset = end
+        text = data[offset:].decode('utf-8')
+        names = text.split('\n') if n_names or n_prefixes else []
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if len(names) != 2 * n_names + n_prefixes or any(i >= n_specs for i in name_specs):
+        return None
+
+    specs = [
+        (tuple(signatures[i * sig_len : (i + 1) * sig_len]), quantities[i])
+        for i in range(n_specs)
+    ]
+    return Snapshot(
+        sig_len,
+        specs,
+        dict(zip(names[:n_names], name_specs, strict=True)),
+        dict(zip(names[n_names : n_names + n_prefixes], factors, strict=True)),
+        dict(zip(names[:n_names], names[n_names + n_prefixes :], strict=True)),
+    )
+
+
+def read(file: str | Path, digest: bytes | None = None) -> Snapshot | None:
+    """Load a snapshot file, returning None if missing, stale, or invalid."""
+    try:
+        with open(file, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return loads(data, digest)
+
+
+def write(file: str | Path, snapshot: Snapshot, digest: bytes) -> None:
+    """Write a snapshot file atomically.
+
+    The snapshot is written to a temporary file in the same directory
+    and moved into place, so concurrent readers never see a partially
+    written snapshot.
+
+    """
+    path = Path(file)
+    data = dumps(snapshot, digest)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -1,18 +1,71 @@
 """Unit parsing and conversion."""
 
 import re
-from dataclasses import dataclass
-from fractions import Fraction
+from collections.abc import Callable, Iterable
 from pathlib import Path
-from typing import overload
+from typing import TYPE_CHECKING, Any, NamedTuple, overload
+
+from . import signature
+from ._optional import NUMPY_REQUIRED
+from .cache import CacheInfo, StripedLRUCache
+from .converter import Converter
+from .errors import ErrorCode, _Failure
+from .expression import CompiledExpression, build_evaluator, fold, parse_expression
+from .instrumentation import Instrumentation
+from .matrix import FactorMatrix
+from .quantity import Quantity
+from .registry import _NUMBER_RE, UnitRegistry, _parse_number, _UnitSpec
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import ArrayLike, NDArray
+
+# This regular expression represents a physical quantity, like "5 feet",
+# "1/3 tablespoons", or "1e3 meters", capturing the number and the
+# units. Numbers are written as in unit definition files.
+_COMPOSITE_UNIT_RE = r'[a-zA-Z_]+'
+_PHYSICAL_QUANTITY_RE = re.compile(
+    r'(' + _NUMBER_RE + r')\s*(' + _COMPOSITE_UNIT_RE + r')'
+)
+
+
+class ParsedQuantities(NamedTuple):
+    """Columns produced by ``UnitParser.parse_quantities``.
+
+    Attributes
+    ----------
+    values : numpy.ndarray
+        Float array of the parsed numbers; NaN for malformed rows.
+    unit_codes : numpy.ndarray
+        Integer array indexing into ``units``; -1 for malformed rows.
+    units : list[str]
+        Distinct unit strings, in order of first appearance.
+    malformed : numpy.ndarray
+        Boolean mask, True for rows that could not be parsed.
+
+    """
+
+    values: 'NDArray[np.float64]'
+    unit_codes: 'NDArray[np.intp]'
+    units: list[str]
+    malformed: 'NDArray[np.bool_]'
 
 
-@dataclass(frozen=True)
-class _UnitSpec:
-    """Internal representation of a unit's dimensional signature and quantity."""
+class ConversionResults(NamedTuple):
+    """Columns produced by the non-raising batch conversions.
 
-    signature: tuple[int, ...]
-    quantity: float
+    Attributes
+    ----------
+    values : numpy.ndarray
+        Float array of the converted values; NaN for rows that failed.
+    errors : numpy.ndarray
+        Array of ``ErrorCode`` values (as uint8), ``ErrorCode.OK`` for
+        rows that converted.
+
+    """
+
+    values: 'NDArray[np.float64]'
+    errors: 'NDArray[np.uint8]'
 
 
 class UnitParser:
@@ -47,23 +100,323 @@ class UnitParser:
     automatically for every unit whose name does not already end in
     's'. Irregular plurals ('feet', 'inches') and abbreviations
     ('sec', 'ft') are defined explicitly in the unit definition file.
+    Likewise, prefixes declared by the file, like 'kilo' and 'nano',
+    combine with every unit except abbreviations like 'km', as in
+    'kilowatt' or 'nanoseconds'.
+
+    A parser may be shared by any number of threads. Its table of
+    units is immutable after construction and read without locking;
+    the compound unit cache is split into independently locked
+    stripes, so concurrent conversions scale across cores on
+    free-threaded Python builds.
+
+    Parameters
+    ----------
+    unit_definitions : str | Path, optional
+        Location of a unit definition file. Defaults to the file
+        shipped with this library.
+    cache_size : int, optional
+        Maximum number of compound unit specifications, like
+        'kilogram_meter_per_second_squared', whose resolved signature
+        and quantity are memoized. Large caches are split into up to
+        16 stripes by hash, and the least recently used entry of a
+        stripe is evicted when the stripe is full. Units defined directly in the
+        definition file are always looked up without the cache. Pass
+        0 to disable caching. Defaults to 1024.
+    cache_failures : bool, optional
+        Whether invalid specifications are memoized as well, so that
+        repeated lookups of the same bad unit fail without being
+        re-parsed. Defaults to True.
+    snapshot : str | Path, optional
+        Location of a binary snapshot of the compiled unit table. If
+        the snapshot exists and was compiled from the current contents
+        of the unit definition file, the table is loaded from it and
+        the definition file is not parsed at all. Otherwise the file
+        is parsed and the snapshot (re)written, if possible.
+    registry : UnitRegistry, optional
+        Previously loaded table of units to use instead of loading a
+        unit definition file. Registries are immutable, so one
+        registry may be shared by any number of parsers.
+    precompute_factors : bool, optional
+        Whether to build the factor matrix (see ``factor_matrix``) of
+        every dimension in the table at construction. ``convert``
+        between two units of the table then reads the factor from the
+        matrix instead of resolving both units. Matrices hold n²
+        factors for the n units of each dimension, which takes memory
+        quadratic in the size of the largest dimension. Compound
+        specifications and prefixed names are not in any matrix and
+        are converted as usual. Defaults to False.
 
     """
 
-    def __init__(self, unit_definitions: str | Path | None = None) -> None:
-        self._units: dict[str, _UnitSpec] = {}
-        self._sig_len: int = -1
-        if unit_definitions is not None:
-            self._parse_unit_file(unit_definitions)
-        else:
-            unit_path = Path(__file__).parent / 'units' / 'units.txt'
-            self._parse_unit_file(unit_path)
-        for name in list(self._units):
-            if not name.endswith('s') and name + 's' not in self._units:
-                self._units[name + 's'] = self._units[name]
+    def __init__(
+        self,
+        unit_definitions: str | Path | None = None,
+        *,
+        cache_size: int = 1024,
+        cache_failures: bool = True,
+        snapshot: str | Path | None = None,
+        registry: UnitRegistry | None = None,
+        precompute_factors: bool = False,
+    ) -> None:
+        if registry is None:
+            registry = UnitRegistry.from_file(unit_definitions, snapshot=snapshot)
+        elif unit_definitions is not None or snapshot is not None:
+            raise ValueError('Pass either a registry or unit definitions, not both.')
+        self._registry = registry
+        # Aliases of the registry's table for the hot paths; never
+        # modified.
+        self._units = registry._units
+        self._sig_len = registry.sig_len
+        # Cached compound units are also indexed by packed signature,
+        # within the stripe (and under the lock) holding them.
+        self._cache: StripedLRUCache[_UnitSpec | _Failure] = StripedLRUCache(
+            cache_size, index=_packed_signature
+        )
+        self._cache_size = cache_size
+        self._cache_failures = cache_failures
+        # Factor matrix of each unit in the table, and the offset of the
+        # unit's row in it, if precomputed.
+        self._matrices: dict[str, tuple[FactorMatrix, int]] | None = None
+        if precompute_factors:
+            self._matrices = {}
+            for packed in {spec.packed for spec in self._units.values()}:
+                matrix = self._build_factor_matrix(packed)
+                n = len(matrix)
+                for i, name in enumerate(matrix.units):
+                    self._matrices[name] = (matrix, i * n)
+        self._instrumentation: Instrumentation | None = None
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickle the (compact) registry and the settings; the cache is
+        # rebuilt by the receiving process.
+        return (
+            _unpickle_parser,
+            (
+                self._registry,
+                self._cache_size,
+                self._cache_failures,
+                self._matrices is not None,
+            ),
+        )
+
+    @property
+    def registry(self) -> UnitRegistry:
+        """The immutable table of units this parser resolves against."""
+        return self._registry
+
+    def cache_info(self) -> CacheInfo:
+        """Report statistics of the compound unit specification cache.
+
+        Returns
+        -------
+        CacheInfo
+            Named tuple of hits, misses, maxsize, and currsize.
+
+        """
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """Empty the compound unit specification cache."""
+        self._cache.clear()
+
+    def enable_instrumentation(self) -> None:
+        """Start collecting call counts, latencies, and unit statistics.
+
+        Instrumentation is opt-in: until it is enabled, no counting or
+        timing code runs at all. Enabling it shadows the parser's
+        methods with instrumented wrappers on this instance only;
+        ``disable_instrumentation`` removes them. Conversions served by
+        precomputed factor matrices skip unit resolution and so are not
+        counted in the resolution statistics.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > up.enable_instrumentation()
+        > up.convert("5 feet", "meters")
+         1.524
+        > up.instrumentation_snapshot()["resolution"]
+         {'table_hits': 2, 'compound_lookups': 0, 'compound_parses': 0}
+
+        """
+        if self._instrumentation is not None:
+            return
+        inst = self._instrumentation = Instrumentation()
+
+        resolve = self._resolve
+        table = self._units
+
+        def counting_resolve(unit: str) -> _UnitSpec | _Failure:
+            inst.record_resolution(unit, unit in table)
+            return resolve(unit)
+
+        def resolve_or_raise(unit: str) -> _UnitSpec:
+            # Route every resolution through the counting _resolve.
+            result = self._resolve(unit)
+            if isinstance(result, _Failure):
+                raise ValueError(result.message)
+            return result
+
+        self._resolve = counting_resolve  # type: ignore[method-assign]
+        self._signature_and_quantity_for_unit = inst.timed(  # type: ignore[method-assign]
+            'resolve_unit', resolve_or_raise, count_errors=False
+        )
+        self._parse_physical_quantity = inst.timed(  # type: ignore[method-assign]
+            'parse_physical_quantity', self._parse_physical_quantity, count_errors=False
+        )
+        for name in _INSTRUMENTED_METHODS:
+            method = getattr(self, name)
+            if name in ('try_convert_quantities', 'try_convert_many'):
+                method = _counting_error_codes(inst, method)
+            setattr(self, name, inst.timed(name, method))
+
+    def disable_instrumentation(self) -> None:
+        """Stop collecting statistics and discard those collected."""
+        for name in _INSTRUMENTED_METHODS + _INSTRUMENTED_INTERNALS:
+            self.__dict__.pop(name, None)
+        self._instrumentation = None
+
+    def instrumentation_snapshot(self, top_n: int = 10) -> dict[str, Any]:
+        """Return the statistics collected since instrumentation was enabled.
+
+        Parameters
+        ----------
+        top_n : int, optional
+            Number of most requested unit strings to include. Defaults
+            to 10.
+
+        Returns
+        -------
+        dict
+            A snapshot with keys:
+
+            - ``calls``: for each method called, a dict of the number of
+              calls (``count``) and their cumulative wall time
+              (``seconds``). Besides the public methods, this includes
+              the internal steps ``parse_physical_quantity`` and
+              ``resolve_unit``, whose time is also part of the methods
+              calling them.
+            - ``resolution``: counts of units found in the table
+              (``table_hits``), resolved as compound specifications
+              (``compound_lookups``), and of those, parsed because they
+              were not cached (``compound_parses``).
+            - ``top_units``: the ``top_n`` most resolved unit strings,
+              as ``(unit, count)`` pairs.
+            - ``errors``: the number of errors by category, the name of
+              an ``ErrorCode`` like 'UNKNOWN_UNIT'. Rows that failed in
+              ``try_convert_quantities`` and ``try_convert_many`` are
+              included.
+
+        Raises
+        ------
+        ValueError
+            If instrumentation is not enabled.
+
+        """
+        if self._instrumentation is None:
+            raise ValueError('Instrumentation is not enabled.')
+        return self._instrumentation.snapshot(top_n)
+
+    def dimension_of(self, unit: str) -> tuple[int, ...]:
+        """Return the dimensional signature of a unit.
+
+        Parameters
+        ----------
+        unit : str
+            A unit, like "feet" or "meters_per_second".
+
+        Returns
+        -------
+        tuple[int, ...]
+            The exponent of each base dimension, in the order used by
+            the unit definition file.
+
+        """
+        return self._signature_and_quantity_for_unit(unit).signature
+
+    def compatible_units(self, unit: str) -> list[str]:
+        """List the units having the same dimensions as a unit.
+
+        The result contains every unit defined in the unit definition
+        file (including aliases and plurals) with the same signature,
+        followed by the compound units with that signature which are
+        currently in the cache. It is served from an index built when
+        the table is loaded, without scanning the table.
+
+        Parameters
+        ----------
+        unit : str
+            A unit, like "feet" or "meters_per_second".
+
+        Returns
+        -------
+        list[str]
+            The compatible units, possibly including ``unit`` itself.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > "yards" in up.compatible_units("feet")
+         True
+
+        """
+        packed = self._signature_and_quantity_for_unit(unit).packed
+        names = list(self._registry.names_with_signature(packed))
+        names.extend(self._cache.indexed(packed))
+        return names
+
+    def factor_matrix(self, unit: str) -> FactorMatrix:
+        """Return the conversion factor matrix for the dimension of a unit.
+
+        The matrix covers every unit defined in the unit definition
+        file (including aliases and plurals) with the same signature as
+        ``unit``. Matrices are precomputed when the parser is created
+        with ``precompute_factors=True``, and built on demand
+        otherwise.
+
+        Parameters
+        ----------
+        unit : str
+            A unit, like "feet" or "meters_per_second".
+
+        Returns
+        -------
+        FactorMatrix
+            The conversion factors between all units of the dimension.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser(precompute_factors=True)
+        > lengths = up.factor_matrix("feet")
+        > lengths.factor("feet", "inches")
+         12.0
+        > codes = lengths.encode(["feet", "yards"])
+        > lengths.convert_codes([1.0, 1.0], codes, "feet")
+         array([1., 3.])
+
+        """
+        if self._matrices is not None:
+            entry = self._matrices.get(unit)
+            if entry is not None:
+                return entry[0]
+        packed = self._signature_and_quantity_for_unit(unit).packed
+        return self._build_factor_matrix(packed)
+
+    def _build_factor_matrix(self, packed: int) -> FactorMatrix:
+        names = self._registry.names_with_signature(packed)
+        return FactorMatrix(names, [self._units[name].quantity for name in names])
 
     def _signature_and_quantity_for_unit(self, unit: str) -> _UnitSpec:
-        """Parse unit specification.
+        """Look up or parse unit specification.
+
+        Units defined in the unit definition file are returned
+        directly; compound specifications are memoized in a bounded
+        cache, including (if enabled) specifications that failed to
+        parse.
 
         Parameters
         ----------
@@ -76,72 +429,42 @@ class UnitParser:
         _UnitSpec
             The signature and quantity for the unit.
 
+        Raises
+        ------
+        ValueError
+            If the specification is invalid or refers to an unknown
+            unit.
+
         """
-        if unit in self._units:
-            return self._units[unit]
-
-        # Parse string
-        tokens = unit.split('_')
-        signature = [0] * self._sig_len
-        sig_buffer = [0] * self._sig_len
-        quantity = 1.0
-        quantity_buffer = 1.0
-        in_numerator = True
-        was_unit = False
-
-        for token in tokens:
-            if token == 'per':
-                if not in_numerator:
-                    raise ValueError("Multiple uses of keyword 'per' not allowed")
-                in_numerator = False
-                was_unit = False
-            elif token == 'squared' or token == 'cubed':
-                if not was_unit:
-                    # Can't do 'per_squared' or 'cubed_squared' or even
-                    # 'squared_meters'
-                    raise ValueError(f'Invalid use of keyword {token}.')
-
-                # Previous token was a unit, so squared and cubed are
-                # valid modifiers. The modifiers are applied to the
-                # contents of sig_buffer and quantity_buffer.
-                if token == 'cubed':
-                    for si in range(self._sig_len):
-                        sig_buffer[si] *= 2
-
-                    quantity_buffer *= quantity_buffer
-
-                if in_numerator:
-                    for si in range(self._sig_len):
-                        signature[si] += sig_buffer[si]
-
-                    quantity *= quantity_buffer
-                else:
-                    for si in range(self._sig_len):
-                        signature[si] -= sig_buffer[si]
-
-                    quantity /= quantity_buffer
-
-                was_unit = False
-            elif token in self._units:
-                sig_buffer = list(self._units[token].signature)
-                quantity_buffer = self._units[token].quantity
-
-                if in_numerator:
-                    for si in range(self._sig_len):
-                        signature[si] += sig_buffer[si]
-
-                    quantity *= quantity_buffer
-                else:
-                    for si in range(self._sig_len):
-                        signature[si] -= sig_buffer[si]
-
-                    quantity /= quantity_buffer
-
-                was_unit = True
-            else:
-                raise ValueError(f'Unit not recognized: {token}')
+        spec = self._units.get(unit)
+        if spec is not None:
+            return spec
+        result = self._resolve(unit)
+        if isinstance(result, _Failure):
+            raise ValueError(result.message)
+        return result
+
+    def _resolve(self, unit: str) -> _UnitSpec | _Failure:
+        """Look up or parse unit specification without raising.
 
-        return _UnitSpec(signature=tuple(signature), quantity=quantity)
+        Like ``_signature_and_quantity_for_unit``, but an invalid
+        specification is returned as a ``_Failure`` holding its error
+        code and message.
+
+        """
+        spec = self._units.get(unit)
+        if spec is not None:
+            return spec
+
+        cached = self._cache.get(unit)
+        if cached is None:
+            if self._instrumentation is not None:
+                self._instrumentation.record_parse()
+            cached = self._registry.resolve_specification(unit)
+            if isinstance(cached, _Failure) and not self._cache_failures:
+                return cached
+            self._cache.put(unit, cached)
+        return cached
 
     def _parse_physical_quantity(self, physical_quantity: str) -> tuple[float, str]:
         """Parse physical quantity string.
@@ -149,7 +472,8 @@ class UnitParser:
         Parameters
         ----------
         physical_quantity : str
-           String representing a physical quantity, like "5 feet".
+           String representing a physical quantity, like "5 feet",
+           "1/3 tablespoons", or "1e3 meters".
 
         Returns
         -------
@@ -158,170 +482,24 @@ class UnitParser:
         units : str
            The units.
 
+        Raises
+        ------
+        ValueError
+            If the string is not a quantity, or its number is a
+            fraction with a zero denominator or too large for a float.
+
         """
-        double_re = r'[-+]?[0-9]*\.?[0-9]+'
-        fraction_re = r'[-+]?[0-9]+/[0-9]+'
-        number_re = r'(?:' + fraction_re + r'|' + double_re + r')'
-        composite_unit_re = r'[a-zA-Z_]+'
-        physical_quantity_re_with_names = (
-            r'(' + number_re + r')\s*(' + composite_unit_re + r')'
-        )
-        result = re.match(physical_quantity_re_with_names, physical_quantity)
+        result = _PHYSICAL_QUANTITY_RE.match(physical_quantity)
         if result:
-            quantity = float(Fraction(result.group(1)))
+            try:
+                quantity = _parse_number(result.group(1))
+            except (ZeroDivisionError, OverflowError):
+                raise ValueError('Invalid format') from None
             units = result.group(2)
             return quantity, units
         else:
             raise ValueError('Invalid format')
 
-    def _parse_unit_file(self, file: str | Path) -> None:
-        """Parse Unit Definition File.
-
-        Parameters
-        ----------
-        file : str | Path
-            Location of unit definitions (see Syntax).
-
-        Syntax
-        ------
-        The Unit Definition File consists of unit definitions and
-        potentially comments. A comment starts with a # and can be on
-        the same line as a unit specification, or on a line of its
-        own. White space is ignored, but each unit specification must
-        be on its own line.
-
-        Units can either be specified by a vector representing its
-        dimensional signature, or in terms of other units. Defining a
-        unit by its dimensional signature looks like this:
-           second: [1 0 0]
-        This fairly meaninglessly defines a second as having that
-        signature, with an implicit quantity of 1. Units defined in
-        terms of their dimensional signatures can be used as a
-        foundation to defined other units. For example, let's
-        additionally define:
-           meter: [0 1 0]
-           kilogram: [0 0 1]
-           newton: kilogram_meter_per_second_squared
-        We have now seen our first unit definition in terms of other
-        units. The syntax of unit specifications is described in the
-        class documentation.
-
-        """
-        ## Regular expressions
-        # This regular expression represents a line that contains nothing but
-        # comments or spaces. Examples:
-        # # This is a comment!
-        #             # This is also a comment!
-        empty_line_re = r'(^\s*(#.*)?$)'
-
-        unit_re = r'[a-zA-Z]+'
-        composite_unit_re = r'[a-zA-Z_]+'
-
-        # This regular expression matches a double.
-        # Source: http://www.regular-expressions.info/floatingpoint.html
-        double_re = r'[-+]?[0-9]*\.?[0-9]+'
-        fraction_re = r'[-+]?[0-9]+/[0-9]+'
-        number_re = r'(?:' + fraction_re + r'|' + double_re + r')'
-
-        # This regular expression represents a row vector, using Matlab
-        # notation. Examples:
-        # [1,1]
-        # [ 1 , 1, 2.3 ]
-        vector_re = r'\[\s*((\s*' + double_re + r'\s*,?)*\s*(' + double_re + r'))\s*\]'
-
-        # This regular expression represents a physical quantity. Examples:
-        #   1 day
-        #   60 seconds
-        #   1/3 tablespoons
-        physical_quantity_re = number_re + r'\s*' + composite_unit_re
-        physical_quantity_re_with_names = (
-            r'(' + number_re + r')\s*(' + composite_unit_re + r')'
-        )
-
-        # This regular expression represents a unit specification.
-        # Example:
-        #  second: [0 0 1] # Irrelevant comment
-        # Resulting tokens:
-        #  token.key = 'second'
-        #  token.value = '[0 0 1]'
-        # Example:
-        #  minute: 60 seconds # Irrelevant comment
-        # Resulting tokens:
-        #  token.key = 'minute'
-        #  token.value = '60 seconds'
-        key_value_re = (
-            r'^\s*('
-            + unit_re
-            + r')\s*:\s*('
-            + vector_re
-            + r'|'
-            + physical_quantity_re
-            + r')\s*(#.*)?$'
-        )
-
-        ## Parse file
-        with open(file) as f:
-            line_number = 0
-            for line in f:
-                line_number += 1
-
-                if re.match(empty_line_re, line):
-                    # This line is a comment
-                    continue
-
-                result = re.match(key_value_re, line)
-
-                if not result:
-                    raise ValueError(f'Syntax error on line: {line_number}:')
-
-                unit_name = result.group(1)
-                definition = result.group(2)
-
-                if unit_name in self._units:
-                    raise ValueError(
-                        f'Syntax error on line: {line_number}:'
-                        f' Unit {unit_name} has already been specified.'
-                    )
-
-                if not re.match(r'^[a-zA-Z]+$', unit_name):
-                    raise ValueError(
-                        f'Syntax error on line: {line_number}:'
-                        f' Unit names may contain only alphabetic characters'
-                    )
-
-                defined_by_signature = re.match(vector_re, definition)
-                if defined_by_signature:
-                    # Unit is specified by signature; in this case,
-                    # quantity is by definition unity.
-                    sig_strs = re.compile(r',|\s+,?\s*').split(
-                        defined_by_signature.group(1)
-                    )
-                    sig = tuple(int(s) for s in sig_strs)
-
-                    if self._sig_len == -1:
-                        self._sig_len = len(sig)
-                    elif len(sig) != self._sig_len:
-                        raise ValueError(
-                            f'Syntax error on line: {line_number}:'
-                            f' Signature length inconsistent with previous units.'
-                        )
-
-                    self._units[unit_name] = _UnitSpec(signature=sig, quantity=1.0)
-                else:
-                    result = re.match(physical_quantity_re_with_names, definition)
-                    if result:
-                        this_quantity = float(Fraction(result.group(1)))
-                        unit = result.group(2)
-
-                        if this_quantity <= 0:
-                            raise ValueError('Quantity must be strictly positive.')
-
-                        sq = self._signature_and_quantity_for_unit(unit)
-                        self._units[unit_name] = _UnitSpec(
-                            signature=sq.signature,
-                            quantity=sq.quantity * this_quantity,
-                        )
-
     @overload
     def convert(self, physical_quantity: str, desired_units: str, /) -> float: ...
     @overload
@@ -364,18 +542,487 @@ class UnitParser:
             units = b
             desired_units = c
 
+        if self._matrices is not None:
+            entry = self._matrices.get(units)
+            if entry is not None:
+                matrix, row = entry
+                j = matrix.ids.get(desired_units)
+                if j is not None:
+                    return quantity * matrix.factors[row + j]
+
+        given_quant, des_quant = self._compatible_quantities(units, desired_units)
+        return quantity * given_quant / des_quant
+
+    @overload
+    def quantity(self, physical_quantity: str, /) -> Quantity: ...
+    @overload
+    def quantity(self, value: Any, units: str, /) -> Quantity: ...
+    def quantity(self, a: Any, b: str | None = None, /) -> Quantity:
+        """Create a quantity with resolved units, for arithmetic.
+
+        Two call shapes are accepted:
+
+        - ``quantity("5 feet")`` — parse the quantity from a string.
+        - ``quantity(5, "feet")`` — pass the value (a number or a NumPy
+          array) and the units separately.
+
+        Returns
+        -------
+        Quantity
+            The value and its resolved units; see ``Quantity``.
+
+        Raises
+        ------
+        ValueError
+            If the string or the units are invalid.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > force = up.quantity("2 kg") * up.quantity(9.8, "meters_per_second_squared")
+        > force.to("newtons")
+         19.6
+
+        """
+        if b is None:
+            if not isinstance(a, str):
+                raise ValueError('One-argument form requires a string like "5 feet"')
+            a, b = self._parse_physical_quantity(a)
+        return Quantity(a, self._signature_and_quantity_for_unit(b), self)
+
+    def converter(self, units: str, desired_units: str) -> Converter:
+        """Create a reusable converter between two units.
+
+        Both units are resolved, checked for compatibility, and the
+        conversion factor is computed once, so that applying the
+        returned converter is a single multiplication.
+
+        Parameters
+        ----------
+        units : str
+            Source units, like "feet".
+        desired_units : str
+            Destination units, like "meters".
+
+        Returns
+        -------
+        Converter
+            Callable accepting a float, a list of floats, or an array.
+
+        Raises
+        ------
+        ValueError
+            If the units have incompatible signatures.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > to_meters = up.converter("feet", "meters")
+        > to_meters(5)
+         1.524
+
+        """
+        given_quant, des_quant = self._compatible_quantities(units, desired_units)
+        return Converter(units, desired_units, given_quant / des_quant)
+
+    def compile(self, expression: str, out: str, **units: str) -> CompiledExpression:
+        """Compile an arithmetic expression over quantities in fixed units.
+
+        The expression multiplies and divides variables (and numeric
+        constants), each given in fixed units. Dimensions are checked
+        once, here, and all unit conversion factors, including the
+        conversion to ``out``, are folded into a single constant, so
+        evaluating the expression costs just its own arithmetic plus
+        one multiplication, on scalars or NumPy arrays alike.
+
+        Parameters
+        ----------
+        expression : str
+            Expression like "m * a / A". Only ``*``, ``/``,
+            parentheses, variables, and numeric constants are allowed.
+        out : str
+            Units of the result, like "psi".
+        **units : str
+            Units of each variable, like ``m="kg"``.
+
+        Returns
+        -------
+        CompiledExpression
+            Callable taking the variables positionally (in order of
+            first appearance in the expression) or by name.
+
+        Raises
+        ------
+        ValueError
+            If the expression is invalid, if the units of a variable
+            are missing, invalid, or given for a variable not in the
+            expression, or if the expression does not have the
+            dimension of ``out``.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > pressure = up.compile(
+        .     "m * a / A", m="kg", a="meters_per_second_squared",
+        .     A="meters_squared", out="psi",
+        . )
+        > pressure(m=1000, a=9.8, A=1)
+         1.4213698297560506
+
+        """
+        tree, variables = parse_expression(expression)
+        missing = [name for name in variables if name not in units]
+        if missing:
+            raise ValueError(f'No units given for variables: {", ".join(missing)}')
+        unused = [name for name in units if name not in variables]
+        if unused:
+            raise ValueError(f'Variables not in expression: {", ".join(unused)}')
+
+        specs = {
+            name: self._signature_and_quantity_for_unit(units[name])
+            for name in variables
+        }
+        out_spec = self._signature_and_quantity_for_unit(out)
+        packed, quantity = fold(tree, specs, self._sig_len)
+        if packed != out_spec.packed:
+            raise ValueError('Units not compatible.')
+
+        factor = quantity / out_spec.quantity
+        return CompiledExpression(
+            expression,
+            {name: units[name] for name in variables},
+            out,
+            factor,
+            build_evaluator(tree, variables, factor),
+        )
+
+    def convert_many(
+        self,
+        values: 'ArrayLike',
+        units: 'str | ArrayLike',
+        desired_units: str,
+    ) -> 'NDArray[np.float64]':
+        """Convert an array of quantities to the desired units.
+
+        The conversion is vectorized: no Python code runs per element.
+        When ``units`` is an array of unit strings, the distinct units
+        are factorized and each is resolved only once; the per-element
+        factors are then gathered and applied in a single
+        multiplication.
+
+        Requires NumPy (``pip install "unit_parser[numpy]"``).
+
+        Parameters
+        ----------
+        values : array_like
+            Quantities to convert; a NumPy array, a list, or any object
+            supporting the buffer protocol, like ``array.array('d')``.
+        units : str or array_like of str
+            Units of ``values``: either a single unit string applying
+            to every element, or an array of unit strings with the
+            same shape as ``values``.
+        desired_units : str
+            Desired units, like "meters".
+
+        Returns
+        -------
+        numpy.ndarray
+            Float array with the shape of ``values``, expressed in
+            ``desired_units``.
+
+        Raises
+        ------
+        ValueError
+            If any unit is incompatible with ``desired_units``, or if
+            ``units`` and ``values`` have different shapes.
+
+        Usage
+        -----
+        > import numpy as np
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > up.convert_many(np.array([1.0, 2.0]), ["feet", "inches"], "meters")
+         array([0.3048, 0.0508])
+
+        """
+        try:
+            import numpy as np
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(NUMPY_REQUIRED.format('convert_many')) from e
+
+        quantities = np.asarray(values, dtype=np.float64)
+        if isinstance(units, str):
+            given_quant, des_quant = self._compatible_quantities(units, desired_units)
+            return quantities * (given_quant / des_quant)
+
+        unit_array = np.asarray(units)
+        if unit_array.shape != quantities.shape:
+            raise ValueError('values and units must have the same shape.')
+
+        distinct, codes = np.unique(unit_array.ravel(), return_inverse=True)
+        factors = np.empty(len(distinct), dtype=np.float64)
+        for i, unit in enumerate(distinct.tolist()):
+            given_quant, des_quant = self._compatible_quantities(
+                str(unit), desired_units
+            )
+            factors[i] = given_quant / des_quant
+
+        return quantities * factors[codes.reshape(quantities.shape)]
+
+    def parse_quantities(self, physical_quantities: Iterable[str]) -> ParsedQuantities:
+        """Parse many physical quantity strings into columns.
+
+        Each string is parsed like the source quantity of the
+        two-argument ``convert``, but malformed rows are reported in a
+        mask instead of raising. Units are factorized: each row gets an
+        integer code into the list of distinct unit strings. Units are
+        not resolved here, so unknown units are only detected once the
+        values are converted.
+
+        Requires NumPy (``pip install "unit_parser[numpy]"``).
+
+        Parameters
+        ----------
+        physical_quantities : iterable of str
+            Strings like "5 feet" or "1/3 tablespoons"; may also be a
+            NumPy array of strings. Non-string entries are malformed.
+
+        Returns
+        -------
+        ParsedQuantities
+            Named tuple of values, unit_codes, units, and malformed.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > parsed = up.parse_quantities(["5 feet", "oops", "2 meters", "1 foot"])
+        > parsed.values
+         array([ 5., nan,  2.,  1.])
+        > parsed.unit_codes
+         array([ 0, -1,  1,  2])
+        > parsed.units
+         ['feet', 'meters', 'foot']
+
+        """
+        try:
+            import numpy as np
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(NUMPY_REQUIRED.format('parse_quantities')) from e
+
+        match = _PHYSICAL_QUANTITY_RE.match
+        nan = float('nan')
+        values: list[float] = []
+        codes: list[int] = []
+        unit_codes: dict[str, int] = {}
+        for physical_quantity in physical_quantities:
+            result = (
+                match(physical_quantity) if isinstance(physical_quantity, str) else None
+            )
+            if result is None:
+                values.append(nan)
+                codes.append(-1)
+                continue
+
+            number, units = result.groups()
+            try:
+                values.append(_parse_number(number))
+            except (ZeroDivisionError, OverflowError):
+                values.append(nan)
+                codes.append(-1)
+                continue
+
+            code = unit_codes.get(units)
+            if code is None:
+                code = unit_codes[units] = len(unit_codes)
+            codes.append(code)
+
+        code_array = np.array(codes, dtype=np.intp)
+        return ParsedQuantities(
+            values=np.array(values, dtype=np.float64),
+            unit_codes=code_array,
+            units=list(unit_codes),
+            malformed=code_array < 0,
+        )
+
+    def try_convert_quantities(
+        self, physical_quantities: Iterable[str], desired_units: str
+    ) -> ConversionResults:
+        """Convert many physical quantity strings, reporting errors per row.
+
+        Like calling the two-argument ``convert`` on every string, but
+        rows that fail are reported in an array of error codes rather
+        than by raising, so no exception is constructed for bad rows.
+        Rows whose number is not a valid float, like a fraction with a
+        zero denominator or one too large to represent, are reported as
+        ``ErrorCode.INVALID_FORMAT``. Each distinct unit is resolved
+        only once.
+
+        Requires NumPy (``pip install "unit_parser[numpy]"``).
+
+        Parameters
+        ----------
+        physical_quantities : iterable of str
+            Strings like "5 feet" or "1/3 tablespoons".
+        desired_units : str
+            Desired units, like "meters".
+
+        Returns
+        -------
+        ConversionResults
+            Named tuple of values and errors.
+
+        Raises
+        ------
+        ValueError
+            If ``desired_units`` itself is invalid.
+
+        Usage
+        -----
+        > from unit_parser import UnitParser
+        > up = UnitParser()
+        > result = up.try_convert_quantities(["1 foot", "oops", "5 sec"], "inches")
+        > result.values
+         array([12., nan, nan])
+        > result.errors
+         array([0, 1, 3], dtype=uint8)
+
+        """
+        try:
+            import numpy as np
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(NUMPY_REQUIRED.format('try_convert_quantities')) from e
+
+        desired = self._signature_and_quantity_for_unit(desired_units)
+        parsed = self.parse_quantities(physical_quantities)
+        factors, errors = self._factors_and_errors(parsed.units, desired)
+        # Malformed rows have code -1, which selects these last entries.
+        factors.append(float('nan'))
+        errors.append(ErrorCode.INVALID_FORMAT)
+        codes = parsed.unit_codes
+        return ConversionResults(
+            values=parsed.values * np.array(factors)[codes],
+            errors=np.array(errors, dtype=np.uint8)[codes],
+        )
+
+    def try_convert_many(
+        self,
+        values: 'ArrayLike',
+        units: 'str | ArrayLike',
+        desired_units: str,
+    ) -> ConversionResults:
+        """Convert an array of quantities, reporting errors per element.
+
+        Like ``convert_many``, but elements whose units are invalid or
+        incompatible with ``desired_units`` are reported in an array of
+        error codes, and converted to NaN, rather than by raising.
+
+        Requires NumPy (``pip install "unit_parser[numpy]"``).
+
+        Parameters
+        ----------
+        values : array_like
+            Quantities to convert.
+        units : str or array_like of str
+            Units of ``values``: either a single unit string applying
+            to every element, or an array of unit strings with the
+            same shape as ``values``.
+        desired_units : str
+            Desired units, like "meters".
+
+        Returns
+        -------
+        ConversionResults
+            Named tuple of values and errors, with the shape of
+            ``values``.
+
+        Raises
+        ------
+        ValueError
+            If ``desired_units`` itself is invalid, or if ``units`` and
+            ``values`` have different shapes.
+
+        """
+        try:
+            import numpy as np
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(NUMPY_REQUIRED.format('try_convert_many')) from e
+
+        quantities = np.asarray(values, dtype=np.float64)
+        desired = self._signature_and_quantity_for_unit(desired_units)
+        if isinstance(units, str):
+            factors, errors = self._factors_and_errors([units], desired)
+            return ConversionResults(
+                values=quantities * factors[0],
+                errors=np.full(quantities.shape, errors[0], dtype=np.uint8),
+            )
+
+        unit_array = np.asarray(units)
+        if unit_array.shape != quantities.shape:
+            raise ValueError('values and units must have the same shape.')
+
+        distinct, codes = np.unique(unit_array.ravel(), return_inverse=True)
+        factors, errors = self._factors_and_errors(
+            [str(unit) for unit in distinct.tolist()], desired
+        )
+        codes = codes.reshape(quantities.shape)
+        return ConversionResults(
+            values=quantities * np.array(factors)[codes],
+            errors=np.array(errors, dtype=np.uint8)[codes],
+        )
+
+    def _factors_and_errors(
+        self, units: Iterable[str], desired: _UnitSpec
+    ) -> tuple[list[float], list[int]]:
+        """Resolve units and their factors to ``desired``, without raising.
+
+        Returns
+        -------
+        factors : list[float]
+            The conversion factor of each unit; NaN if it failed.
+        errors : list[int]
+            The ``ErrorCode`` of each unit.
+
+        """
+        nan = float('nan')
+        factors: list[float] = []
+        errors: list[int] = []
+        for unit in units:
+            spec = self._resolve(unit)
+            if isinstance(spec, _Failure):
+                factors.append(nan)
+                errors.append(spec.code)
+            elif spec.packed != desired.packed:
+                factors.append(nan)
+                errors.append(ErrorCode.INCOMPATIBLE_UNITS)
+            else:
+                factors.append(spec.quantity / desired.quantity)
+                errors.append(ErrorCode.OK)
+        return factors, errors
+
+    def _compatible_quantities(
+        self, units: str, desired_units: str
+    ) -> tuple[float, float]:
+        """Resolve two units and check that they are compatible.
+
+        Returns
+        -------
+        given_quant : float
+            The quantity of ``units``.
+        des_quant : float
+            The quantity of ``desired_units``.
+
+        """
         given_sq = self._signature_and_quantity_for_unit(units)
-        given_sig = given_sq.signature
-        given_quant = given_sq.quantity
         des_sq = self._signature_and_quantity_for_unit(desired_units)
-        des_sig = des_sq.signature
-        des_quant = des_sq.quantity
 
-        for fi, ti in zip(given_sig, des_sig, strict=True):
-            if fi != ti:
-                raise ValueError('Units not compatible.')
+        if given_sq.packed != des_sq.packed:
+            raise ValueError('Units not compatible.')
 
-        return quantity * given_quant / des_quant
+        return given_sq.quantity, des_sq.quantity
 
     def add(self, x: str, y: str, sum_units: str) -> float:
         """Add physical quantities.
@@ -413,24 +1060,20 @@ class UnitParser:
         x_sq = self._signature_and_quantity_for_unit(x_units)
         y_sq = self._signature_and_quantity_for_unit(y_units)
 
-        x_sig = x_sq.signature
+        x_sig = x_sq.packed
         x_unit_quant = x_sq.quantity
-        y_sig = y_sq.signature
+        y_sig = y_sq.packed
         y_unit_quant = y_sq.quantity
 
-        for i in range(self._sig_len):
-            if x_sig[i] != y_sig[i]:
-                raise ValueError('Units not compatible.')
+        if x_sig != y_sig:
+            raise ValueError('Units not compatible.')
 
         sum_quantity = x_quant * x_unit_quant + y_quant * y_unit_quant
-        sum_signature = list(x_sig)
 
         sum_sq = self._signature_and_quantity_for_unit(sum_units)
-        sum_sig = sum_sq.signature
         sum_unit_quant = sum_sq.quantity
-        for i in range(self._sig_len):
-            if sum_sig[i] != sum_signature[i]:
-                raise ValueError('Units not compatible.')
+        if sum_sq.packed != x_sig:
+            raise ValueError('Units not compatible.')
 
         return sum_quantity / sum_unit_quant
 
@@ -469,24 +1112,20 @@ class UnitParser:
         x_sq = self._signature_and_quantity_for_unit(x_units)
         y_sq = self._signature_and_quantity_for_unit(y_units)
 
-        x_sig = x_sq.signature
+        x_sig = x_sq.packed
         x_unit_quant = x_sq.quantity
-        y_sig = y_sq.signature
+        y_sig = y_sq.packed
         y_unit_quant = y_sq.quantity
 
-        for i in range(self._sig_len):
-            if x_sig[i] != y_sig[i]:
-                raise ValueError('Units not compatible.')
+        if x_sig != y_sig:
+            raise ValueError('Units not compatible.')
 
         diff_quantity = x_quant * x_unit_quant - y_quant * y_unit_quant
-        diff_signature = list(x_sig)
 
         diff_sq = self._signature_and_quantity_for_unit(diff_units)
-        diff_sig = diff_sq.signature
         diff_unit_quant = diff_sq.quantity
-        for i in range(self._sig_len):
-            if diff_sig[i] != diff_signature[i]:
-                raise ValueError('Units not compatible.')
+        if diff_sq.packed != x_sig:
+            raise ValueError('Units not compatible.')
 
         return diff_quantity / diff_unit_quant
 
@@ -530,20 +1169,16 @@ class UnitParser:
         x_sq = self._signature_and_quantity_for_unit(x_units)
         y_sq = self._signature_and_quantity_for_unit(y_units)
 
-        x_sig = x_sq.signature
         x_unit_quant = x_sq.quantity
-        y_sig = y_sq.signature
         y_unit_quant = y_sq.quantity
 
         product_quantity = x_quant * x_unit_quant * y_quant * y_unit_quant
-        product_signature = [x_sig[i] + y_sig[i] for i in range(self._sig_len)]
+        product_signature = signature.multiply(x_sq.packed, y_sq.packed, self._sig_len)
 
         prod_sq = self._signature_and_quantity_for_unit(product_units)
-        prod_sig = prod_sq.signature
         prod_unit_quant = prod_sq.quantity
-        for i in range(self._sig_len):
-            if prod_sig[i] != product_signature[i]:
-                raise ValueError('Units not compatible.')
+        if prod_sq.packed != product_signature:
+            raise ValueError('Units not compatible.')
 
         return product_quantity / prod_unit_quant
 
@@ -585,21 +1220,86 @@ class UnitParser:
         num_sq = self._signature_and_quantity_for_unit(num_units)
         denom_sq = self._signature_and_quantity_for_unit(denom_units)
 
-        num_sig = num_sq.signature
         num_unit_quant = num_sq.quantity
-        denom_sig = denom_sq.signature
         denom_unit_quant = denom_sq.quantity
 
         quotient_quantity = (num_quant * num_unit_quant) / (
             denom_quant * denom_unit_quant
         )
-        quotient_signature = [num_sig[i] - denom_sig[i] for i in range(self._sig_len)]
+        quotient_signature = signature.divide(
+            num_sq.packed, denom_sq.packed, self._sig_len
+        )
 
         quot_sq = self._signature_and_quantity_for_unit(quotient_units)
-        quot_sig = quot_sq.signature
         quot_quant = quot_sq.quantity
-        for i in range(self._sig_len):
-            if quot_sig[i] != quotient_signature[i]:
-                raise ValueError('Units not compatible.')
+        if quot_sq.packed != quotient_signature:
+            raise ValueError('Units not compatible.')
 
         return quotient_quantity / quot_quant
+
+
+# Public methods wrapped by UnitParser.enable_instrumentation.
+_INSTRUMENTED_METHODS = (
+    'convert',
+    'converter',
+    'quantity',
+    'compile',
+    'convert_many',
+    'parse_quantities',
+    'try_convert_quantities',
+    'try_convert_many',
+    'add',
+    'subtract',
+    'multiply',
+    'divide',
+    'dimension_of',
+    'compatible_units',
+    'factor_matrix',
+)
+_INSTRUMENTED_INTERNALS = (
+    '_resolve',
+    '_signature_and_quantity_for_unit',
+    '_parse_physical_quantity',
+)
+
+
+def _counting_error_codes(
+    inst: Instrumentation, method: Callable[..., ConversionResults]
+) -> Callable[..., ConversionResults]:
+    """Wrap a non-raising batch conversion to count its failed rows."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> ConversionResults:
+        result = method(*args, **kwargs)
+        # NumPy is imported only once the method returned, that is once
+        # it is known to be installed.
+        import numpy as np
+
+        codes, counts = np.unique(result.errors, return_counts=True)
+        inst.record_error_codes(
+            {
+                ErrorCode(code): count
+                for code, count in zip(codes.tolist(), counts.tolist(), strict=True)
+            }
+        )
+        return result
+
+    return wrapper
+
+
+def _packed_signature(spec: _UnitSpec | _Failure) -> int | None:
+    # Index key of cached compound units; failures are not indexed.
+    return spec.packed if isinstance(spec, _UnitSpec) else None
+
+
+def _unpickle_parser(
+    registry: UnitRegistry,
+    cache_size: int,
+    cache_failures: bool,
+    precompute_factors: bool,
+) -> UnitParser:
+    return UnitParser(
+        registry=registry,
+        cache_size=cache_size,
+        cache_failures=cache_failures,
+        precompute_factors=precompute_factors,
+    )